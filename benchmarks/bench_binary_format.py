@@ -0,0 +1,54 @@
+# benchmarks/bench_binary_format.py
+#
+# Compares the text and binary log file formats: records written per second and
+# bytes on disk per record.
+#
+#     python -m benchmarks.bench_binary_format
+
+import os
+import tempfile
+import time
+from logkontrol.logkontrol import LogKonfig, log_function_call, log_message, log_variable
+
+NUMBER = 100_000
+
+CASES = {
+    "log_message": lambda: log_message(
+        "general", "request handled", {"status": 200, "path": "/api/items", "elapsed_ms": 12.5}
+    ),
+    "log_variable": lambda: log_variable("general", "queue_depth", 42),
+    "log_function_call": lambda: log_function_call(
+        "general", "fetch_items", page=3, page_size=50, sort="name"
+    ),
+}
+
+
+def main() -> None:
+    log_konfig = LogKonfig()
+    print(f"{'case':20} {'format':8} {'records/s':>12} {'bytes/record':>14}")
+    with tempfile.TemporaryDirectory() as log_directory:
+        for name, case in CASES.items():
+            for log_file_format in ("text", "binary"):
+                log_file_path = os.path.join(log_directory, f"{name}.{log_file_format}")
+                log_konfig.set_logging_config(
+                    {
+                        "log_file_paths": {"general": log_file_path},
+                        "log_file_formats": {"general": log_file_format},
+                        "buffering": {"general": {"flush_bytes": 65536}},
+                    }
+                )
+                start = time.perf_counter()
+                for _ in range(NUMBER):
+                    case()
+                log_konfig.close()
+                seconds = time.perf_counter() - start
+                size = os.path.getsize(log_file_path)
+                print(
+                    f"{name:20} {log_file_format:8} {NUMBER / seconds:12.0f} "
+                    f"{size / NUMBER:14.1f}"
+                )
+    log_konfig.set_logging_config(None)
+
+
+if __name__ == "__main__":
+    main()
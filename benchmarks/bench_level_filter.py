@@ -0,0 +1,81 @@
+# benchmarks/bench_level_filter.py
+#
+# Measures the cost of log_* calls whose level is below the configured threshold,
+# compared with calls that are written to disk, and the same calls made through a
+# bound handle from LogKonfig().get_logger(), and calls of a function decorated
+# with @log_calls.
+#
+#     python -m benchmarks.bench_level_filter
+
+import os
+import tempfile
+import timeit
+from logkontrol.decorators import log_calls
+from logkontrol.logkontrol import (
+    LogKonfig,
+    lazy,
+    log_function_call,
+    log_message,
+    log_variable,
+)
+
+NUMBER = 100_000
+
+
+def expensive_state() -> dict:
+    return {f"key_{index}": index for index in range(100)}
+
+
+def handler(arg1: int, arg2: str) -> int:
+    return arg1
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as log_directory:
+        log_konfig = LogKonfig()
+        log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"general": os.path.join(log_directory, "general.log")},
+                "log_level": "INFO",
+            }
+        )
+        logger = log_konfig.get_logger("general")
+        debug_handler = log_calls("general")(handler)
+        info_handler = log_calls("general", log_level="INFO")(handler)
+        cases = {
+            "log_message (suppressed)": lambda: log_message(
+                "general", "debug message", {"state": expensive_state}
+            ),
+            "log_message lazy (suppressed)": lambda: log_message(
+                "general", "debug message", {"state": lazy(expensive_state)}
+            ),
+            "log_variable lazy (suppressed)": lambda: log_variable(
+                "general", "state", lazy(expensive_state)
+            ),
+            "log_function_call (suppressed)": lambda: log_function_call(
+                "general", "handler", arg1=1, arg2="two"
+            ),
+            "log_message (written)": lambda: log_message(
+                "general", "info message", {"state": "ready"}, log_level="INFO"
+            ),
+            "logger.message (suppressed)": lambda: logger.message(
+                "debug message", {"state": expensive_state}
+            ),
+            "logger.call (suppressed)": lambda: logger.call(
+                "handler", arg1=1, arg2="two"
+            ),
+            "logger.message (written)": lambda: logger.message(
+                "info message", {"state": "ready"}, log_level="INFO"
+            ),
+            "handler (undecorated)": lambda: handler(1, "two"),
+            "@log_calls (suppressed)": lambda: debug_handler(1, "two"),
+            "@log_calls (written)": lambda: info_handler(1, "two"),
+        }
+        for name, case in cases.items():
+            seconds = timeit.timeit(case, number=NUMBER)
+            print(f"{name:34} {seconds / NUMBER * 1e9:10.0f} ns/call")
+        log_konfig.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_startup.py
+#
+# Measures the cold-start cost of logkontrol in fresh interpreters: importing the
+# package, and initializing it from a YAML file with and without the parsed
+# config cache. Times are medians over several runs, with the time of an empty
+# interpreter start subtracted.
+#
+#     python -m benchmarks.bench_startup
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 20
+
+CONFIG = """\
+log_file_paths:
+  general: {log_directory}/general.log
+  errors: {log_directory}/errors.log
+log_format: '[{{timestamp}}] [{{level}}] {{message}}'
+timestamp_format: '%Y-%m-%d %H:%M:%S'
+log_level: INFO
+log_levels:
+  errors: ERROR
+buffering:
+  general:
+    flush_bytes: 65536
+"""
+
+INIT = (
+    "from logkontrol import LogKonfig; "
+    "LogKonfig().init_logging({config!r}, config_cache_path={cache!r})"
+)
+
+
+def run_python(code: str) -> float:
+    """
+    Returns the seconds a fresh interpreter takes to run a snippet.
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - start
+
+
+def median_seconds(code: str, runs: int = RUNS) -> float:
+    return statistics.median(run_python(code) for _ in range(runs))
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, "logging_config.yaml")
+        cache_path = os.path.join(directory, "logging_config.cache")
+        with open(config_path, "w") as config_file:
+            config_file.write(CONFIG.format(log_directory=directory))
+        # Fill the cache once so the cached runs start warm.
+        run_python(INIT.format(config=config_path, cache=cache_path))
+        cases = {
+            "import logkontrol": "import logkontrol",
+            "import + init_logging (YAML)": INIT.format(config=config_path, cache=None),
+            "import + init_logging (cached)": INIT.format(
+                config=config_path, cache=cache_path
+            ),
+        }
+        empty = median_seconds("pass")
+        print(f"{'empty interpreter':32} {empty * 1000:8.1f} ms")
+        for name, code in cases.items():
+            seconds = median_seconds(code) - empty
+            print(f"{name:32} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+# benchmarks/bench_suite.py
+#
+# Measures every log_* entry point, and truncate_string, across payload sizes with
+# file output, console output, both at once (tee) and several threads logging at
+# once. Console output goes to a line-buffered stream, as on a terminal. Each case
+# reports records per second, latency percentiles and the memory allocated while
+# writing one record. The report can be saved as JSON and compared with a saved
+# baseline, in which case regressions are listed and the exit status is 1.
+#
+#     python -m benchmarks.bench_suite --output baseline.json
+#     python -m benchmarks.bench_suite --compare baseline.json
+#     python -m benchmarks.bench_suite --quick --filter log_message
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from logkontrol.logkontrol import (
+    LogKonfig,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+    truncate_string,
+)
+
+REPORT_VERSION = 1
+THREADS = 4
+ALLOCATION_SAMPLES = 50
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_ROUNDS = 3
+
+# Records measured per case, by payload size.
+RECORDS = {"small": 20_000, "medium": 5_000, "large": 500}
+
+
+def make_payloads() -> dict[str, dict]:
+    """
+    Builds the values logged by each payload size.
+    """
+    payloads = {}
+    sizes = (("small", 3, 20), ("medium", 50, 1_000), ("large", 1_000, 100_000))
+    for size, items, text_length in sizes:
+        payloads[size] = {
+            "message": "x" * text_length,
+            "variables": {f"name_{index}": index for index in range(items)},
+            "value": list(range(items)),
+            "json": [{"id": index, "name": f"item {index}"} for index in range(items)],
+            "text": "y" * text_length * 10,
+        }
+    return payloads
+
+
+ENTRY_POINTS = {
+    "log_message": lambda payload: log_message(
+        "bench", payload["message"], payload["variables"], log_level="INFO"
+    ),
+    "log_variable": lambda payload: log_variable(
+        "bench", "value", payload["value"], log_level="INFO"
+    ),
+    "log_function_call": lambda payload: log_function_call(
+        "bench", "handler", log_level="INFO", **payload["variables"]
+    ),
+    "log_json_content": lambda payload: log_json_content(
+        "bench", payload["json"], log_level="INFO"
+    ),
+    "truncate_string": lambda payload: truncate_string(payload["text"]),
+}
+
+MODES = ("file", "console", "tee", "threads")
+CONSOLE_OUTPUT = {"console": True, "tee": "tee"}
+
+
+def percentile(sorted_values: list[int], fraction: float) -> int:
+    """
+    Returns the value below which a fraction of the sorted values fall.
+    """
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def _run_calls(call, payload, count: int, latencies: list[int]) -> None:
+    clock = time.perf_counter_ns
+    for _ in range(count):
+        start = clock()
+        call(payload)
+        latencies.append(clock() - start)
+
+
+def measure_allocations(call, payload) -> float:
+    """
+    Returns the average number of bytes allocated at the peak of a single call.
+    """
+    call(payload)
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(ALLOCATION_SAMPLES):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            call(payload)
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / ALLOCATION_SAMPLES
+
+
+def _run_round(call, payload, count: int, mode: str) -> tuple[float, list[int]]:
+    if mode != "threads":
+        latencies: list[int] = []
+        start = time.perf_counter()
+        _run_calls(call, payload, count, latencies)
+        return time.perf_counter() - start, latencies
+    per_thread: list[list[int]] = [[] for _ in range(THREADS)]
+    threads = [
+        threading.Thread(
+            target=_run_calls, args=(call, payload, count // THREADS, thread_latencies)
+        )
+        for thread_latencies in per_thread
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    return seconds, [latency for latencies in per_thread for latency in latencies]
+
+
+def run_case(call, payload, count: int, mode: str, rounds: int = DEFAULT_ROUNDS) -> dict:
+    """
+    Measures one entry point with one payload in one output mode.
+
+    The case is measured several times and the fastest round is reported, which
+    keeps other work on the machine from showing up as a regression.
+
+    Args:
+        call: Logs one record of the payload.
+        payload (dict): The values to log.
+        count (int): The number of records to measure per round.
+        mode (str): "file", "console", "tee" or "threads".
+        rounds (int, optional): The number of times the case is measured.
+
+    Returns:
+        dict: The records per second, latency percentiles in microseconds and the
+            bytes allocated per record.
+    """
+    with contextlib.ExitStack() as stack:
+        if mode in ("console", "tee"):
+            # Line-buffered, like a terminal.
+            devnull = stack.enter_context(open(os.devnull, "w", buffering=1))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        allocation_bytes = measure_allocations(call, payload)
+        seconds, latencies = min(
+            (_run_round(call, payload, count, mode) for _ in range(rounds)),
+            key=lambda measured: measured[0],
+        )
+        LogKonfig().flush()
+    latencies.sort()
+    return {
+        "records": len(latencies),
+        "records_per_second": round(len(latencies) / seconds, 1),
+        "p50_us": round(percentile(latencies, 0.50) / 1000, 3),
+        "p90_us": round(percentile(latencies, 0.90) / 1000, 3),
+        "p99_us": round(percentile(latencies, 0.99) / 1000, 3),
+        "alloc_bytes_per_record": round(allocation_bytes, 1),
+    }
+
+
+def run_suite(
+    scale: float = 1.0,
+    name_filter: str | None = None,
+    rounds: int = DEFAULT_ROUNDS,
+    log=print,
+) -> dict:
+    """
+    Runs every case and returns the report.
+
+    Args:
+        scale (float, optional): Multiplies the number of records of every case.
+        name_filter (str | None, optional): Only runs cases whose name contains it.
+        rounds (int, optional): The number of times each case is measured.
+        log (optional): Called with a line of progress per case.
+
+    Returns:
+        dict: The report, with a "results" entry per "entry_point/payload/mode" case.
+    """
+    log_konfig = LogKonfig()
+    previous_config = log_konfig.get_logging_config()
+    payloads = make_payloads()
+    results = {}
+    with tempfile.TemporaryDirectory() as log_directory:
+        log_file_path = os.path.join(log_directory, "bench.log")
+        for entry_point, call in ENTRY_POINTS.items():
+            for size, payload in payloads.items():
+                # truncate_string does not log, so the output mode does not apply.
+                modes = ("file",) if entry_point == "truncate_string" else MODES
+                for mode in modes:
+                    name = f"{entry_point}/{size}/{mode}"
+                    if name_filter and name_filter not in name:
+                        continue
+                    log_konfig.set_logging_config(
+                        {
+                            "log_file_paths": {"bench": log_file_path},
+                            "console_output": CONSOLE_OUTPUT.get(mode, False),
+                        }
+                    )
+                    count = max(THREADS, int(RECORDS[size] * scale))
+                    results[name] = run_case(call, payload, count, mode, rounds)
+                    log(format_result(name, results[name]))
+                    log_konfig.close()
+                    if os.path.exists(log_file_path):
+                        os.remove(log_file_path)
+    log_konfig.set_logging_config(previous_config)  # type: ignore
+    return {
+        "version": REPORT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def format_result(name: str, result: dict) -> str:
+    return (
+        f"{name:40} {result['records_per_second']:12.0f} "
+        f"{result['p50_us']:9.2f} {result['p90_us']:9.2f} {result['p99_us']:9.2f} "
+        f"{result['alloc_bytes_per_record']:12.0f}"
+    )
+
+
+def compare_reports(
+    baseline: dict, report: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[str]:
+    """
+    Lists the cases that got slower or allocate more than in the baseline.
+
+    A case regresses if its records per second dropped, or its median latency or
+    bytes allocated per record grew, by more than the threshold. Cases missing from
+    either report are ignored.
+
+    Args:
+        baseline (dict): The saved report.
+        report (dict): The new report.
+        threshold (float, optional): The allowed relative change. Defaults to 0.10.
+
+    Returns:
+        list[str]: A description of every regression.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        checks = (
+            ("records/s", base["records_per_second"], result["records_per_second"], -1),
+            ("p50", base["p50_us"], result["p50_us"], 1),
+            ("alloc bytes", base["alloc_bytes_per_record"], result["alloc_bytes_per_record"], 1),
+        )
+        for metric, old, new, direction in checks:
+            if old <= 0:
+                continue
+            change = (new - old) / old
+            if change * direction > threshold:
+                regressions.append(f"{name}: {metric} {old:g} -> {new:g} ({change:+.1%})")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_suite")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--compare", help="compare with a report saved by --output")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative change counted as a regression (default 0.10)",
+    )
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=DEFAULT_ROUNDS,
+        help="times each case is measured; the fastest is reported (default 3)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="measure a tenth of the records"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    print(
+        f"{'case':40} {'records/s':>12} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} "
+        f"{'alloc B/rec':>12}"
+    )
+    report = run_suite(0.1 if args.quick else 1.0, args.filter, args.rounds)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    if args.compare:
+        with open(args.compare, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_reports(baseline, report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,4 +6,36 @@ from .logkontrol import (
     log_json_content,
     log_funktion_kall,
     log_json_kontent,
+    lazy,
+    get_logger,
+    dump_flight_recorder,
 )
+from .logger import Logger
+
+# Names from modules with costly imports (asyncio, inspect, logging), which are
+# only imported once one of their names is used.
+_LAZY_EXPORTS = {
+    "log_calls": ".decorators",
+    "LogKontrolHandler": ".bridge",
+    "alog_message": ".aio",
+    "alog_variable": ".aio",
+    "alog_function_call": ".aio",
+    "alog_json_content": ".aio",
+    "aflush": ".aio",
+    "aclose": ".aio",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_EXPORTS])
@@ -0,0 +1,35 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import argparse
+import sys
+from . import binary, collector, query
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the parser of the "python -m logkontrol" command line.
+    """
+    parser = argparse.ArgumentParser(prog="python -m logkontrol")
+    commands = parser.add_subparsers(dest="command", required=True)
+    query.add_arguments(
+        commands.add_parser("query", help="search text log files written by logkontrol")
+    )
+    binary.add_arguments(
+        commands.add_parser("decode", help="render binary log files as text")
+    )
+    collector.add_arguments(
+        commands.add_parser(
+            "collect", help="write the log files of worker processes from one process"
+        )
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import asyncio
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from .coalescing import resolve_record
+from .formatting import resolve_lazy
+from .logkontrol import (
+    CompiledConfig,
+    LogKonfig,
+    _get_compiled_config,
+    _output_path,
+    _resolve_log_file_key,
+)
+from .sinks import FLUSH_IMMEDIATELY_LEVELS
+
+DEFAULT_MAX_PENDING = 1000
+
+
+class AsyncSink:
+    """
+    Collects log entries from coroutines running on one event loop and writes them
+    from a worker thread, so the loop never blocks on file I/O.
+
+    Entries logged by any number of tasks before the flush task gets to run are
+    joined per log file and handed to LogKonfig.write_entry in one call. A single
+    worker thread keeps the entries in the order they were logged.
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, max_pending: int = DEFAULT_MAX_PENDING
+    ) -> None:
+        self.max_pending = max_pending
+        self._loop = loop
+        self._pending: dict[str | None, list] = {}
+        self._pending_levels: dict[str | None, str | None] = {}
+        self._pending_count = 0
+        self._flush_task: asyncio.Task | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="logkontrol-aio"
+        )
+
+    async def write(
+        self, log_file_path: str | None, log_entry: str, log_level: str | None = None
+    ) -> None:
+        """
+        Queues a formatted log entry for the next batched flush.
+
+        The call only waits for the flush when max_pending entries are queued.
+
+        Args:
+            log_file_path (str | None): The path of the log file, or None for the
+                console.
+            log_entry (str): The fully formatted log entry.
+            log_level (str | None, optional): The level of the entry.
+        """
+        self._pending.setdefault(log_file_path, []).append(log_entry)
+        if self._pending_levels.get(log_file_path) not in FLUSH_IMMEDIATELY_LEVELS:
+            self._pending_levels[log_file_path] = log_level
+        self._pending_count += 1
+        if self._flush_task is None:
+            self._flush_task = self._loop.create_task(self._flush_pending())
+        if self._pending_count >= self.max_pending:
+            await asyncio.shield(self._flush_task)
+
+    async def aflush(self) -> None:
+        """
+        Waits until every queued entry is written and the log files are flushed.
+        """
+        while self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+        await self._loop.run_in_executor(self._executor, LogKonfig().flush)
+
+    async def aclose(self) -> None:
+        """
+        Writes every queued entry, flushes the log files and stops the worker thread.
+        LogKonfig's writers and file handles stay open for the rest of the process;
+        call LogKonfig().shutdown() once nothing logs any more.
+        """
+        await self.aflush()
+        self._executor.shutdown(wait=False)
+
+    async def _flush_pending(self) -> None:
+        # Yield once so entries logged by other ready tasks join this batch.
+        await asyncio.sleep(0)
+        try:
+            while self._pending:
+                batch, levels = self._pending, self._pending_levels
+                self._pending, self._pending_levels = {}, {}
+                self._pending_count = 0
+                await self._loop.run_in_executor(
+                    self._executor, self._write_batch, batch, levels
+                )
+        finally:
+            self._flush_task = None
+
+    @staticmethod
+    def _write_batch(
+        batch: dict[str | None, list[str]], levels: dict[str | None, str | None]
+    ) -> None:
+        log_konfig = LogKonfig()
+        for log_file_path, log_entries in batch.items():
+            try:
+                log_konfig.write_entry(
+                    log_file_path,
+                    log_entries[0][:0].join(log_entries),
+                    levels.get(log_file_path),
+                )
+            except OSError as error:
+                print(f"Failed to write log file {log_file_path}: {error}")
+                log_konfig._metrics.record_error(log_file_path)
+
+
+_async_sinks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncSink]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_sink() -> AsyncSink:
+    """
+    Returns the AsyncSink of the running event loop, creating it if necessary.
+
+    Returns:
+        AsyncSink: The sink used by the alog_* coroutines on this loop.
+    """
+    loop = asyncio.get_running_loop()
+    sink = _async_sinks.get(loop)
+    if sink is None:
+        sink = AsyncSink(loop)
+        _async_sinks[loop] = sink
+    return sink
+
+
+async def _write_log_entry(
+    logging_config: dict, log_file_key: str, log_entry: str, log_level: str
+) -> None:
+    await get_async_sink().write(
+        _output_path(logging_config, log_file_key), log_entry, log_level
+    )
+
+
+async def _write_record(
+    logging_config: dict,
+    log_file_key: str,
+    log_entry: str,
+    log_level: str,
+    started: int,
+) -> None:
+    # Writes a record formatted since started and counts it in LogKonfig.stats().
+    formatted = time.perf_counter_ns()
+    await _write_log_entry(logging_config, log_file_key, log_entry, log_level)
+    LogKonfig._metrics.record(
+        log_file_key,
+        log_level,
+        len(log_entry),
+        formatted - started,
+        time.perf_counter_ns() - formatted,
+    )
+
+
+async def _admit_record(
+    compiled: CompiledConfig, log_file_key: str, log_level: str
+) -> bool:
+    admitted, summary = compiled.check_record(log_file_key, log_level)
+    if summary is not None:
+        await _write_log_entry(compiled.config, log_file_key, *summary)
+    if compiled.recorders and admitted and log_level in FLUSH_IMMEDIATELY_LEVELS:
+        for log_entry, entry_level in compiled.dump_recorder(
+            log_file_key, f"{log_level} record"
+        ):
+            await _write_log_entry(compiled.config, log_file_key, log_entry, entry_level)
+    return admitted
+
+
+async def _is_repeat(
+    compiled: CompiledConfig, log_file_key: str, log_level: str, content: tuple | None
+) -> bool:
+    repeated, summary = compiled.check_repeat(log_file_key, log_level, content)
+    if summary is not None:
+        await _write_log_entry(compiled.config, log_file_key, *summary)
+    return repeated
+
+
+async def _emit_routed(
+    compiled: CompiledConfig,
+    log_file_keys: tuple[str, ...],
+    kind: str,
+    first: Any,
+    second: Any,
+    log_level: str,
+) -> None:
+    # Writes a record to each of its destination keys, formatted once per formatter.
+    sink = get_async_sink()
+    for log_file_path, log_file_key, log_entry, entry_level, format_ns in (
+        compiled.route_record(log_file_keys, log_level, kind, first, second)
+    ):
+        formatted = time.perf_counter_ns()
+        await sink.write(log_file_path, log_entry, entry_level)
+        if format_ns is not None:
+            LogKonfig._metrics.record(
+                log_file_key,
+                entry_level,
+                len(log_entry),
+                format_ns,
+                time.perf_counter_ns() - formatted,
+            )
+
+
+async def _emit_function_call(
+    compiled: CompiledConfig,
+    log_file_key: str,
+    function_name: str,
+    kwargs: dict,
+    log_level: str,
+) -> None:
+    if compiled.routes is not None or not isinstance(log_file_key, str):
+        log_file_keys = compiled.destinations(log_file_key, log_level)
+        if len(log_file_keys) != 1:
+            await _emit_routed(
+                compiled, log_file_keys, "call", function_name, kwargs, log_level
+            )
+            return
+        log_file_key = log_file_keys[0]
+    if not await _admit_record(compiled, log_file_key, log_level):
+        if compiled.recorders:
+            compiled.record_filtered(
+                log_file_key, log_level, "call", function_name, kwargs
+            )
+        return
+    if compiled.is_coalescing(log_file_key):
+        _, kwargs = resolve_record(None, kwargs)
+        if await _is_repeat(
+            compiled, log_file_key, log_level, ("call", function_name, kwargs)
+        ):
+            return
+
+    started = time.perf_counter_ns()
+    log_entry = compiled.get_formatter(log_file_key).format_function_call(
+        function_name, kwargs, log_level
+    )
+    await _write_record(compiled.config, log_file_key, log_entry, log_level, started)
+
+
+async def alog_message(
+    log_file_key: str | list[str] | None,
+    message: str | None = None,
+    variables: dict | None = None,
+    log_level: str = "DEBUG",
+) -> None:
+    """
+    Logs a message and/or variable values to a file without blocking the event loop.
+
+    Args:
+        log_file_key (str | list[str]): The key of the log file path in the logging
+            configuration, or a list of keys to write the record to.
+        message (str, optional): The message to log, or a callable returning it that
+            is only called if the record passes level filtering. Defaults to None.
+        variables (dict, optional): A dictionary of variables and their values to log.
+            Values wrapped with lazy() are only computed if the record is written.
+            Defaults to None.
+        log_level (str, optional): The log level of the message. Defaults to "DEBUG".
+    """
+    compiled = _get_compiled_config()
+    if compiled is None:
+        return
+    logging_config = compiled.config
+    log_file_key = _resolve_log_file_key(logging_config, log_file_key)
+    if log_file_key is None:
+        return
+    if compiled.routes is not None or not isinstance(log_file_key, str):
+        log_file_keys = compiled.destinations(log_file_key, log_level)
+        if len(log_file_keys) != 1:
+            await _emit_routed(
+                compiled, log_file_keys, "message", message, variables, log_level
+            )
+            return
+        log_file_key = log_file_keys[0]
+    if not await _admit_record(compiled, log_file_key, log_level):
+        if compiled.recorders:
+            compiled.record_filtered(
+                log_file_key, log_level, "message", message, variables
+            )
+        return
+    if compiled.is_coalescing(log_file_key):
+        message, variables = resolve_record(message, variables)
+        if await _is_repeat(
+            compiled, log_file_key, log_level, ("message", message, variables)
+        ):
+            return
+
+    started = time.perf_counter_ns()
+    log_entry = compiled.get_formatter(log_file_key).format_message(
+        message, variables, log_level
+    )
+    await _write_record(logging_config, log_file_key, log_entry, log_level, started)
+
+
+async def alog_function_call(
+    log_file_key: str | list[str] | None,
+    function_name: str,
+    log_level: str = "DEBUG",
+    **kwargs,
+) -> None:
+    """
+    Logs a function call with its arguments without blocking the event loop.
+
+    Args:
+        log_file_key (str | list[str]): The key of the log file path in the logging
+            configuration, or a list of keys to write the record to.
+        function_name (str): The name of the function being called.
+        log_level (str, optional): The log level of the function call. Defaults to "DEBUG".
+        **kwargs: Keyword arguments representing the function's arguments.
+    """
+    compiled = _get_compiled_config()
+    if compiled is None:
+        return
+    log_file_key = _resolve_log_file_key(compiled.config, log_file_key)
+    if log_file_key is None:
+        return
+    await _emit_function_call(compiled, log_file_key, function_name, kwargs, log_level)
+
+
+async def alog_variable(
+    log_file_key: str | list[str] | None,
+    variable_name: str,
+    variable_value: Any,
+    log_level: str = "DEBUG",
+) -> None:
+    """
+    Logs a variable and its value without blocking the event loop.
+
+    Args:
+        log_file_key (str | list[str]): The key of the log file path in the logging
+            configuration, or a list of keys to write the record to.
+        variable_name (str): The name of the variable.
+        variable_value: The value of the variable, optionally wrapped with lazy().
+        log_level (str, optional): The log level of the variable. Defaults to "DEBUG".
+    """
+    compiled = _get_compiled_config()
+    if compiled is None:
+        return
+    logging_config = compiled.config
+    log_file_key = _resolve_log_file_key(logging_config, log_file_key)
+    if log_file_key is None:
+        return
+    if compiled.routes is not None or not isinstance(log_file_key, str):
+        log_file_keys = compiled.destinations(log_file_key, log_level)
+        if len(log_file_keys) != 1:
+            await _emit_routed(
+                compiled,
+                log_file_keys,
+                "message",
+                None,
+                {variable_name: variable_value},
+                log_level,
+            )
+            return
+        log_file_key = log_file_keys[0]
+    if not await _admit_record(compiled, log_file_key, log_level):
+        if compiled.recorders:
+            compiled.record_filtered(
+                log_file_key, log_level, "message", None, {variable_name: variable_value}
+            )
+        return
+    if compiled.is_coalescing(log_file_key):
+        variable_value = resolve_lazy(variable_value)
+        if await _is_repeat(
+            compiled,
+            log_file_key,
+            log_level,
+            ("message", None, {variable_name: variable_value}),
+        ):
+            return
+
+    started = time.perf_counter_ns()
+    log_entry = compiled.get_formatter(log_file_key).format_message(
+        None, {variable_name: variable_value}, log_level
+    )
+    await _write_record(logging_config, log_file_key, log_entry, log_level, started)
+
+
+async def alog_json_content(
+    log_file_key: str | list[str] | None,
+    json_content: dict | list[dict],
+    log_level: str = "DEBUG",
+    max_items: int | None = None,
+) -> None:
+    """
+    Logs the content of a JSON object or a list of JSON objects without blocking the
+    event loop.
+
+    Args:
+        log_file_key (str | list[str]): The key of the log file path in the logging
+            configuration, or a list of keys to write the record to.
+        json_content (dict | list[dict]): The JSON object or list of JSON objects to log.
+        log_level (str, optional): The log level of the JSON content. Defaults to "DEBUG".
+        max_items (int | None, optional): The maximum number of items of a list or
+            iterator to log. Defaults to None, which logs every item.
+    """
+    compiled = _get_compiled_config()
+    if compiled is None:
+        return
+    logging_config = compiled.config
+    log_file_key = _resolve_log_file_key(logging_config, log_file_key)
+    if log_file_key is None:
+        return
+    if compiled.routes is not None or not isinstance(log_file_key, str):
+        log_file_keys = compiled.destinations(log_file_key, log_level)
+        if len(log_file_keys) != 1:
+            await _emit_routed(
+                compiled, log_file_keys, "json", json_content, max_items, log_level
+            )
+            return
+        log_file_key = log_file_keys[0]
+    if not await _admit_record(compiled, log_file_key, log_level):
+        if compiled.recorders:
+            compiled.record_filtered(
+                log_file_key, log_level, "json", json_content, max_items
+            )
+        return
+    if compiled.is_coalescing(log_file_key):
+        # JSON content is not coalesced, but it does end a run of repeats.
+        await _is_repeat(compiled, log_file_key, log_level, None)
+
+    log_file_path = _output_path(logging_config, log_file_key)
+    started = time.perf_counter_ns()
+    log_entry = compiled.get_formatter(log_file_key).format_json(
+        json_content, log_level, max_items
+    )
+    formatted = time.perf_counter_ns()
+    await get_async_sink().write(log_file_path, log_entry, log_level)
+    LogKonfig._metrics.record(
+        log_file_key,
+        log_level,
+        len(log_entry),
+        formatted - started,
+        time.perf_counter_ns() - formatted,
+    )
+
+
+async def aflush() -> None:
+    """
+    Waits until every entry logged on the running event loop is written to its file.
+    """
+    await get_async_sink().aflush()
+
+
+async def aclose() -> None:
+    """
+    Writes every entry logged on the running event loop and closes the loop's sink.
+    Synchronous code and other event loops keep logging to the same files.
+    """
+    loop = asyncio.get_running_loop()
+    sink = _async_sinks.pop(loop, None)
+    if sink is None:
+        await loop.run_in_executor(None, LogKonfig().flush)
+        return
+    await sink.aclose()
@@ -0,0 +1,457 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import struct
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Iterator
+from .formatting import (
+    DEFAULT_LOG_FORMAT,
+    DEFAULT_TIMESTAMP_FORMAT,
+    RecordFormatter,
+    resolve_lazy,
+    truncate_string,
+)
+
+if TYPE_CHECKING:
+    import argparse
+    import mmap
+
+# A binary log file starts with MAGIC, followed by frames. Each frame is a
+# little-endian uint32 payload length and a payload whose first byte is its type.
+MAGIC = b"LKB\x01"
+FRAME_STRING = 1  # uint32 id, UTF-8 text: defines an interned string
+FRAME_MESSAGE = 2  # texts: the message, then each variable value by name
+FRAME_FUNCTION_CALL = 3  # texts: each argument by name, after the function name id
+FRAME_TEXT = 4  # texts: the rendered record body
+
+# A record frame holds its type, timestamp in microseconds since the epoch, level
+# code and number of texts. Then come the level name id for unknown levels, the
+# function name id for function calls, the name id of each named text, and the
+# texts, NUL-separated and UTF-8 encoded. Texts that contain NUL themselves are
+# written with a uint32 byte length each instead, and the type is flagged.
+_RECORD_FIELDS = struct.Struct("<BqBI")
+_RECORD_HEADER = struct.Struct("<I" + _RECORD_FIELDS.format[1:])
+LENGTH_PREFIXED = 0x80
+
+# Known levels are stored as one byte; other levels as 0 and an interned name id.
+LEVEL_CODES = {
+    "DEBUG": 1,
+    "TRUNCATED": 2,
+    "INFO": 3,
+    "WARNING": 4,
+    "WARN": 5,
+    "ERROR": 6,
+    "CRITICAL": 7,
+}
+LEVEL_NAMES = {code: name for name, code in LEVEL_CODES.items()}
+
+_LENGTH = struct.Struct("<I")
+_STRING_FRAME = struct.Struct("<IBI")
+# Cached name id sequences are dropped once this many are held.
+MAX_CACHED_NAME_SEQUENCES = 4096
+
+
+class BinaryFormatter:
+    """
+    Encodes records as compact length-prefixed binary frames.
+
+    Instead of rendered text, each frame holds an integer timestamp, a level code
+    and the record's values. Variable, argument and function names are interned:
+    the first record using a name is preceded by a frame defining its id, and
+    later records only store the id. file_header() repeats every definition made
+    so far, so each new or rotated file can be decoded on its own.
+
+    Files written in this format are read back with "python -m logkontrol decode".
+    """
+
+    binary = True
+
+    def __init__(self, log_file_key: str | None = None) -> None:
+        self.log_file_key = log_file_key
+        self._refs: dict[Any, bytes] = {}
+        self._sequences: dict[tuple, bytes] = {}
+        self._definitions: list[bytes] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict, log_file_key: str | None = None) -> "BinaryFormatter":
+        """
+        Builds a formatter for a log file key.
+
+        Args:
+            config (dict): The logging configuration.
+            log_file_key (str | None, optional): The log file key the formatter is for.
+
+        Returns:
+            BinaryFormatter: The formatter.
+        """
+        return cls(log_file_key)
+
+    def file_header(self) -> bytes:
+        """
+        Returns the bytes written at the start of each new file: the format marker
+        followed by the definitions of every interned string.
+        """
+        return MAGIC + self.definitions()
+
+    def definitions(self) -> bytes:
+        """
+        Returns the frames defining every interned string.
+        """
+        with self._lock:
+            return b"".join(self._definitions)
+
+    def _ref(self, name: Any, frames: list[bytes]) -> bytes:
+        # The packed id of an interned name; a new name's definition joins frames.
+        ref = self._refs.get(name)
+        if ref is not None:
+            return ref
+        with self._lock:
+            ref = self._refs.get(name)
+            if ref is None:
+                string_id = len(self._refs)
+                data = format(name).encode()
+                definition = _STRING_FRAME.pack(len(data) + 5, FRAME_STRING, string_id) + data
+                self._definitions.append(definition)
+                ref = _LENGTH.pack(string_id)
+                self._refs[name] = ref
+                frames.append(definition)
+        return ref
+
+    @staticmethod
+    def _texts(values: dict, truncated: bool) -> list[str]:
+        if truncated:
+            return [truncate_string(resolve_lazy(value)) for value in values.values()]
+        # LazyValue formats as the value it computes.
+        return list(map(format, values.values()))
+
+    def _name_refs(self, names, frames: list[bytes]) -> bytes:
+        # Records from one call site repeat the same names, so cache their ids.
+        key = tuple(names)
+        refs = self._sequences.get(key)
+        if refs is None:
+            refs = b"".join([self._ref(name, frames) for name in key])
+            if len(self._sequences) >= MAX_CACHED_NAME_SEQUENCES:
+                self._sequences.clear()
+            self._sequences[key] = refs
+        return refs
+
+    def _encode(
+        self,
+        frame_type: int,
+        log_level: str,
+        texts: list[str],
+        refs: bytes = b"",
+        frames: list[bytes] | None = None,
+        created: float | None = None,
+    ) -> bytes:
+        block = "\0".join(texts).encode()
+        count = len(texts)
+        if block.count(b"\0") != count - 1:
+            frame_type |= LENGTH_PREFIXED
+            encoded = [text.encode() for text in texts]
+            block = b"".join(_LENGTH.pack(len(data)) + data for data in encoded)
+        code = LEVEL_CODES.get(log_level, 0)
+        if code == 0:
+            frames = [] if frames is None else frames
+            refs = self._ref(str(log_level), frames) + refs
+        record = _RECORD_HEADER.pack(
+            _RECORD_FIELDS.size + len(refs) + len(block),
+            frame_type,
+            time.time_ns() // 1000 if created is None else int(created * 1_000_000),
+            code,
+            count,
+        )
+        if frames:
+            frames += (record, refs, block)
+            return b"".join(frames)
+        return b"".join((record, refs, block))
+
+    def format_message(
+        self,
+        message: Any,
+        variables: dict | None,
+        log_level: str,
+        created: float | None = None,
+    ) -> bytes:
+        """
+        Encodes the record written by log_message.
+
+        Args:
+            message: The message to log, or a callable returning it.
+            variables (dict | None): A dictionary of variables and their values to log.
+            log_level (str): The log level of the message.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            bytes: The record frame, preceded by any new string definitions.
+        """
+        truncated = log_level == "TRUNCATED"
+        if callable(message):
+            message = message()
+        if not message:
+            message = ""
+        elif truncated:
+            message = truncate_string(message)
+        if not variables:
+            return self._encode(
+                FRAME_MESSAGE, log_level, [format(message)], created=created
+            )
+        frames: list[bytes] = []
+        refs = self._sequences.get(tuple(variables)) or self._name_refs(variables, frames)
+        if truncated:
+            texts = [format(message)] + self._texts(variables, truncated)
+        else:
+            # LazyValue formats as the value it computes.
+            texts = [format(message), *map(format, variables.values())]
+        return self._encode(FRAME_MESSAGE, log_level, texts, refs, frames, created)
+
+    def format_function_call(
+        self,
+        function_name: str,
+        kwargs: dict,
+        log_level: str,
+        created: float | None = None,
+    ) -> bytes:
+        """
+        Encodes the record written by log_function_call.
+
+        Args:
+            function_name (str): The name of the function being called.
+            kwargs (dict): The function's arguments.
+            log_level (str): The log level of the function call.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            bytes: The record frame, preceded by any new string definitions.
+        """
+        frames: list[bytes] = []
+        refs = self._sequences.get(tuple(kwargs)) or self._name_refs(kwargs, frames)
+        return self._encode(
+            FRAME_FUNCTION_CALL,
+            log_level,
+            self._texts(kwargs, log_level == "TRUNCATED"),
+            (self._refs.get(function_name) or self._ref(function_name, frames)) + refs,
+            frames,
+            created,
+        )
+
+    def format_json(
+        self,
+        json_content: Any,
+        log_level: str,
+        max_items: int | None = None,
+        created: float | None = None,
+    ) -> bytes:
+        """
+        Encodes the record written by log_json_content. The JSON body is stored as
+        the text the text format renders for it.
+
+        Args:
+            json_content (dict | list[dict]): The JSON content to log.
+            log_level (str): The log level of the JSON content.
+            max_items (int | None, optional): The maximum number of items to write.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            bytes: The record frame, preceded by any new string definitions.
+        """
+        body = "".join(RecordFormatter._iter_json_body(json_content, max_items))
+        return self._encode(FRAME_TEXT, log_level, [body], created=created)
+
+    def iter_json(
+        self,
+        json_content: Any,
+        log_level: str,
+        max_items: int | None = None,
+        created: float | None = None,
+    ):
+        """
+        Yields the record written by log_json_content as a single frame.
+        """
+        yield self.format_json(json_content, log_level, max_items, created)
+
+
+class BinaryDecoder:
+    """
+    Renders the records of a binary log file in the text format.
+
+    Args:
+        log_format (str, optional): The log_format to render records with.
+        timestamp_format (str, optional): The timestamp_format to render records with.
+    """
+
+    def __init__(
+        self,
+        log_format: str = DEFAULT_LOG_FORMAT,
+        timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT,
+    ) -> None:
+        self._formatter = RecordFormatter(log_format, timestamp_format)
+        self.timestamp_format = timestamp_format
+
+    @staticmethod
+    def iter_frames(data: "bytes | mmap.mmap") -> Iterator[bytes]:
+        """
+        Yields the payload of each complete frame of a binary log file. The first
+        byte of a payload is the frame type.
+
+        Raises:
+            ValueError: If the data does not start with the binary format marker.
+        """
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not a logkontrol binary log file")
+        offset, size = len(MAGIC), len(data)
+        while offset + 5 <= size:
+            (length,) = _LENGTH.unpack_from(data, offset)
+            end = offset + 4 + length
+            if end > size:
+                break  # A record still being written.
+            yield data[offset + 4 : end]
+            offset = end
+
+    def decode(self, data: "bytes | mmap.mmap") -> Iterator[str]:
+        """
+        Yields each record of a binary log file rendered as a text log entry.
+
+        Strings are resolved in a first pass over the file, so records may use
+        names defined later in the file by another thread's record.
+
+        Args:
+            data (bytes | mmap.mmap): The content of the binary log file.
+
+        Yields:
+            str: The text log entries, in file order.
+        """
+        strings: dict[int, str] = {}
+        for payload in self.iter_frames(data):
+            if payload[0] == FRAME_STRING:
+                (string_id,) = _LENGTH.unpack_from(payload, 1)
+                strings[string_id] = payload[5:].decode()
+        for payload in self.iter_frames(data):
+            if payload[0] != FRAME_STRING:
+                yield self._render(payload, strings)
+
+    def _render(self, payload: bytes, strings: dict[int, str]) -> str:
+        reader = _FrameReader(payload, strings)
+        frame_type = reader.frame_type
+        log_level = LEVEL_NAMES.get(reader.code) or reader.name()
+        if frame_type == FRAME_TEXT:
+            (body,), _ = reader.texts(unnamed=1)
+        elif frame_type == FRAME_FUNCTION_CALL:
+            lines = [f"Function Call: {reader.name()}()\n"]
+            texts, names = reader.texts(unnamed=0)
+            lines += [f"  {name}: {text}\n" for name, text in zip(names, texts)]
+            message = "".join(lines)
+            if log_level == "TRUNCATED":
+                message = truncate_string(message)
+            body = f"Message: {message}\n"
+        else:
+            (message, *texts), names = reader.texts(unnamed=1)
+            lines = [f"Message: {message}\n"] if message else []
+            lines += [f"{name}: {text}\n" for name, text in zip(names, texts)]
+            body = "".join(lines)
+        from datetime import datetime
+
+        timestamp = datetime.fromtimestamp(reader.timestamp / 1e6)
+        return self._formatter.render(
+            log_level, body, timestamp.strftime(self.timestamp_format)
+        )
+
+
+class _FrameReader:
+    """Reads the fields of a record frame's payload in order."""
+
+    def __init__(self, payload: bytes, strings: dict[int, str]) -> None:
+        self.payload = payload
+        self.strings = strings
+        frame_type, self.timestamp, self.code, self.count = _RECORD_FIELDS.unpack_from(
+            payload, 0
+        )
+        self.frame_type = frame_type & ~LENGTH_PREFIXED
+        self.length_prefixed = bool(frame_type & LENGTH_PREFIXED)
+        self.offset = _RECORD_FIELDS.size
+
+    def name(self) -> str:
+        (string_id,) = _LENGTH.unpack_from(self.payload, self.offset)
+        self.offset += 4
+        return self.strings.get(string_id, f"<unknown name {string_id}>")
+
+    def texts(self, unnamed: int) -> tuple[list[str], list[str]]:
+        # Returns the texts of the record and the names of all but the first unnamed.
+        names = [self.name() for _ in range(self.count - unnamed)]
+        if not self.length_prefixed:
+            return self.payload[self.offset :].decode().split("\0"), names
+        texts = []
+        for _ in range(self.count):
+            (length,) = _LENGTH.unpack_from(self.payload, self.offset)
+            self.offset += 4 + length
+            texts.append(self.payload[self.offset - length : self.offset].decode())
+        return texts, names
+
+
+def decode_file(path: str, decoder: BinaryDecoder | None = None) -> Iterator[str]:
+    """
+    Yields the records of a binary log file, or a gzip-compressed rotated one,
+    rendered as text log entries.
+
+    Args:
+        path (str): The path of the binary log file.
+        decoder (BinaryDecoder | None, optional): The decoder setting the text format.
+
+    Yields:
+        str: The text log entries, in file order.
+    """
+    decoder = decoder or BinaryDecoder()
+    if path.endswith(".gz"):
+        import gzip
+
+        with gzip.open(path, "rb") as log_file:
+            yield from decoder.decode(log_file.read())
+        return
+    import mmap
+
+    with open(path, "rb") as log_file:
+        if not log_file.seek(0, 2):
+            return
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from decoder.decode(data)
+
+
+def add_arguments(parser: "argparse.ArgumentParser") -> None:
+    """
+    Adds the arguments of the decode command to a parser.
+    """
+    parser.add_argument("paths", nargs="+", help="binary log files to decode")
+    parser.add_argument(
+        "--log-format", default=DEFAULT_LOG_FORMAT, help="the log_format to render with"
+    )
+    parser.add_argument(
+        "--timestamp-format",
+        default=DEFAULT_TIMESTAMP_FORMAT,
+        help="the timestamp_format to render with",
+    )
+    parser.set_defaults(func=run)
+
+
+def run(args: "argparse.Namespace") -> int:
+    """
+    Runs the decode command, writing the decoded records to stdout.
+
+    Returns:
+        int: The exit status.
+    """
+    decoder = BinaryDecoder(args.log_format, args.timestamp_format)
+    for path in args.paths:
+        try:
+            for entry in decode_file(path, decoder):
+                sys.stdout.write(entry)
+        except (OSError, ValueError) as error:
+            print(f"Failed to decode log file {path}: {error}", file=sys.stderr)
+            return 1
+    sys.stdout.flush()
+    return 0
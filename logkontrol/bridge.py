@@ -0,0 +1,278 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import atexit
+import logging
+import threading
+import time
+from .coalescing import resolve_record
+from .logkontrol import LogKonfig
+from .sinks import FLUSH_IMMEDIATELY_LEVELS
+
+DEFAULT_CAPACITY = 128
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# The logkontrol level of each standard logging level, from highest to lowest.
+_STANDARD_LEVELS = (
+    (logging.CRITICAL, "CRITICAL"),
+    (logging.ERROR, "ERROR"),
+    (logging.WARNING, "WARNING"),
+    (logging.INFO, "INFO"),
+    (logging.DEBUG, "DEBUG"),
+)
+
+
+def level_name(levelno: int) -> str:
+    """
+    Returns the logkontrol level of a logging level number. Custom levels map to
+    the closest standard level below them, and levels below DEBUG to DEBUG.
+    """
+    for number, name in _STANDARD_LEVELS:
+        if levelno >= number:
+            return name
+    return "DEBUG"
+
+
+class LogKontrolHandler(logging.Handler):
+    """
+    Routes records of the standard logging module into a logkontrol log file key.
+
+    Records go through the key's level threshold, rate limits, sampling and
+    coalescing before their message is built, and are formatted like log_message()
+    records, with the logger name as a variable. Formatted entries are kept and
+    written to their file together once `capacity` of them are pending, a record of
+    `flush_level` or above arrives, the oldest has waited `flush_interval` seconds,
+    or on flush(), close() and interpreter exit. A daemon thread, started with the
+    first pending entry, writes entries whose interval has passed when no further
+    record arrives.
+    """
+
+    def __init__(
+        self,
+        log_file_key: str | None = None,
+        level: int = logging.NOTSET,
+        capacity: int = DEFAULT_CAPACITY,
+        flush_level: int = logging.ERROR,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        """
+        Args:
+            log_file_key (str | None, optional): The key of the log file path in the
+                logging configuration. Defaults to the only configured key.
+            level (int, optional): The handler's logging level. Defaults to NOTSET.
+            capacity (int, optional): The number of pending entries that triggers a
+                write. Defaults to 128.
+            flush_level (int, optional): Records at this logging level or above are
+                written at once, with everything pending. Defaults to ERROR.
+            flush_interval (float, optional): The maximum number of seconds an entry
+                waits for the next record before it is written. Defaults to 1.
+        """
+        super().__init__(level)
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.log_file_key = log_file_key
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self.flush_interval = flush_interval
+        self._konfig = LogKonfig()
+        self._logger = self._konfig.get_logger(log_file_key)
+        self._compiled = None
+        self._pending: dict[str | None, list] = {}
+        self._pending_levels: dict[str | None, str] = {}
+        # The key, level, size and formatting time of each pending record, counted
+        # in LogKonfig.stats() once the record is written.
+        self._measured: dict[str | None, list[tuple]] = {}
+        self._pending_count = 0
+        self._oldest = 0.0
+        self._flusher: threading.Thread | None = None
+        self._stop = threading.Event()
+        # Registered after LogKonfig's own exit handler, so it runs first.
+        atexit.register(self.flush)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._emit(record)
+        except Exception:
+            self.handleError(record)
+
+    def _emit(self, record: logging.LogRecord) -> None:
+        logger = self._logger
+        binding = logger._binding
+        if binding[0] is not self._konfig._compiled:
+            binding = logger._bind()
+        compiled, log_file_key, log_file_path = binding
+        if compiled is not self._compiled:
+            # Entries formatted under the previous configuration go to its files.
+            self._write_pending()
+            self._compiled = compiled
+        if log_file_key is None:
+            return
+        log_level = level_name(record.levelno)
+        if compiled.routes is not None:
+            log_file_keys = compiled.routes.destinations(log_file_key, log_level)
+            if len(log_file_keys) > 1:
+                self._emit_routed(compiled, log_file_keys, record, log_level)
+                return
+        admitted, summary = compiled.check_record(log_file_key, log_level)
+        if summary is not None:
+            self._add(log_file_path, *summary)
+        if not admitted:
+            if compiled.recorders:
+                if self.formatter is None and not record.exc_info:
+                    # The message is only built if the recorder is dumped.
+                    message, variables = record.getMessage, {"logger": record.name}
+                else:
+                    message, variables = self._content(record)
+                compiled.record_filtered(
+                    log_file_key, log_level, "message", message, variables
+                )
+            return
+        if compiled.recorders and log_level in FLUSH_IMMEDIATELY_LEVELS:
+            for log_entry, entry_level in compiled.dump_recorder(
+                log_file_key, f"{log_level} record"
+            ):
+                self._add(log_file_path, log_entry, entry_level)
+
+        message, variables = self._content(record)
+        if compiled.is_coalescing(log_file_key):
+            message, variables = resolve_record(message, variables)
+            repeated, summary = compiled.check_repeat(
+                log_file_key, log_level, ("message", message, variables)
+            )
+            if summary is not None:
+                self._add(log_file_path, *summary)
+            if repeated:
+                return
+
+        started = time.perf_counter_ns()
+        log_entry = compiled.get_formatter(log_file_key).format_message(
+            message, variables, log_level
+        )
+        self._add(
+            log_file_path,
+            log_entry,
+            log_level,
+            (log_file_key, log_level, len(log_entry), time.perf_counter_ns() - started),
+        )
+        self._write_if_due(record)
+
+    def _emit_routed(
+        self,
+        compiled,
+        log_file_keys: tuple[str, ...],
+        record: logging.LogRecord,
+        log_level: str,
+    ) -> None:
+        # Each destination key filters the record; it is formatted once per formatter.
+        message, variables = self._content(record)
+        routed = compiled.route_record(
+            log_file_keys, log_level, "message", message, variables
+        )
+        for log_file_path, log_file_key, log_entry, entry_level, format_ns in routed:
+            measured = None
+            if format_ns is not None:
+                measured = (log_file_key, entry_level, len(log_entry), format_ns)
+            self._add(log_file_path, log_entry, entry_level, measured)
+        self._write_if_due(record)
+
+    def _write_if_due(self, record: logging.LogRecord) -> None:
+        if (
+            self._pending_count >= self.capacity
+            or record.levelno >= self.flush_level
+            or time.monotonic() - self._oldest >= self.flush_interval
+        ):
+            self._write_pending()
+
+    def _content(self, record: logging.LogRecord) -> tuple[str, dict]:
+        variables = {"logger": record.name}
+        if self.formatter is not None:
+            return self.format(record), variables
+        if record.exc_info:
+            variables["exception"] = logging.Formatter().formatException(
+                record.exc_info
+            )
+        return record.getMessage(), variables
+
+    def _add(
+        self,
+        log_file_path: str | None,
+        log_entry,
+        log_level: str,
+        measured: tuple | None = None,
+    ) -> None:
+        if not self._pending_count:
+            self._oldest = time.monotonic()
+            self._start_flusher()
+        self._pending.setdefault(log_file_path, []).append(log_entry)
+        if measured is not None:
+            self._measured.setdefault(log_file_path, []).append(measured)
+        if self._pending_levels.get(log_file_path) not in FLUSH_IMMEDIATELY_LEVELS:
+            self._pending_levels[log_file_path] = log_level
+        self._pending_count += 1
+
+    def _write_pending(self) -> None:
+        if not self._pending_count:
+            return
+        pending, levels, measured = self._pending, self._pending_levels, self._measured
+        self._pending, self._pending_levels, self._measured = {}, {}, {}
+        self._pending_count = 0
+        metrics = self._konfig._metrics
+        for log_file_path, log_entries in pending.items():
+            started = time.perf_counter_ns()
+            try:
+                self._konfig.write_entry(
+                    log_file_path,
+                    log_entries[0][:0].join(log_entries),
+                    levels[log_file_path],
+                )
+            except OSError as error:
+                print(f"Failed to write log file {log_file_path}: {error}")
+                metrics.record_error(log_file_path)
+                continue
+            records = measured.get(log_file_path, ())
+            # Every record of the batch is charged an equal share of its write.
+            write_ns = (time.perf_counter_ns() - started) // max(len(records), 1)
+            for log_file_key, log_level, size, format_ns in records:
+                metrics.record(log_file_key, log_level, size, format_ns, write_ns)
+
+    def _start_flusher(self) -> None:
+        # Also restarts the thread in a forked child, where it no longer runs.
+        flusher = self._flusher
+        if self.flush_interval <= 0 or self._stop.is_set():
+            return
+        if flusher is None or not flusher.is_alive():
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name="logkontrol-handler", daemon=True
+            )
+            self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        delay = self.flush_interval
+        while not self._stop.wait(delay):
+            with self.lock:
+                delay = self.flush_interval
+                if self._pending_count:
+                    waited = time.monotonic() - self._oldest
+                    if waited >= self.flush_interval:
+                        self._write_pending()
+                    else:
+                        delay -= waited
+
+    def flush(self) -> None:
+        """
+        Writes every pending entry to its file.
+        """
+        with self.lock:
+            self._write_pending()
+
+    def close(self) -> None:
+        """
+        Writes every pending entry and detaches the handler.
+        """
+        self._stop.set()
+        flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+        self.flush()
+        atexit.unregister(self.flush)
+        super().close()
@@ -0,0 +1,116 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import marshal
+import os
+import stat
+import sys
+
+CACHE_VERSION = 1
+# marshal data is only guaranteed to load in the Python version that wrote it.
+_CACHE_TAG = (CACHE_VERSION, sys.version_info[:2])
+
+
+def config_signature(config_file_path: str) -> tuple[str, int, int]:
+    """
+    Identifies the current content of a config file by its absolute path,
+    modification time and size.
+
+    Args:
+        config_file_path (str): The path of the configuration file.
+
+    Returns:
+        tuple[str, int, int]: The absolute path, mtime in nanoseconds and size.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    stat = os.stat(config_file_path)
+    return os.path.abspath(config_file_path), stat.st_mtime_ns, stat.st_size
+
+
+def _is_private(cache_file) -> bool:
+    # Whoever can write the cache decides which files are logged to, so only a
+    # regular file owned by this user and writable by nobody else is trusted.
+    status = os.fstat(cache_file.fileno())
+    if not stat.S_ISREG(status.st_mode) or status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    return not hasattr(os, "geteuid") or status.st_uid == os.geteuid()
+
+
+def _read_entries(cache_path: str) -> dict:
+    try:
+        with open(cache_path, "rb") as cache_file:
+            if not _is_private(cache_file):
+                return {}
+            tag, entries = marshal.load(cache_file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if tag != _CACHE_TAG or not isinstance(entries, dict):
+        return {}
+    return entries
+
+
+def read_cached_config(
+    cache_path: str, signature: tuple[str, int, int]
+) -> dict | None:
+    """
+    Returns the configuration cached for a config file, if the file has not changed
+    since it was cached. Cache files owned by another user, or writable by other
+    users, are ignored.
+
+    Args:
+        cache_path (str): The path of the cache file.
+        signature (tuple[str, int, int]): The config file's config_signature().
+
+    Returns:
+        dict | None: The cached configuration, or None if there is none for this
+            version of the file.
+    """
+    entry = _read_entries(cache_path).get(signature[0])
+    if entry is None or tuple(entry[:2]) != signature[1:]:
+        return None
+    return entry[2]
+
+
+def write_cached_config(
+    cache_path: str, signature: tuple[str, int, int], config: dict
+) -> bool:
+    """
+    Caches the parsed configuration of a config file.
+
+    The cache file is replaced in one step, so readers never see a partial file,
+    and is only readable and writable by the current user. Configurations holding
+    values marshal cannot store, such as dates, and cache files that cannot be
+    written are skipped.
+
+    Args:
+        cache_path (str): The path of the cache file.
+        signature (tuple[str, int, int]): The config file's config_signature().
+        config (dict): The configuration loaded from the file.
+
+    Returns:
+        bool: True if the configuration was cached.
+    """
+    entries = _read_entries(cache_path)
+    entries[signature[0]] = (signature[1], signature[2], config)
+    try:
+        data = marshal.dumps((_CACHE_TAG, entries))
+    except ValueError:
+        return False
+    temporary = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except OSError:
+        return False
+    try:
+        with os.fdopen(descriptor, "wb") as cache_file:
+            cache_file.write(data)
+        os.replace(temporary, cache_path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        return False
+    return True
@@ -0,0 +1,193 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import threading
+import time
+from typing import Any, Callable
+from .formatting import DEFAULT_TIMESTAMP_FORMAT, resolve_lazy
+
+DEFAULT_WINDOW_SECONDS = 60.0
+
+
+def resolve_record(message: Any, variables: dict | None) -> tuple[Any, dict | None]:
+    """
+    Computes a callable message and lazy variable values, so identical records can
+    be recognized before they are formatted.
+
+    Args:
+        message: The message, or a callable returning it.
+        variables (dict | None): The variables, possibly holding lazy() values.
+
+    Returns:
+        tuple[Any, dict | None]: The message and variables with nothing deferred.
+    """
+    if callable(message):
+        message = message()
+    if variables:
+        variables = {name: resolve_lazy(value) for name, value in variables.items()}
+    return message, variables
+
+
+def fingerprint(content: tuple) -> tuple[int, Any]:
+    """
+    Returns a cheap hash of a record's content, and the value it was computed from.
+
+    Content holding unhashable values such as dicts and lists is hashed through its
+    repr().
+
+    Args:
+        content (tuple): The log level, message and values of the record.
+
+    Returns:
+        tuple[int, Any]: The hash and the hashed value, for comparing on a match.
+    """
+    try:
+        return hash(content), content
+    except TypeError:
+        text = repr(content)
+        return hash(text), text
+
+
+class RepeatRun:
+    """
+    A run of records identical to the last record written to a log file key.
+    """
+
+    __slots__ = ("log_level", "count", "first", "last")
+
+    def __init__(self, log_level: str, now: float) -> None:
+        self.log_level = log_level
+        self.count = 0
+        self.first = now
+        self.last = now
+
+
+class Coalescer:
+    """
+    Holds back records identical to the previous record of a log file key.
+
+    The first record of a run is written as usual. Its repeats are only counted,
+    and a single summary stands in for them once a different record arrives, or
+    once the run has lasted window_seconds, after which counting starts over. A
+    timer calls expire() so that a run that stopped is summarized without waiting
+    for the next record.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT,
+    ) -> None:
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        self.window_seconds = window_seconds
+        self.timestamp_format = timestamp_format
+        self._last: tuple[int, Any] | None = None
+        self._run: RepeatRun | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, options: dict | bool | None, timestamp_format: str) -> "Coalescer":
+        """
+        Builds a coalescer from a log key's entry in the "coalescing" config section.
+
+        Args:
+            options (dict | bool | None): True, or a dict with window_seconds.
+            timestamp_format (str): The format of the timestamps in summaries.
+
+        Returns:
+            Coalescer: The coalescer of the key.
+        """
+        if options is True or options is None:
+            options = {}
+        if not isinstance(options, dict):
+            raise ValueError(f"Invalid coalescing options: {options!r}")
+        unknown = set(options) - {"window_seconds"}
+        if unknown:
+            raise ValueError(f"Unknown coalescing options: {', '.join(sorted(unknown))}")
+        return cls(
+            float(options.get("window_seconds", DEFAULT_WINDOW_SECONDS)), timestamp_format
+        )
+
+    def observe(
+        self, log_level: str, content: tuple | None
+    ) -> tuple[bool, RepeatRun | None]:
+        """
+        Checks a record against the previous one.
+
+        Args:
+            log_level (str): The log level of the record.
+            content (tuple | None): The resolved content of the record, or None for
+                records that are never coalesced, such as JSON content.
+
+        Returns:
+            tuple[bool, RepeatRun | None]: Whether the record is a repeat that must
+                not be written, and a finished run to summarize, if any.
+        """
+        current = None if content is None else fingerprint((log_level, *content))
+        now = time.time()
+        with self._lock:
+            last = self._last
+            if (
+                current is not None
+                and last is not None
+                and last[0] == current[0]
+                and last[1] == current[1]
+            ):
+                run = self._run
+                if run is None:
+                    run = self._run = RepeatRun(log_level, now)
+                run.count += 1
+                run.last = now
+                if now - run.first >= self.window_seconds:
+                    self._run = None
+                    return True, run
+                return True, None
+            self._last = current
+            run, self._run = self._run, None
+            return False, run
+
+    def expire(self, emit: Callable[[RepeatRun], None]) -> None:
+        """
+        Ends the current run if it has lasted window_seconds. The run is passed to
+        emit while the key's next record waits, so its summary is written first.
+
+        Args:
+            emit (Callable[[RepeatRun], None]): Writes the summary of the run.
+        """
+        now = time.time()
+        with self._lock:
+            run = self._run
+            if run is None or now - run.first < self.window_seconds:
+                return
+            self._run = None
+            emit(run)
+
+    def drain(self) -> RepeatRun | None:
+        """
+        Ends the current run, if any, and returns it for a summary.
+        """
+        with self._lock:
+            run, self._run = self._run, None
+            return run
+
+    def describe(self, run: RepeatRun) -> tuple[str, dict[str, str]]:
+        """
+        Describes a finished run as the message and variables of a summary record.
+
+        Args:
+            run (RepeatRun): The finished run.
+
+        Returns:
+            tuple[str, dict[str, str]]: The message and the first and last times the
+                record was repeated.
+        """
+        return f"Last record repeated {run.count} times", {
+            "first_repeat": self._format_time(run.first),
+            "last_repeat": self._format_time(run.last),
+        }
+
+    def _format_time(self, timestamp: float) -> str:
+        from datetime import datetime
+
+        return datetime.fromtimestamp(timestamp).strftime(self.timestamp_format)
@@ -0,0 +1,648 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import argparse
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import threading
+import time
+import weakref
+from typing import Callable, Iterable
+from .sinks import FLUSH_IMMEDIATELY_LEVELS, SinkPool
+
+DEFAULT_COLLECTOR_BATCH_SIZE = 256
+DEFAULT_COLLECTOR_FLUSH_INTERVAL_MS = 100
+DEFAULT_COLLECTOR_TIMEOUT = 1.0
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_STOP_TIMEOUT = 5.0
+INITIAL_BACKOFF = 0.5
+# Frames larger than this are treated as a corrupt stream.
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+# The longest path and level a record header can describe.
+MAX_PATH_BYTES = 0xFFFF
+MAX_LEVEL_BYTES = 0xFF
+
+# A frame is its length followed by its records. Each record is a flags byte, the
+# lengths of its path, level and entry, then the path, level and entry themselves.
+FRAME_HEADER = struct.Struct("!I")
+RECORD_HEADER = struct.Struct("!BHBI")
+BINARY_ENTRY = 1
+
+COLLECTOR_OPTIONS = frozenset(
+    {
+        "socket_path",
+        "batch_size",
+        "flush_interval_ms",
+        "timeout_seconds",
+        "max_backoff_seconds",
+    }
+)
+
+
+def encode_batch(records: Iterable[tuple[str, str | bytes, str | None]]) -> bytes:
+    """
+    Encodes formatted records as one frame.
+
+    Args:
+        records (Iterable[tuple[str, str | bytes, str | None]]): The path, entry and
+            level of each record.
+
+    Returns:
+        bytes: The frame, length included.
+
+    Raises:
+        ValueError: If a path is longer than MAX_PATH_BYTES, a level is longer than
+            MAX_LEVEL_BYTES, or the frame would be larger than MAX_FRAME_BYTES.
+    """
+    parts = [b""]
+    size = 0
+    for path, log_entry, log_level in records:
+        flags = 0
+        if isinstance(log_entry, str):
+            log_entry = log_entry.encode("utf-8")
+        else:
+            flags = BINARY_ENTRY
+        path_bytes = path.encode("utf-8")
+        level_bytes = (log_level or "").encode("utf-8")
+        if len(path_bytes) > MAX_PATH_BYTES:
+            raise ValueError(f"Log file path of {len(path_bytes)} bytes is too long")
+        if len(level_bytes) > MAX_LEVEL_BYTES:
+            raise ValueError(f"Log level of {len(level_bytes)} bytes is too long")
+        size += RECORD_HEADER.size + len(path_bytes) + len(level_bytes) + len(log_entry)
+        if size > MAX_FRAME_BYTES:
+            raise ValueError(f"Collector frame larger than {MAX_FRAME_BYTES} bytes")
+        parts.append(
+            RECORD_HEADER.pack(flags, len(path_bytes), len(level_bytes), len(log_entry))
+        )
+        parts += (path_bytes, level_bytes, log_entry)
+    payload = b"".join(parts)
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def decode_batch(payload: bytes) -> list[tuple[str, str | bytes, str | None]]:
+    """
+    Decodes the records of a frame, without its length.
+
+    Args:
+        payload (bytes): The frame payload.
+
+    Returns:
+        list[tuple[str, str | bytes, str | None]]: The path, entry and level of each
+            record, in order.
+
+    Raises:
+        ValueError: If the payload is truncated.
+    """
+    records = []
+    view = memoryview(payload)
+    offset = 0
+    while offset < len(payload):
+        if offset + RECORD_HEADER.size > len(payload):
+            raise ValueError("Truncated collector frame")
+        flags, path_size, level_size, entry_size = RECORD_HEADER.unpack_from(
+            payload, offset
+        )
+        offset += RECORD_HEADER.size
+        end = offset + path_size + level_size + entry_size
+        if end > len(payload):
+            raise ValueError("Truncated collector frame")
+        path = str(view[offset : offset + path_size], "utf-8")
+        offset += path_size
+        log_level = str(view[offset : offset + level_size], "utf-8") or None
+        offset += level_size
+        log_entry = bytes(view[offset:end])
+        if not flags & BINARY_ENTRY:
+            log_entry = log_entry.decode("utf-8")
+        records.append((path, log_entry, log_level))
+        offset = end
+    return records
+
+
+def write_batch(
+    write: Callable[[str, str | bytes, str | None], None],
+    records: list[tuple[str, str | bytes, str | None]],
+    on_error: Callable[[str], None] | None = None,
+) -> None:
+    """
+    Writes records with one call per log file, in the order the files first appear.
+    Each file is written at the most severe of its records' flush levels.
+
+    Args:
+        write (Callable[[str, str | bytes, str | None], None]): Writes an entry to
+            the log file at a path.
+        records (list[tuple[str, str | bytes, str | None]]): The path, entry and
+            level of each record.
+        on_error (Callable[[str], None] | None, optional): Called with the path of
+            each log file that could not be written.
+    """
+    grouped: dict[str, list] = {}
+    levels: dict[str, str | None] = {}
+    for path, log_entry, log_level in records:
+        grouped.setdefault(path, []).append(log_entry)
+        if levels.get(path) not in FLUSH_IMMEDIATELY_LEVELS:
+            levels[path] = log_level
+    for path, log_entries in grouped.items():
+        try:
+            write(path, log_entries[0][:0].join(log_entries), levels[path])
+        except OSError as error:
+            print(f"Failed to write log file {path}: {error}")
+            if on_error is not None:
+                on_error(path)
+
+
+class CollectorClient:
+    """
+    Sends formatted records to a collector process over a Unix domain socket, so
+    that only the collector writes the log files.
+
+    Records are sent in frames of up to batch_size records, as soon as an ERROR
+    record arrives, every flush_interval_ms, and on flush() and close(). While the
+    collector cannot be reached, and for batches that do not fit in a frame, records
+    are written to the files directly. Connecting is retried with a backoff that
+    doubles up to max_backoff seconds. A forked child drops the parent's connection
+    and pending records and connects on its own.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        sink_pool: SinkPool,
+        batch_size: int = DEFAULT_COLLECTOR_BATCH_SIZE,
+        flush_interval_ms: float = DEFAULT_COLLECTOR_FLUSH_INTERVAL_MS,
+        timeout: float = DEFAULT_COLLECTOR_TIMEOUT,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        on_error: Callable[[str], None] | None = None,
+    ) -> None:
+        """
+        Args:
+            socket_path (str): The path of the collector's socket.
+            sink_pool (SinkPool): The pool batches are written to while the collector
+                cannot be reached.
+            batch_size (int, optional): The number of records sent per frame.
+                Defaults to 256.
+            flush_interval_ms (float, optional): The longest time a record waits
+                before it is sent. Defaults to 100.
+            timeout (float, optional): The number of seconds connecting or sending
+                may take before the collector is considered unreachable. Defaults to 1.
+            max_backoff (float, optional): The longest wait, in seconds, between
+                attempts to reconnect. Defaults to 30.
+            on_error (Callable[[str], None] | None, optional): Called with the path
+                of each log file a batch could not be written to.
+        """
+        if batch_size <= 0:
+            raise ValueError("collector batch_size must be positive")
+        if flush_interval_ms <= 0 or timeout <= 0 or max_backoff <= 0:
+            raise ValueError(
+                "collector flush_interval_ms, timeout_seconds and max_backoff_seconds "
+                "must be positive"
+            )
+        self.socket_path = socket_path
+        self.sink_pool = sink_pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self._on_error = on_error
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, str | bytes, str | None]] = []
+        self._socket: socket.socket | None = None
+        self._backoff = INITIAL_BACKOFF
+        self._retry_at = 0.0
+        self._closed = False
+        self._start_flusher()
+        _clients.add(self)
+
+    @classmethod
+    def from_config(
+        cls,
+        sink_pool: SinkPool,
+        options: dict,
+        on_error: Callable[[str], None] | None = None,
+    ) -> "CollectorClient":
+        """
+        Builds a client from the "collector" config section.
+
+        Args:
+            sink_pool (SinkPool): The pool written to while the collector is down.
+            options (dict): The collector options.
+            on_error (Callable[[str], None] | None, optional): Called with the path of
+                each log file a batch could not be written to.
+
+        Returns:
+            CollectorClient: A client that connects on its first send.
+        """
+        if not isinstance(options, dict) or not options.get("socket_path"):
+            raise ValueError("The collector section needs a socket_path")
+        unknown = set(options) - COLLECTOR_OPTIONS
+        if unknown:
+            raise ValueError(f"Unknown collector options: {', '.join(sorted(unknown))}")
+        return cls(
+            options["socket_path"],
+            sink_pool,
+            batch_size=int(options.get("batch_size", DEFAULT_COLLECTOR_BATCH_SIZE)),
+            flush_interval_ms=float(
+                options.get("flush_interval_ms", DEFAULT_COLLECTOR_FLUSH_INTERVAL_MS)
+            ),
+            timeout=float(options.get("timeout_seconds", DEFAULT_COLLECTOR_TIMEOUT)),
+            max_backoff=float(options.get("max_backoff_seconds", DEFAULT_MAX_BACKOFF)),
+            on_error=on_error,
+        )
+
+    @property
+    def connected(self) -> bool:
+        return self._socket is not None
+
+    def write(self, path: str, data: str | bytes, log_level: str | None = None) -> None:
+        """
+        Queues a formatted record for the next frame.
+
+        Args:
+            path (str): The path of the log file.
+            data (str | bytes): The fully formatted log entry.
+            log_level (str | None, optional): The level of the record being written.
+        """
+        with self._lock:
+            self._pending.append((path, data, log_level))
+            if (
+                len(self._pending) >= self.batch_size
+                or log_level in FLUSH_IMMEDIATELY_LEVELS
+                or self._closed
+            ):
+                self._send_locked()
+
+    def flush(self) -> None:
+        """
+        Sends every pending record, or writes them directly if the collector cannot
+        be reached.
+        """
+        with self._lock:
+            self._send_locked()
+
+    def close(self) -> None:
+        """
+        Sends every pending record and disconnects. Records written afterwards are
+        sent one at a time.
+        """
+        self._closed = True
+        self._stop.set()
+        if self._flusher is not threading.current_thread():
+            self._flusher.join()
+        with self._lock:
+            self._send_locked()
+            self._disconnect_locked()
+        _clients.discard(self)
+
+    def _send_locked(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            frame = encode_batch(batch)
+        except ValueError:
+            # Paths, levels or entries too long for the protocol are written here.
+            write_batch(self.sink_pool.write, batch, self._on_error)
+            return
+        if self._socket is None and time.monotonic() >= self._retry_at:
+            self._connect_locked()
+        if self._socket is not None:
+            try:
+                self._socket.sendall(frame)
+                return
+            except OSError:
+                # A partly sent frame is dropped by the collector, so the whole
+                # batch is written here instead.
+                self._disconnect_locked()
+                self._back_off_locked()
+        write_batch(self.sink_pool.write, batch, self._on_error)
+
+    def _connect_locked(self) -> None:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(self.timeout)
+        try:
+            connection.connect(self.socket_path)
+        except OSError:
+            connection.close()
+            self._back_off_locked()
+            return
+        self._socket = connection
+        self._backoff = INITIAL_BACKOFF
+
+    def _back_off_locked(self) -> None:
+        backoff = min(self._backoff, self.max_backoff)
+        self._retry_at = time.monotonic() + backoff
+        self._backoff = backoff * 2
+
+    def _disconnect_locked(self) -> None:
+        connection, self._socket = self._socket, None
+        if connection is not None:
+            connection.close()
+
+    def _start_flusher(self) -> None:
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._run_flusher, name="logkontrol-collector", daemon=True
+        )
+        self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _after_fork(self) -> None:
+        # The parent still owns its connection and sends its own pending records.
+        self._lock = threading.Lock()
+        self._pending = []
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        self._backoff = INITIAL_BACKOFF
+        self._retry_at = 0.0
+        if not self._closed:
+            self._start_flusher()
+
+
+_clients: "weakref.WeakSet[CollectorClient]" = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for client in list(_clients):
+        client._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class CollectorServer:
+    """
+    Accepts frames of records from any number of processes on a Unix domain socket
+    and writes them through one writer function, which owns every log file.
+
+    Each connection is served by its own thread. The records of a frame are joined
+    per log file and written with one call, so a record is never split or mixed
+    with records of another process. Only the owner of the process can connect to
+    the socket, and records for any path other than the allowed log files are
+    dropped.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        write: Callable[[str, str | bytes, str | None], None],
+        allowed_paths: Iterable[str],
+        on_error: Callable[[str], None] | None = None,
+    ) -> None:
+        """
+        Args:
+            socket_path (str): The path the socket is created at.
+            write (Callable[[str, str | bytes, str | None], None]): Writes an entry to
+                the log file at a path, such as LogKonfig().write_entry.
+            allowed_paths (Iterable[str]): The log file paths records may be written
+                to, as configured in log_file_paths.
+            on_error (Callable[[str], None] | None, optional): Called with the path of
+                each log file that could not be written.
+        """
+        self.socket_path = socket_path
+        self._write = write
+        self.allowed_paths = frozenset(allowed_paths)
+        self._on_error = on_error
+        self._listener: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        # The connections being served, with their threads.
+        self._connections: dict[socket.socket, threading.Thread] = {}
+        self._connections_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """
+        Creates the socket and starts accepting connections from a daemon thread.
+
+        Raises:
+            OSError: If another collector is listening on the socket path.
+        """
+        self._listen()
+        self._thread = threading.Thread(
+            target=self._accept_loop, name="logkontrol-collector-server", daemon=True
+        )
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """
+        Creates the socket and accepts connections on the calling thread until
+        stop() is called.
+        """
+        self._listen()
+        self._accept_loop()
+
+    def stop(self, timeout: float = DEFAULT_STOP_TIMEOUT) -> None:
+        """
+        Stops accepting connections, gives connected processes up to timeout
+        seconds to send their last frames and disconnect, then closes the remaining
+        connections and removes the socket.
+
+        Args:
+            timeout (float, optional): The number of seconds to wait for connected
+                processes. Defaults to 5.
+        """
+        self._stopping.set()
+        wake = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            # Wakes the accept loop, which sees that the server is stopping.
+            wake.connect(self.socket_path)
+        except OSError:
+            pass
+        finally:
+            wake.close()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+        deadline = time.monotonic() + timeout
+        with self._connections_lock:
+            connections = dict(self._connections)
+        for connection, handler in connections.items():
+            handler.join(max(deadline - time.monotonic(), 0))
+            if handler.is_alive():
+                try:
+                    # Wakes the thread blocked reading the connection.
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                handler.join()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def _listen(self) -> None:
+        try:
+            mode = os.lstat(self.socket_path).st_mode
+        except FileNotFoundError:
+            mode = None
+        if mode is not None:
+            if not stat.S_ISSOCK(mode):
+                raise OSError(f"{self.socket_path} exists and is not a socket")
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                # Left behind by a collector that did not shut down cleanly.
+                os.unlink(self.socket_path)
+            else:
+                raise OSError(f"A collector is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # The socket is created with mode 0600, so that no other user can connect
+        # before its permissions are set.
+        umask = os.umask(0o177)
+        try:
+            listener.bind(self.socket_path)
+        except OSError:
+            listener.close()
+            raise
+        finally:
+            os.umask(umask)
+        listener.listen()
+        self._listener = listener
+
+    def _accept_loop(self) -> None:
+        while not self._stopping.is_set():
+            listener = self._listener
+            if listener is None:
+                break
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                break
+            if self._stopping.is_set():
+                connection.close()
+                break
+            handler = threading.Thread(
+                target=self._serve,
+                args=(connection,),
+                name="logkontrol-collector-connection",
+                daemon=True,
+            )
+            with self._connections_lock:
+                self._connections[connection] = handler
+            handler.start()
+
+    def _serve(self, connection: socket.socket) -> None:
+        try:
+            with connection.makefile("rb") as stream:
+                while True:
+                    header = stream.read(FRAME_HEADER.size)
+                    if len(header) < FRAME_HEADER.size:
+                        return
+                    (size,) = FRAME_HEADER.unpack(header)
+                    if size > MAX_FRAME_BYTES:
+                        print(f"Dropping a collector connection: frame of {size} bytes")
+                        return
+                    payload = stream.read(size)
+                    if len(payload) < size:
+                        # The sender failed mid-frame and writes the batch itself.
+                        return
+                    try:
+                        records = decode_batch(payload)
+                    except (UnicodeDecodeError, ValueError) as error:
+                        print(f"Dropping a collector connection: {error}")
+                        return
+                    write_batch(self._write, self._allowed(records), self._on_error)
+        except OSError:
+            pass
+        finally:
+            with self._connections_lock:
+                self._connections.pop(connection, None)
+            connection.close()
+
+    def _allowed(
+        self, records: list[tuple[str, str | bytes, str | None]]
+    ) -> list[tuple[str, str | bytes, str | None]]:
+        allowed = [record for record in records if record[0] in self.allowed_paths]
+        if len(allowed) < len(records):
+            rejected = sorted({record[0] for record in records} - self.allowed_paths)
+            print(f"Dropping records for unconfigured log files: {', '.join(rejected)}")
+        return allowed
+
+
+def run_collector(config: dict, socket_path: str | None = None) -> CollectorServer:
+    """
+    Makes this process the collector of a logging configuration: it applies the
+    configuration, without its "collector" section, and starts serving the
+    socket of that section. Only records for the configured log_file_paths are
+    written.
+
+    Args:
+        config (dict): The logging configuration shared with the worker processes.
+        socket_path (str | None, optional): The socket path. Defaults to the
+            socket_path of the "collector" section.
+
+    Returns:
+        CollectorServer: The running server.
+    """
+    from .logkontrol import LogKonfig
+
+    if socket_path is None:
+        socket_path = (config.get("collector") or {}).get("socket_path")
+    if not socket_path:
+        raise ValueError("The collector needs a socket_path")
+    log_konfig = LogKonfig()
+    log_konfig.set_logging_config(
+        {key: value for key, value in config.items() if key != "collector"}
+    )
+    server = CollectorServer(
+        socket_path,
+        log_konfig.write_entry,
+        (config.get("log_file_paths") or {}).values(),
+        log_konfig._metrics.record_error,
+    )
+    server.start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds the arguments of the collect command to a parser.
+    """
+    parser.add_argument(
+        "--config",
+        default="logging_config.yaml",
+        help="the logging configuration shared with the workers",
+    )
+    parser.add_argument(
+        "--socket", help="the socket path, instead of the configured one"
+    )
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Runs the collect command until it is interrupted or terminated.
+
+    Returns:
+        int: The exit status.
+    """
+    from .logkontrol import LogKonfig
+
+    try:
+        server = run_collector(LogKonfig.load_logging_config(args.config), args.socket)
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 2
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    try:
+        while not stopped.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+    LogKonfig().shutdown()
+    return 0
@@ -0,0 +1,208 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import functools
+import inspect
+import time
+from typing import Any, Callable
+from .logkontrol import LogKonfig, _emit_function_call
+
+# Result entries are named so they cannot clash with parameter names.
+RETURN_ENTRY = "return"
+RAISE_ENTRY = "raise"
+WALL_TIME_ENTRY = "wall time"
+CPU_TIME_ENTRY = "cpu time"
+
+
+def _format_duration(seconds: float) -> str:
+    return f"{seconds * 1000:.3f} ms"
+
+
+class _CallRecorder:
+    """
+    Writes the records of one decorated function.
+
+    Whether its level is enabled is decided once per configuration and stored with
+    the configuration it was decided for, so a disabled call only compares that
+    configuration with the current one.
+    """
+
+    __slots__ = (
+        "func",
+        "function_name",
+        "log_level",
+        "_konfig",
+        "_logger",
+        "_signature",
+        "_binding",
+    )
+
+    def __init__(self, func: Callable, log_file_key: str | None, log_level: str) -> None:
+        self.func = func
+        self.function_name = func.__qualname__
+        self.log_level = log_level
+        self._konfig = LogKonfig()
+        self._logger = self._konfig.get_logger(log_file_key)
+        self._signature: inspect.Signature | None = None
+        # The configuration, whether the level is enabled, the resolved key and the
+        # output path.
+        self._binding: tuple = (None, False, None, None)
+
+    def bind(self) -> tuple:
+        """
+        Decides again whether the function's calls are logged, for the current
+        configuration.
+        """
+        logger = self._logger
+        binding = logger._binding
+        if binding[0] is not self._konfig._compiled:
+            binding = logger._bind()
+        compiled, log_file_key, log_file_path = binding
+        # Calls the key does not write may still be kept by its flight recorder, or
+        # be written by a key they are routed to.
+        enabled = log_file_key is not None and any(
+            compiled.is_level_enabled(destination, self.log_level)
+            or compiled.is_level_recorded(destination, self.log_level)
+            for destination in compiled.destinations(log_file_key, self.log_level)
+        )
+        self._binding = (compiled, enabled, log_file_key, log_file_path)
+        return self._binding
+
+    def arguments(self, args: tuple, kwargs: dict) -> dict:
+        """
+        Binds the arguments of a call to the function's parameter names.
+        """
+        signature = self._signature
+        if signature is None:
+            try:
+                signature = self._signature = inspect.signature(self.func)
+            except (TypeError, ValueError):
+                return {"args": args, "kwargs": kwargs}
+        try:
+            bound = signature.bind(*args, **kwargs)
+        except TypeError:
+            return {"args": args, "kwargs": kwargs}
+        bound.apply_defaults()
+        return dict(bound.arguments)
+
+    def record(
+        self, arguments: dict, outcome: str, result: Any, wall_start: float, cpu_start: float
+    ) -> dict:
+        """
+        Adds the outcome and the durations of a call to its bound arguments.
+        """
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.thread_time() - cpu_start
+        arguments[outcome] = result
+        arguments[WALL_TIME_ENTRY] = _format_duration(wall_time)
+        arguments[CPU_TIME_ENTRY] = _format_duration(cpu_time)
+        return arguments
+
+    def call(self, binding: tuple, args: tuple, kwargs: dict) -> Any:
+        compiled, _, log_file_key, log_file_path = binding
+        arguments = self.arguments(args, kwargs)
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            result = self.func(*args, **kwargs)
+        except BaseException as error:
+            _emit_function_call(
+                compiled,
+                log_file_key,
+                log_file_path,
+                self.function_name,
+                self.record(arguments, RAISE_ENTRY, error, wall_start, cpu_start),
+                self.log_level,
+            )
+            raise
+        _emit_function_call(
+            compiled,
+            log_file_key,
+            log_file_path,
+            self.function_name,
+            self.record(arguments, RETURN_ENTRY, result, wall_start, cpu_start),
+            self.log_level,
+        )
+        return result
+
+    async def acall(self, binding: tuple, args: tuple, kwargs: dict) -> Any:
+        from .aio import _emit_function_call as _aemit_function_call
+
+        compiled, _, log_file_key, _ = binding
+        arguments = self.arguments(args, kwargs)
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            result = await self.func(*args, **kwargs)
+        except BaseException as error:
+            await _aemit_function_call(
+                compiled,
+                log_file_key,
+                self.function_name,
+                self.record(arguments, RAISE_ENTRY, error, wall_start, cpu_start),
+                self.log_level,
+            )
+            raise
+        await _aemit_function_call(
+            compiled,
+            log_file_key,
+            self.function_name,
+            self.record(arguments, RETURN_ENTRY, result, wall_start, cpu_start),
+            self.log_level,
+        )
+        return result
+
+
+def log_calls(
+    log_file_key: str | Callable | None = None, log_level: str = "DEBUG"
+) -> Callable:
+    """
+    Decorates a function so each call is logged like log_function_call(), with the
+    bound arguments, the return value or raised exception, and the wall and CPU time
+    the call took.
+
+    The function's signature is looked up once, on its first logged call. When the
+    level is filtered out for the key, the wrapper only checks that the configuration
+    has not changed before calling the function. Coroutine functions are logged
+    through the asyncio sink once they finish.
+
+    Args:
+        log_file_key (str | None, optional): The key of the log file path in the
+            logging configuration. Defaults to the only configured key. The decorator
+            can also be applied without arguments.
+        log_level (str, optional): The log level of the records. Defaults to "DEBUG".
+
+    Returns:
+        Callable: The decorator, or the decorated function if applied without
+            arguments.
+    """
+    if callable(log_file_key):
+        return log_calls()(log_file_key)
+
+    def decorate(func: Callable) -> Callable:
+        recorder = _CallRecorder(func, log_file_key, log_level)
+        konfig = recorder._konfig
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                binding = recorder._binding
+                if binding[0] is not konfig._compiled:
+                    binding = recorder.bind()
+                if not binding[1]:
+                    return await func(*args, **kwargs)
+                return await recorder.acall(binding, args, kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            binding = recorder._binding
+            if binding[0] is not konfig._compiled:
+                binding = recorder.bind()
+            if not binding[1]:
+                return func(*args, **kwargs)
+            return recorder.call(binding, args, kwargs)
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,950 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import itertools
+import string
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+# orjson is imported when the first JSON Lines formatter is built, and stays None
+# if it is not installed.
+_NOT_IMPORTED = object()
+orjson: Any = _NOT_IMPORTED
+
+
+def _import_orjson() -> None:
+    global orjson
+    try:
+        import orjson as module
+    except ImportError:  # pragma: no cover - depends on the environment
+        module = None
+    orjson = module
+
+
+# The default layout reproduces the entries logkontrol has always written: a
+# "[timestamp] [level]" header line followed by the record body.
+DEFAULT_LOG_FORMAT = "[{timestamp}] [{level}]\n{message}"
+DEFAULT_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_FORMAT_FIELDS = ("timestamp", "level", "message")
+# Stands in for the record body when a template is split around {message}.
+_BODY_MARKER = "\x00logkontrol-body\x00"
+
+
+def is_streamable_json(json_content: Any) -> bool:
+    """
+    Checks whether log_json_content writes a value item by item.
+
+    Args:
+        json_content: The content passed to log_json_content.
+
+    Returns:
+        bool: True for lists, iterators and generators.
+    """
+    return isinstance(json_content, (list, Iterator))
+
+
+def _iter_items(json_content: Any, max_items: int | None):
+    """
+    Yields the items of a list or iterator, stopping after max_items.
+
+    The generator's return value is the number of omitted items: an exact count
+    for lists, or -1 if an iterator had more items. Iterators are never drained
+    past max_items + 1, so infinite generators are safe to log.
+    """
+    if max_items is None:
+        yield from json_content
+        return 0
+    if isinstance(json_content, list) and not isinstance(json_content, ReadItems):
+        yield from itertools.islice(json_content, max_items)
+        return max(len(json_content) - max_items, 0)
+    iterator = iter(json_content)
+    for index, item in enumerate(iterator):
+        if index >= max_items:
+            return -1
+        yield item
+    return 0
+
+
+class ReadItems(list):
+    """
+    The items read ahead from an iterator passed to log_json_content. They are
+    formatted like the iterator itself, so an entry still says that more items were
+    left out without knowing how many.
+    """
+
+
+def read_items(json_content: Any, max_items: int | None) -> Any:
+    """
+    Reads an iterator passed to log_json_content so that it can be formatted later
+    or more than once. No more than max_items + 1 items are read.
+
+    Args:
+        json_content: The content passed to log_json_content.
+        max_items (int | None): The maximum number of items to write.
+
+    Returns:
+        The items read as ReadItems, or the content itself if it is not an iterator.
+    """
+    if not isinstance(json_content, Iterator):
+        return json_content
+    if max_items is not None:
+        json_content = itertools.islice(json_content, max_items + 1)
+    return ReadItems(json_content)
+
+
+class LazyValue:
+    """
+    Wraps a callable whose result is only computed if the record it belongs to is
+    actually written.
+    """
+
+    __slots__ = ("func",)
+
+    def __init__(self, func) -> None:
+        self.func = func
+
+    def __call__(self) -> Any:
+        return self.func()
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.func(), format_spec)
+
+
+def lazy(func) -> LazyValue:
+    """
+    Defers computing a logged value until the record passes level filtering.
+
+    Args:
+        func: A callable taking no arguments that returns the value to log.
+
+    Returns:
+        LazyValue: A wrapper accepted as a variable value by the log_* functions.
+    """
+    return LazyValue(func)
+
+
+def resolve_lazy(value: Any) -> Any:
+    """
+    Returns the value a LazyValue wraps, or the value itself.
+    """
+    if isinstance(value, LazyValue):
+        return value()
+    return value
+
+
+DEFAULT_TRUNCATE_LENGTH = 500
+DEFAULT_MAX_ITEMS = 100
+DEFAULT_MAX_DEPTH = 6
+DEFAULT_MAX_STRING_LENGTH = 200
+# Integers with more bits than this are summarized instead of converted to text.
+_MAX_INT_BITS = 4096
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+class _BoundedWriter:
+    """
+    Collects rendered text and stops the renderer once max_length is exceeded.
+    """
+
+    __slots__ = ("parts", "remaining")
+
+    def __init__(self, max_length: int) -> None:
+        self.parts: list[str] = []
+        self.remaining = max_length
+
+    def write(self, text: str) -> None:
+        if len(text) > self.remaining:
+            # Keep one extra character so the caller knows the output was cut.
+            self.parts.append(text[: self.remaining + 1])
+            raise _BudgetExhausted
+        self.parts.append(text)
+        self.remaining -= len(text)
+
+
+class _Field:
+    """
+    A named tuple field, rendered as name=value.
+    """
+
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str, value: Any) -> None:
+        self.name = name
+        self.value = value
+
+
+# The repr() of these dict subclasses names the type around the items.
+_NAMED_REPRS = (OrderedDict.__repr__, Counter.__repr__)
+
+
+class _BoundedRenderer:
+    """
+    Renders a value the way str() would, without ever producing more than the
+    output budget allows.
+
+    Containers are walked item by item, so only the part of a large list, dict or
+    string that fits the budget is ever converted to text. Containers longer than
+    max_items, strings longer than max_string_length, nesting deeper than
+    max_depth, and large bytes and integers are replaced by short summaries.
+    """
+
+    def __init__(
+        self,
+        writer: _BoundedWriter,
+        max_items: int,
+        max_depth: int,
+        max_string_length: int,
+    ) -> None:
+        self._writer = writer
+        self.write = writer.write
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.max_string_length = max_string_length
+        self._active: set[int] = set()
+
+    def render(self, value: Any, depth: int = 0, top_level: bool = False) -> None:
+        if isinstance(value, str):
+            if top_level:
+                # str() of a string is the string itself; only the budget applies.
+                self.write(value[: self._writer.remaining + 1])
+            elif len(value) > self.max_string_length:
+                self.write(repr(value[: self.max_string_length]))
+                self.write(f"...<{len(value)} chars>")
+            else:
+                self.write(repr(value))
+        elif isinstance(value, (bytes, bytearray)):
+            self._render_bytes(value)
+        elif isinstance(value, bool) or value is None or isinstance(value, float):
+            self.write(repr(value))
+        elif isinstance(value, int):
+            if value.bit_length() > _MAX_INT_BITS:
+                self.write(f"<int with {value.bit_length()} bits>")
+            else:
+                self.write(repr(value))
+        elif isinstance(value, Mapping):
+            delimiters = self._delimiters(value, dict, "{", "}")
+            if delimiters is None:
+                self._render_object(value, top_level)
+            else:
+                self._render_container(value, depth, *delimiters, mapping=True)
+        elif isinstance(value, list):
+            delimiters = self._delimiters(value, list, "[", "]")
+            if delimiters is None:
+                self._render_object(value, top_level)
+            else:
+                self._render_container(value, depth, *delimiters)
+        elif isinstance(value, tuple):
+            if hasattr(value, "_fields"):
+                self._render_fields(value, depth)
+                return
+            closing = ",)" if len(value) == 1 else ")"
+            delimiters = self._delimiters(value, tuple, "(", closing)
+            if delimiters is None:
+                self._render_object(value, top_level)
+            else:
+                self._render_container(value, depth, *delimiters)
+        elif isinstance(value, deque) and type(value).__repr__ is deque.__repr__:
+            closing = "])" if value.maxlen is None else f"], maxlen={value.maxlen})"
+            self._render_container(value, depth, f"{type(value).__name__}([", closing)
+        elif isinstance(value, (set, frozenset)):
+            name = type(value).__name__
+            if not value:
+                self.write(f"{name}()")
+            elif type(value) is set:
+                self._render_container(value, depth, "{", "}")
+            else:
+                self._render_container(value, depth, f"{name}({{", "})")
+        else:
+            self._render_object(value, top_level)
+
+    @staticmethod
+    def _delimiters(
+        value: Any, base: type, opening: str, closing: str
+    ) -> tuple[str, str] | None:
+        # Subclasses are shown like their repr(): with their type name for
+        # OrderedDict, defaultdict and Counter, and like the base type otherwise.
+        # None stands for a repr() of their own, which is used as it is.
+        value_type = type(value)
+        representation = value_type.__repr__
+        if value_type is base or representation is base.__repr__:
+            return opening, closing
+        if representation is defaultdict.__repr__:
+            return (
+                f"{value_type.__name__}({value.default_factory!r}, {opening}",
+                f"{closing})",
+            )
+        if representation in _NAMED_REPRS:
+            return f"{value_type.__name__}({opening}", f"{closing})"
+        return None
+
+    def _render_fields(self, value: tuple, depth: int) -> None:
+        # Named tuples render as Name(field=value, ...), like their repr().
+        self._render_container(
+            [_Field(name, item) for name, item in zip(value._fields, value)],
+            depth,
+            f"{type(value).__name__}(",
+            ")",
+            identity=id(value),
+        )
+
+    def _render_bytes(self, value: bytes | bytearray) -> None:
+        if len(value) <= self.max_string_length:
+            self.write(repr(value))
+            return
+        self.write(repr(value[: self.max_string_length]))
+        self.write(f"...<{len(value)} bytes>")
+
+    def _render_container(
+        self,
+        value,
+        depth: int,
+        opening: str,
+        closing: str,
+        mapping: bool = False,
+        identity: int | None = None,
+    ) -> None:
+        if identity is None:
+            identity = id(value)
+        if identity in self._active or depth >= self.max_depth:
+            self.write(f"{opening}...{closing}")
+            return
+        self._active.add(identity)
+        try:
+            self.write(opening)
+            items = value.items() if mapping else value
+            for index, item in enumerate(items):
+                if index:
+                    self.write(", ")
+                if index >= self.max_items:
+                    self.write(f"...<{len(value) - index} more items>")
+                    break
+                if mapping:
+                    self.render(item[0], depth + 1)
+                    self.write(": ")
+                    self.render(item[1], depth + 1)
+                elif type(item) is _Field:
+                    self.write(f"{item.name}=")
+                    self.render(item.value, depth + 1)
+                else:
+                    self.render(item, depth + 1)
+            self.write(closing)
+        finally:
+            self._active.discard(identity)
+
+    def _render_object(self, value: Any, top_level: bool) -> None:
+        try:
+            size = len(value)
+        except Exception:
+            size = None
+        if size is not None and size > self.max_items:
+            # Sized objects such as data frames can render to huge strings.
+            self.write(f"<{type(value).__name__} object with {size} items>")
+            return
+        self.write(str(value) if top_level else repr(value))
+
+
+def truncate_string(
+    value: Any,
+    max_length: int = DEFAULT_TRUNCATE_LENGTH,
+    max_items: int = DEFAULT_MAX_ITEMS,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    max_string_length: int = DEFAULT_MAX_STRING_LENGTH,
+) -> str:
+    """
+    Truncates a string to a maximum length and appends "..." if truncated.
+
+    Values are rendered incrementally and rendering stops as soon as max_length
+    characters are produced, so large values are never converted to text in full.
+
+    Args:
+        value: The value to truncate.
+        max_length (int, optional): The maximum length of the truncated string.
+        max_items (int, optional): The maximum number of items shown per container.
+        max_depth (int, optional): The maximum nesting depth of containers shown.
+        max_string_length (int, optional): The maximum length of strings and bytes
+            nested inside containers.
+
+    Returns:
+        str: The truncated string.
+    """
+    writer = _BoundedWriter(max_length)
+    renderer = _BoundedRenderer(writer, max_items, max_depth, max_string_length)
+    try:
+        renderer.render(value, top_level=True)
+    except _BudgetExhausted:
+        return "".join(writer.parts)[:max_length] + "..."
+    return "".join(writer.parts)
+
+
+class TimestampCache:
+    """
+    Formats the current time, reusing the rendered text for every record logged
+    within the same second.
+
+    Formats with sub-second directives (%f) are rendered on every call.
+    """
+
+    def __init__(self, timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT) -> None:
+        self.timestamp_format = timestamp_format
+        self._cacheable = "%f" not in timestamp_format
+        self._cached: tuple[int, str] = (-1, "")
+
+    def now(self) -> str:
+        """
+        Returns the current local time rendered with the timestamp format.
+        """
+        # datetime is imported here so that importing logkontrol does not load it.
+        from datetime import datetime
+
+        if not self._cacheable:
+            return datetime.now().strftime(self.timestamp_format)
+        now = time.time()
+        second = int(now)
+        cached_second, cached_text = self._cached
+        if second == cached_second:
+            return cached_text
+        text = datetime.fromtimestamp(second).strftime(self.timestamp_format)
+        self._cached = (second, text)
+        return text
+
+    def at(self, created: float | None) -> str:
+        """
+        Returns a time rendered with the timestamp format.
+
+        Args:
+            created (float | None): Seconds since the epoch, or None for now.
+        """
+        if created is None:
+            return self.now()
+        if self._cacheable:
+            cached_second, cached_text = self._cached
+            if int(created) == cached_second:
+                return cached_text
+        from datetime import datetime
+
+        return datetime.fromtimestamp(created).strftime(self.timestamp_format)
+
+
+def compile_log_format(log_format: str) -> str:
+    """
+    Compiles a log_format template into a positional format string.
+
+    Args:
+        log_format (str): A template using the {timestamp}, {level} and {message}
+            fields, with optional format specs and conversions.
+
+    Returns:
+        str: An equivalent template taking the fields positionally, followed by the
+            newline that terminates each record.
+
+    Raises:
+        ValueError: If the template is malformed or uses an unknown field.
+    """
+    parts = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(
+        log_format
+    ):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field_name is None:
+            continue
+        if field_name not in LOG_FORMAT_FIELDS:
+            raise ValueError(
+                f"Unknown field in log_format: {{{field_name}}}. "
+                f"Expected one of {', '.join(LOG_FORMAT_FIELDS)}"
+            )
+        field = str(LOG_FORMAT_FIELDS.index(field_name))
+        if conversion:
+            field += f"!{conversion}"
+        if format_spec:
+            field += f":{format_spec}"
+        parts.append(f"{{{field}}}")
+    return "".join(parts) + "\n"
+
+
+class RecordFormatter:
+    """
+    Renders text log entries from the configured log_format and timestamp_format.
+
+    The template is compiled once when the configuration is set, so rendering a
+    record costs one cached timestamp lookup and a single str.format() call.
+    """
+
+    # Whether entries are bytes, written to files opened in binary mode.
+    binary = False
+
+    def __init__(
+        self,
+        log_format: str = DEFAULT_LOG_FORMAT,
+        timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT,
+    ) -> None:
+        self.log_format = log_format
+        self._template = compile_log_format(log_format)
+        self._timestamps = TimestampCache(timestamp_format)
+        message_fields = [
+            (format_spec, conversion)
+            for _, field_name, format_spec, conversion in string.Formatter().parse(
+                log_format
+            )
+            if field_name == "message"
+        ]
+        # The body can only be streamed between a fixed prefix and suffix.
+        self._streamable = message_fields == [("", None)]
+
+    @classmethod
+    def from_config(cls, config: dict, log_file_key: str | None = None) -> "RecordFormatter":
+        """
+        Builds a formatter from the "log_format" and "timestamp_format" settings.
+
+        Args:
+            config (dict): The logging configuration.
+            log_file_key (str | None, optional): The log file key the formatter is for.
+
+        Returns:
+            RecordFormatter: The compiled formatter.
+        """
+        return cls(
+            config.get("log_format") or DEFAULT_LOG_FORMAT,
+            config.get("timestamp_format") or DEFAULT_TIMESTAMP_FORMAT,
+        )
+
+    def timestamp(self) -> str:
+        """
+        Returns the current time rendered with the timestamp format.
+        """
+        return self._timestamps.now()
+
+    def render(self, log_level: str, body: str, timestamp: str | None = None) -> str:
+        """
+        Renders a complete log entry.
+
+        Args:
+            log_level (str): The log level of the record.
+            body (str): The record body, substituted for {message}.
+            timestamp (str | None, optional): The rendered timestamp of the record.
+                Defaults to the current time.
+
+        Returns:
+            str: The log entry, terminated by a newline.
+        """
+        if timestamp is None:
+            timestamp = self._timestamps.now()
+        return self._template.format(timestamp, log_level, body)
+
+    def format_message(
+        self,
+        message: Any,
+        variables: dict | None,
+        log_level: str,
+        created: float | None = None,
+    ) -> str:
+        """
+        Formats the log entry written by log_message.
+
+        Args:
+            message: The message to log, or a callable returning it.
+            variables (dict | None): A dictionary of variables and their values to log.
+            log_level (str): The log level of the message.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            str: The formatted log entry.
+        """
+        truncated = log_level == "TRUNCATED"
+        lines = []
+
+        if callable(message):
+            message = message()
+        if message:
+            if truncated:
+                message = truncate_string(message)
+            lines.append(f"Message: {message}\n")
+
+        if variables:
+            for variable_name, variable_value in variables.items():
+                variable_value = resolve_lazy(variable_value)
+                if truncated:
+                    variable_value = truncate_string(variable_value)
+                lines.append(f"{variable_name}: {variable_value}\n")
+        if created is None:
+            return self.render(log_level, "".join(lines))
+        return self.render(log_level, "".join(lines), self._timestamps.at(created))
+
+    def format_function_call(
+        self,
+        function_name: str,
+        kwargs: dict,
+        log_level: str,
+        created: float | None = None,
+    ) -> str:
+        """
+        Formats the log entry written by log_function_call.
+
+        Args:
+            function_name (str): The name of the function being called.
+            kwargs (dict): The function's arguments.
+            log_level (str): The log level of the function call.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            str: The formatted log entry.
+        """
+        truncated = log_level == "TRUNCATED"
+        lines = [f"Function Call: {function_name}()\n"]
+        for arg_name, arg_value in kwargs.items():
+            arg_value = resolve_lazy(arg_value)
+            if truncated:
+                arg_value = truncate_string(arg_value)
+            lines.append(f"  {arg_name}: {arg_value}\n")
+        return self.format_message("".join(lines), None, log_level, created)
+
+    def format_json(
+        self,
+        json_content: Any,
+        log_level: str,
+        max_items: int | None = None,
+        created: float | None = None,
+    ) -> str:
+        """
+        Formats the log entry written by log_json_content.
+
+        Args:
+            json_content (dict | list[dict]): The JSON object, or list or iterator of
+                JSON objects, to log.
+            log_level (str): The log level of the JSON content.
+            max_items (int | None, optional): The maximum number of items to write.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            str: The formatted log entry.
+        """
+        return "".join(self.iter_json(json_content, log_level, max_items, created))
+
+    def iter_json(
+        self,
+        json_content: Any,
+        log_level: str,
+        max_items: int | None = None,
+        created: float | None = None,
+    ):
+        """
+        Yields the log entry written by log_json_content piece by piece, one item
+        of a list or iterator at a time.
+
+        Args:
+            json_content (dict | list[dict]): The JSON object, or list or iterator of
+                JSON objects, to log.
+            log_level (str): The log level of the JSON content.
+            max_items (int | None, optional): The maximum number of items to write.
+                A line recording how many items were left out follows them.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Yields:
+            str: Consecutive pieces of the formatted log entry.
+        """
+        timestamp = self._timestamps.at(created)
+        if not self._streamable:
+            yield self.render(
+                log_level,
+                "".join(self._iter_json_body(json_content, max_items)),
+                timestamp,
+            )
+            return
+        prefix, suffix = self.render(log_level, _BODY_MARKER, timestamp).split(
+            _BODY_MARKER
+        )
+        yield prefix
+        yield from self._iter_json_body(json_content, max_items)
+        yield suffix
+
+    @staticmethod
+    def _iter_json_body(json_content: Any, max_items: int | None):
+        yield "JSON Content:\n"
+
+        if isinstance(json_content, dict):
+            import json
+
+            yield json.dumps(json_content, indent=2)
+        elif is_streamable_json(json_content):
+            omitted = yield from _render_items(json_content, max_items)
+            if omitted > 0:
+                yield f"... {omitted} more items omitted\n"
+            elif omitted < 0:
+                yield "... more items omitted\n"
+        else:
+            yield f"{json_content}\n"
+
+
+def _render_items(json_content: Any, max_items: int | None):
+    import json
+
+    items = _iter_items(json_content, max_items)
+    while True:
+        try:
+            item = next(items)
+        except StopIteration as stop:
+            return stop.value
+        if isinstance(item, dict):
+            yield json.dumps(item, indent=2) + "\n"
+        else:
+            yield f"{item}\n"
+
+
+class JsonSerializer:
+    """
+    Serializes records to compact single-line JSON.
+
+    orjson is used when it is installed; values it cannot encode, and every value
+    when it is missing, go through a reused stdlib JSONEncoder. Objects that are
+    not JSON serializable are written as their str().
+    """
+
+    def __init__(self) -> None:
+        import json
+
+        if orjson is _NOT_IMPORTED:
+            _import_orjson()
+        self._encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=str
+        )
+
+    def dumps(self, obj: Any) -> str:
+        if orjson is not None:
+            try:
+                return orjson.dumps(
+                    obj, default=str, option=orjson.OPT_NON_STR_KEYS
+                ).decode()
+            except TypeError:
+                pass
+        return self._encoder.encode(obj)
+
+
+class JsonLinesFormatter:
+    """
+    Renders each record as one compact JSON object per line.
+
+    Every object holds the timestamp, level and log file key, plus whichever of
+    message, variables, function, args and json the record carries.
+    """
+
+    binary = False
+
+    def __init__(
+        self,
+        log_file_key: str | None = None,
+        timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT,
+        serializer: JsonSerializer | None = None,
+    ) -> None:
+        self.log_file_key = log_file_key
+        self._timestamps = TimestampCache(timestamp_format)
+        self._serializer = serializer or JsonSerializer()
+
+    @classmethod
+    def from_config(
+        cls, config: dict, log_file_key: str | None = None
+    ) -> "JsonLinesFormatter":
+        """
+        Builds a formatter for a log file key from the "timestamp_format" setting.
+
+        Args:
+            config (dict): The logging configuration.
+            log_file_key (str | None, optional): The log file key written into records.
+
+        Returns:
+            JsonLinesFormatter: The formatter.
+        """
+        return cls(
+            log_file_key,
+            config.get("timestamp_format") or DEFAULT_TIMESTAMP_FORMAT,
+            _get_shared_serializer(),
+        )
+
+    def timestamp(self) -> str:
+        """
+        Returns the current time rendered with the timestamp format.
+        """
+        return self._timestamps.now()
+
+    def render_record(self, record: dict, created: float | None = None) -> str:
+        """
+        Serializes a record, adding the timestamp and log file key.
+
+        Args:
+            record (dict): The record fields, including "level".
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            str: The JSON line, terminated by a newline.
+        """
+        line = {
+            "timestamp": self._timestamps.now()
+            if created is None
+            else self._timestamps.at(created),
+            "level": record.pop("level"),
+            "key": self.log_file_key,
+        }
+        line.update(record)
+        return self._serializer.dumps(line) + "\n"
+
+    def format_message(
+        self,
+        message: Any,
+        variables: dict | None,
+        log_level: str,
+        created: float | None = None,
+    ) -> str:
+        """
+        Formats the JSON line written by log_message.
+
+        Args:
+            message: The message to log, or a callable returning it.
+            variables (dict | None): A dictionary of variables and their values to log.
+            log_level (str): The log level of the message.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            str: The JSON line.
+        """
+        record: dict[str, Any] = {"level": log_level}
+        if callable(message):
+            message = message()
+        if message:
+            record["message"] = self._value(message, log_level)
+        if variables:
+            record["variables"] = self._values(variables, log_level)
+        return self.render_record(record, created)
+
+    def format_function_call(
+        self,
+        function_name: str,
+        kwargs: dict,
+        log_level: str,
+        created: float | None = None,
+    ) -> str:
+        """
+        Formats the JSON line written by log_function_call.
+
+        Args:
+            function_name (str): The name of the function being called.
+            kwargs (dict): The function's arguments.
+            log_level (str): The log level of the function call.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            str: The JSON line.
+        """
+        return self.render_record(
+            {
+                "level": log_level,
+                "function": function_name,
+                "args": self._values(kwargs, log_level),
+            },
+            created,
+        )
+
+    def format_json(
+        self,
+        json_content: Any,
+        log_level: str,
+        max_items: int | None = None,
+        created: float | None = None,
+    ) -> str:
+        """
+        Formats the JSON line written by log_json_content.
+
+        Args:
+            json_content (dict | list[dict]): The JSON content to log.
+            log_level (str): The log level of the JSON content.
+            max_items (int | None, optional): The maximum number of items to write.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Returns:
+            str: The JSON line.
+        """
+        return "".join(self.iter_json(json_content, log_level, max_items, created))
+
+    def iter_json(
+        self,
+        json_content: Any,
+        log_level: str,
+        max_items: int | None = None,
+        created: float | None = None,
+    ):
+        """
+        Yields the JSON line written by log_json_content piece by piece, one item of
+        a list or iterator at a time.
+
+        When max_items cuts the content short, the object also holds "truncated":
+        true and, for lists, the number of "omitted" items.
+
+        Args:
+            json_content (dict | list[dict]): The JSON content to log.
+            log_level (str): The log level of the JSON content.
+            max_items (int | None, optional): The maximum number of items to write.
+            created (float | None, optional): When the record was logged, in seconds
+                since the epoch. Defaults to now.
+
+        Yields:
+            str: Consecutive pieces of the JSON line.
+        """
+        if not is_streamable_json(json_content):
+            yield self.render_record({"level": log_level, "json": json_content}, created)
+            return
+        header = self._serializer.dumps(
+            {
+                "timestamp": self._timestamps.at(created),
+                "level": log_level,
+                "key": self.log_file_key,
+            }
+        )
+        yield header[:-1] + ',"json":['
+        items = _iter_items(json_content, max_items)
+        separator = ""
+        while True:
+            try:
+                item = next(items)
+            except StopIteration as stop:
+                omitted = stop.value
+                break
+            yield separator + self._serializer.dumps(item)
+            separator = ","
+        if omitted > 0:
+            yield f'],"truncated":true,"omitted":{omitted}}}\n'
+        elif omitted < 0:
+            yield '],"truncated":true}\n'
+        else:
+            yield "]}\n"
+
+    @staticmethod
+    def _value(value: Any, log_level: str) -> Any:
+        value = resolve_lazy(value)
+        if log_level == "TRUNCATED":
+            return truncate_string(value)
+        return value
+
+    def _values(self, values: dict, log_level: str) -> dict:
+        return {str(name): self._value(value, log_level) for name, value in values.items()}
+
+
+# Built with the first JSON Lines formatter, so json and orjson are only imported
+# when a key uses that format.
+_shared_serializer: JsonSerializer | None = None
+
+
+def _get_shared_serializer() -> JsonSerializer:
+    global _shared_serializer
+    if _shared_serializer is None:
+        _shared_serializer = JsonSerializer()
+    return _shared_serializer
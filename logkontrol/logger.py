@@ -0,0 +1,165 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+from typing import Any, Iterable
+from .logkontrol import (
+    CompiledConfig,
+    LogKonfig,
+    _emit_function_call,
+    _emit_json,
+    _emit_message,
+    _emit_variable,
+    _output_path,
+    _resolve_log_file_key,
+)
+
+
+class Logger:
+    """
+    A handle for one log file key.
+
+    The configuration, the key and the destination are looked up once, when the
+    handle is first used, instead of on every call. The handle notices when
+    LogKonfig switches to a new configuration and looks them up again, so problems
+    such as a missing configuration are reported once per configuration.
+    """
+
+    __slots__ = ("log_file_key", "_konfig", "_binding")
+
+    def __init__(self, log_file_key: str | None = None) -> None:
+        """
+        Args:
+            log_file_key (str | None, optional): The key of the log file path in the
+                logging configuration. Defaults to the only configured key.
+        """
+        self.log_file_key = log_file_key
+        self._konfig = LogKonfig()
+        # The configuration, resolved key and output path, replaced as one value
+        # so concurrent callers never combine parts of two configurations.
+        self._binding: tuple = (None, None, None)
+
+    def __repr__(self) -> str:
+        return f"Logger({self.log_file_key!r})"
+
+    def _bind(self) -> tuple[CompiledConfig, str | None, str | None]:
+        compiled = self._konfig.get_compiled_config()
+        log_file_key = log_file_path = None
+        if compiled.config is None:
+            print(
+                "Logging configuration is not initialized. Please call init_logging() first."
+            )
+        else:
+            log_file_key = _resolve_log_file_key(compiled.config, self.log_file_key)
+            if log_file_key is not None:
+                log_file_path = _output_path(compiled.config, log_file_key)
+        self._binding = (compiled, log_file_key, log_file_path)
+        return self._binding
+
+    def is_enabled_for(self, log_level: str) -> bool:
+        """
+        Checks whether records of a level pass the level threshold of the key, or of
+        a key the "routes" section sends them to.
+
+        Args:
+            log_level (str): The log level of the record.
+
+        Returns:
+            bool: True if records of the level are written, unless rate limited.
+        """
+        compiled, log_file_key, _ = self._binding
+        if compiled is not self._konfig._compiled:
+            compiled, log_file_key, _ = self._bind()
+        if log_file_key is None:
+            return False
+        if compiled.routes is None:
+            return compiled.is_level_enabled(log_file_key, log_level)
+        return any(
+            compiled.is_level_enabled(destination, log_level)
+            for destination in compiled.routes.destinations(log_file_key, log_level)
+        )
+
+    def message(
+        self,
+        message: str | None = None,
+        variables: dict | None = None,
+        log_level: str = "DEBUG",
+    ) -> None:
+        """
+        Logs a message and/or variable values, like log_message().
+
+        Args:
+            message (str, optional): The message to log, or a callable returning it.
+                Defaults to None.
+            variables (dict, optional): A dictionary of variables and their values to
+                log. Defaults to None.
+            log_level (str, optional): The log level of the message. Defaults to "DEBUG".
+        """
+        compiled, log_file_key, log_file_path = self._binding
+        if compiled is not self._konfig._compiled:
+            compiled, log_file_key, log_file_path = self._bind()
+        if log_file_key is None:
+            return
+        _emit_message(
+            compiled, log_file_key, log_file_path, message, variables, log_level
+        )
+
+    def variable(
+        self, variable_name: str, variable_value: Any, log_level: str = "DEBUG"
+    ) -> None:
+        """
+        Logs a variable and its value, like log_variable().
+
+        Args:
+            variable_name (str): The name of the variable.
+            variable_value: The value of the variable, optionally wrapped with lazy().
+            log_level (str, optional): The log level of the variable. Defaults to "DEBUG".
+        """
+        compiled, log_file_key, log_file_path = self._binding
+        if compiled is not self._konfig._compiled:
+            compiled, log_file_key, log_file_path = self._bind()
+        if log_file_key is None:
+            return
+        _emit_variable(
+            compiled, log_file_key, log_file_path, variable_name, variable_value, log_level
+        )
+
+    def call(self, function_name: str, log_level: str = "DEBUG", **kwargs) -> None:
+        """
+        Logs a function call with its arguments, like log_function_call().
+
+        Args:
+            function_name (str): The name of the function being called.
+            log_level (str, optional): The log level of the function call. Defaults to "DEBUG".
+            **kwargs: Keyword arguments representing the function's arguments.
+        """
+        compiled, log_file_key, log_file_path = self._binding
+        if compiled is not self._konfig._compiled:
+            compiled, log_file_key, log_file_path = self._bind()
+        if log_file_key is None:
+            return
+        _emit_function_call(
+            compiled, log_file_key, log_file_path, function_name, kwargs, log_level
+        )
+
+    def json(
+        self,
+        json_content: dict | list[dict] | Iterable[dict],
+        log_level: str = "DEBUG",
+        max_items: int | None = None,
+    ) -> None:
+        """
+        Logs JSON content, like log_json_content().
+
+        Args:
+            json_content (dict | list[dict] | Iterable[dict]): The JSON object, or list,
+                iterator or generator of JSON objects, to log.
+            log_level (str, optional): The log level of the JSON content. Defaults to "DEBUG".
+            max_items (int | None, optional): The maximum number of items of a list or
+                iterator to log. Defaults to None, which logs every item.
+        """
+        compiled, log_file_key, _ = self._binding
+        if compiled is not self._konfig._compiled:
+            compiled, log_file_key, _ = self._bind()
+        if log_file_key is None:
+            return
+        _emit_json(compiled, log_file_key, json_content, log_level, max_items)
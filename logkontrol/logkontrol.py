@@ -1,25 +1,871 @@
 # This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
 # https://creativecommons.org/publicdomain/zero/1.0
 
+import atexit
 import os
-import json
-from pathlib import Path
-from typing import Any
-import yaml
-from datetime import datetime
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+from .cache import config_signature, read_cached_config, write_cached_config
+from .coalescing import Coalescer, RepeatRun, resolve_record
+from .metrics import MetricsReporter, PipelineMetrics
+from .recorder import FlightRecorder, install_excepthooks
+from .routing import RouteTable
+from .formatting import (
+    DEFAULT_TIMESTAMP_FORMAT,
+    JsonLinesFormatter,
+    RecordFormatter,
+    is_streamable_json,
+    lazy,
+    read_items,
+    resolve_lazy,
+    truncate_string,
+)
+from .rotation import LOG_FILE_HEADER, RotationPolicy
+from .sampling import (
+    DEFAULT_SUMMARY_INTERVAL,
+    SUMMARY_LEVEL,
+    RecordGate,
+    format_summary,
+)
+from .sinks import (
+    DEFAULT_CONSOLE_FLUSH_INTERVAL_MS,
+    DEFAULT_FLUSH_BYTES,
+    DEFAULT_MAX_OPEN_FILES,
+    FLUSH_IMMEDIATELY_LEVELS,
+    UNBUFFERED,
+    BackgroundWriter,
+    FlushPolicy,
+    SinkPool,
+)
+from .watcher import DEFAULT_POLL_INTERVAL, ConfigWatcher
+
+if TYPE_CHECKING:
+    from .binary import BinaryFormatter
+
+# Severity of each log level. TRUNCATED is a DEBUG record whose values are shortened.
+LOG_LEVELS = {
+    "DEBUG": 10,
+    "TRUNCATED": 10,
+    "INFO": 20,
+    "WARNING": 30,
+    "WARN": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
+
+# The level of the record that introduces the records of a flight recorder.
+RECORDER_DUMP_LEVEL = "INFO"
+
+# Seconds between reports of the "metrics_report" section.
+DEFAULT_METRICS_INTERVAL = 60
+
+# The shortest time between two checks for summaries that are due.
+MIN_SUMMARY_CHECK_INTERVAL = 0.1
+
+# The "console_output" value that writes records to their file and the console.
+CONSOLE_TEE = "tee"
+
+# Formatter of each value accepted in the "log_file_formats" section, or the module
+# it is imported from the first time a key uses it.
+LOG_FILE_FORMATS = {
+    "text": RecordFormatter,
+    "jsonl": JsonLinesFormatter,
+    "binary": ".binary.BinaryFormatter",
+}
+
+
+def _config_section(config: dict, section: str) -> dict:
+    """
+    Returns a section of the configuration that maps log file keys to options.
+
+    Args:
+        config (dict): The logging configuration.
+        section (str): The name of the section.
+
+    Returns:
+        dict: The section, or an empty dict if it is missing.
+
+    Raises:
+        ValueError: If the section is not a mapping.
+    """
+    options = config.get(section) or {}
+    if not isinstance(options, dict):
+        raise ValueError(f"{section} must be a mapping")
+    return options
+
+
+class CompiledConfig:
+    """
+    A logging configuration with its thresholds, formatters, gates and file
+    policies built and validated.
+
+    Instances are never changed once built. LogKonfig swaps in a new one with a
+    single assignment, and every log call reads it once, so a call never sees part
+    of an old configuration and part of a new one.
+    """
+
+    def __init__(self, config: dict | None = None) -> None:
+        """
+        Builds everything a configuration describes.
+
+        Args:
+            config (dict | None, optional): The logging configuration. Anything that
+                is not a dict leaves logging unconfigured.
+
+        Raises:
+            ValueError: If the configuration is invalid.
+        """
+        self.config = config
+        if isinstance(config, dict):
+            max_open_files = config.get("max_open_files", DEFAULT_MAX_OPEN_FILES)
+            if (
+                not isinstance(max_open_files, int)
+                or isinstance(max_open_files, bool)
+                or max_open_files <= 0
+            ):
+                raise ValueError(
+                    f"max_open_files must be a positive integer, not {max_open_files!r}"
+                )
+            self.max_open_files = max_open_files
+            self.flush_policies = self._build_flush_policies(config)
+            self.console_policy = self._build_console_policy(config)
+            self.console_tee = config.get("console_output") == CONSOLE_TEE
+            self.rotation_policies = self._build_rotation_policies(config)
+            self.default_level_threshold, self.level_thresholds = (
+                self._build_level_thresholds(config)
+            )
+            self.formatter = RecordFormatter.from_config(config)
+            self.formatters = self._build_formatters(config)
+            self.binary_formats = self._build_binary_formats(config)
+            self.gates = self._build_gates(config)
+            self.coalescers = self._build_coalescers(config)
+            self.recorders = self._build_recorders(config)
+            self.routes = RouteTable.from_config(config, LOG_LEVELS)
+            self.output_paths = {
+                log_file_key: _output_path(config, log_file_key)
+                for log_file_key in config.get("log_file_paths") or {}
+            }
+            self.metrics_report = self._build_metrics_report(config)
+        else:
+            self.max_open_files = DEFAULT_MAX_OPEN_FILES
+            self.flush_policies: dict[str, FlushPolicy] = {}
+            self.console_policy = UNBUFFERED
+            self.console_tee = False
+            self.rotation_policies: dict[str, RotationPolicy] = {}
+            self.default_level_threshold = 0
+            self.level_thresholds: dict[str, int] = {}
+            self.formatter = RecordFormatter()
+            self.formatters: dict = {}
+            self.binary_formats: "dict[str, BinaryFormatter]" = {}
+            self.gates: dict[str, RecordGate] = {}
+            self.coalescers: dict[str, Coalescer] = {}
+            self.recorders: dict[str, FlightRecorder] = {}
+            self.routes: RouteTable | None = None
+            self.output_paths: dict[str, str | None] = {}
+            self.metrics_report: tuple[str, float] | None = None
+
+    @staticmethod
+    def _build_flush_policies(config: dict) -> dict[str, FlushPolicy]:
+        """
+        Builds the flush policy of each log file path from the "buffering" section.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            dict[str, FlushPolicy]: Flush policies keyed by log file path.
+        """
+        log_file_paths = config.get("log_file_paths") or {}
+        buffering = _config_section(config, "buffering")
+        policies = {}
+        for log_file_key, options in buffering.items():
+            if log_file_key not in log_file_paths:
+                raise ValueError(
+                    f"Buffering configured for unknown log file key: {log_file_key}"
+                )
+            policies[log_file_paths[log_file_key]] = FlushPolicy.from_config(options)
+        return policies
+
+    @staticmethod
+    def _build_console_policy(config: dict) -> FlushPolicy:
+        """
+        Builds the flush policy of console output from the "console_buffering"
+        section, which takes the same options as an entry of "buffering".
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            FlushPolicy: The console's flush policy. Console output is written every
+                DEFAULT_CONSOLE_FLUSH_INTERVAL_MS milliseconds unless configured.
+        """
+        if not config.get("console_output"):
+            return UNBUFFERED
+        if "console_buffering" not in config:
+            return FlushPolicy(DEFAULT_FLUSH_BYTES, DEFAULT_CONSOLE_FLUSH_INTERVAL_MS)
+        return FlushPolicy.from_config(config["console_buffering"])
+
+    @staticmethod
+    def _build_rotation_policies(config: dict) -> dict[str, RotationPolicy]:
+        """
+        Builds the rotation policy of each log file path from the "rotation" section.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            dict[str, RotationPolicy]: Rotation policies keyed by log file path.
+        """
+        log_file_paths = config.get("log_file_paths") or {}
+        rotation = _config_section(config, "rotation")
+        policies = {}
+        for log_file_key, options in rotation.items():
+            if log_file_key not in log_file_paths:
+                raise ValueError(
+                    f"Rotation configured for unknown log file key: {log_file_key}"
+                )
+            policies[log_file_paths[log_file_key]] = RotationPolicy.from_config(options)
+        return policies
+
+    @staticmethod
+    def _build_level_thresholds(config: dict) -> tuple[int, dict[str, int]]:
+        """
+        Builds the minimum severity of each log file key from the global "log_level"
+        and the per-key "log_levels" section.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            tuple[int, dict[str, int]]: The global threshold and the thresholds keyed
+                by log file key. A threshold of 0 lets every record through.
+        """
+
+        def level_value(log_level: Any) -> int:
+            value = LOG_LEVELS.get(str(log_level).upper())
+            if value is None:
+                raise ValueError(f"Invalid log level: {log_level}")
+            return value
+
+        log_file_paths = config.get("log_file_paths") or {}
+        default_threshold = 0
+        if config.get("log_level") is not None:
+            default_threshold = level_value(config["log_level"])
+        thresholds = {}
+        for log_file_key, log_level in _config_section(config, "log_levels").items():
+            if log_file_key not in log_file_paths:
+                raise ValueError(
+                    f"Log level configured for unknown log file key: {log_file_key}"
+                )
+            thresholds[log_file_key] = level_value(log_level)
+        return default_threshold, thresholds
+
+    def _build_formatters(self, config: dict) -> dict:
+        """
+        Builds the formatter of each log file key from the "log_file_formats" section.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            dict: Formatters keyed by log file key, for keys that do not use the
+                shared text formatter.
+        """
+        log_file_paths = config.get("log_file_paths") or {}
+        formatters = {}
+        for log_file_key, log_file_format in _config_section(
+            config, "log_file_formats"
+        ).items():
+            if log_file_key not in log_file_paths:
+                raise ValueError(
+                    f"Log file format configured for unknown log file key: {log_file_key}"
+                )
+            formatter_class = LOG_FILE_FORMATS.get(log_file_format)
+            if formatter_class is None:
+                raise ValueError(
+                    f"Invalid log file format: {log_file_format}. "
+                    f"Expected one of {', '.join(LOG_FILE_FORMATS)}"
+                )
+            if isinstance(formatter_class, str):
+                import importlib
+
+                module_name, _, class_name = formatter_class.rpartition(".")
+                module = importlib.import_module(module_name, __package__)
+                formatter_class = getattr(module, class_name)
+            if formatter_class is not RecordFormatter:
+                formatters[log_file_key] = formatter_class.from_config(
+                    config, log_file_key
+                )
+        return formatters
+
+    def _build_binary_formats(self, config: dict) -> "dict[str, BinaryFormatter]":
+        """
+        Collects the binary formatters, which write the header of each new binary
+        log file.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            dict[str, BinaryFormatter]: Binary formatters keyed by log file path.
+        """
+        log_file_paths = config.get("log_file_paths") or {}
+        return {
+            log_file_paths[log_file_key]: formatter
+            for log_file_key, formatter in self.formatters.items()
+            if formatter.binary
+        }
+
+    @staticmethod
+    def _build_gates(config: dict) -> dict[str, RecordGate]:
+        """
+        Builds the record gate of each log file key from the "rate_limits" and
+        "sampling" sections.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            dict[str, RecordGate]: Gates keyed by log file key, for keys that are
+                rate limited or sampled.
+        """
+        log_file_paths = config.get("log_file_paths") or {}
+        rate_limits = _config_section(config, "rate_limits")
+        sampling = _config_section(config, "sampling")
+        summary_interval = float(
+            config.get("suppression_summary_seconds", DEFAULT_SUMMARY_INTERVAL)
+        )
+        for section, name in ((rate_limits, "Rate limit"), (sampling, "Sampling")):
+            for log_file_key in section:
+                if log_file_key not in log_file_paths:
+                    raise ValueError(
+                        f"{name} configured for unknown log file key: {log_file_key}"
+                    )
+        return {
+            log_file_key: RecordGate.from_config(
+                rate_limits.get(log_file_key),
+                sampling.get(log_file_key),
+                summary_interval,
+            )
+            for log_file_key in {**rate_limits, **sampling}
+        }
+
+    @staticmethod
+    def _build_coalescers(config: dict) -> dict[str, Coalescer]:
+        """
+        Builds the coalescer of each log file key from the "coalescing" section.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            dict[str, Coalescer]: Coalescers keyed by log file key.
+        """
+        log_file_paths = config.get("log_file_paths") or {}
+        timestamp_format = config.get("timestamp_format") or DEFAULT_TIMESTAMP_FORMAT
+        coalescers = {}
+        for log_file_key, options in _config_section(config, "coalescing").items():
+            if log_file_key not in log_file_paths:
+                raise ValueError(
+                    f"Coalescing configured for unknown log file key: {log_file_key}"
+                )
+            if options is False:
+                continue
+            coalescers[log_file_key] = Coalescer.from_config(options, timestamp_format)
+        return coalescers
+
+    def _build_recorders(self, config: dict) -> dict[str, FlightRecorder]:
+        """
+        Builds the flight recorder of each log file key from the "flight_recorder"
+        section.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            dict[str, FlightRecorder]: Flight recorders keyed by log file key.
+        """
+        log_file_paths = config.get("log_file_paths") or {}
+        recorders = {}
+        for log_file_key, options in _config_section(config, "flight_recorder").items():
+            if log_file_key not in log_file_paths:
+                raise ValueError(
+                    f"Flight recorder configured for unknown log file key: {log_file_key}"
+                )
+            if options is False:
+                continue
+            recorder = FlightRecorder.from_config(options, LOG_LEVELS)
+            if recorder.formatted and self.get_formatter(log_file_key).binary:
+                # Binary entries refer to names defined by earlier entries, which
+                # would be lost along with discarded records.
+                raise ValueError(
+                    f"Flight recorder of binary log file key {log_file_key} "
+                    "must use the raw mode"
+                )
+            recorders[log_file_key] = recorder
+        return recorders
+
+    @staticmethod
+    def _build_metrics_report(config: dict) -> tuple[str, float] | None:
+        """
+        Reads the "metrics_report" section, which writes LogKonfig().stats() to a log
+        file key at a fixed interval.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Returns:
+            tuple[str, float] | None: The log file key and the number of seconds
+                between reports, or None if metrics are not reported.
+        """
+        options = config.get("metrics_report")
+        if not options:
+            return None
+        if not isinstance(options, dict):
+            raise ValueError("metrics_report must be a mapping")
+        unknown = set(options) - {"log_file_key", "interval_seconds"}
+        if unknown:
+            raise ValueError(f"Unknown metrics_report options: {sorted(unknown)}")
+        log_file_key = options.get("log_file_key")
+        if log_file_key not in (config.get("log_file_paths") or {}):
+            raise ValueError(
+                f"metrics_report needs a configured log_file_key, not {log_file_key!r}"
+            )
+        interval = float(options.get("interval_seconds", DEFAULT_METRICS_INTERVAL))
+        if interval <= 0:
+            raise ValueError("metrics_report interval_seconds must be positive")
+        return log_file_key, interval
+
+    def get_formatter(self, log_file_key: str | None = None):
+        """
+        Returns the formatter used for a log file key.
+
+        Args:
+            log_file_key (str | None, optional): The key of the log file path. The
+                shared text formatter is returned if None.
+
+        Returns:
+            RecordFormatter | JsonLinesFormatter | BinaryFormatter: The formatter of
+                the key.
+        """
+        return self.formatters.get(log_file_key, self.formatter)
+
+    def is_level_enabled(self, log_file_key: str, log_level: str) -> bool:
+        """
+        Checks whether records of a level are written to a log file key.
+
+        Args:
+            log_file_key (str): The key of the log file path in the logging configuration.
+            log_level (str): The log level of the record.
+
+        Returns:
+            bool: True if the record passes the configured threshold. Levels that are
+                not known to logkontrol always pass.
+        """
+        threshold = self.level_thresholds.get(
+            log_file_key, self.default_level_threshold
+        )
+        if not threshold:
+            return True
+        value = LOG_LEVELS.get(log_level)
+        if value is None:
+            value = LOG_LEVELS.get(str(log_level).upper(), threshold)
+        return value >= threshold
+
+    def is_level_recorded(self, log_file_key: str, log_level: str) -> bool:
+        """
+        Checks whether records of a level that are not written to a log file key are
+        kept by its flight recorder.
+        """
+        recorder = self.recorders.get(log_file_key)
+        if recorder is None:
+            return False
+        value = LOG_LEVELS.get(log_level)
+        if value is None:
+            value = LOG_LEVELS.get(str(log_level).upper(), recorder.threshold)
+        return value >= recorder.threshold
+
+    def record_filtered(
+        self, log_file_key: str, log_level: str, kind: str, first: Any, second: Any
+    ) -> None:
+        """
+        Keeps a record that is not written in the flight recorder of its key, if the
+        key has one and the level is recorded.
+
+        Args:
+            log_file_key (str): The key of the log file path in the logging configuration.
+            log_level (str): The log level of the record.
+            kind (str): "message", "call" or "json".
+            first: The message, function name or JSON content of the record.
+            second: The variables, arguments or max_items of the record.
+        """
+        recorder = self.recorders.get(log_file_key)
+        if recorder is None or not self.is_level_recorded(log_file_key, log_level):
+            return
+        if recorder.formatted:
+            log_entry = self._format_record(log_file_key, log_level, kind, first, second)
+            recorder.record(log_level, "entry", log_entry, None)
+            return
+        if kind == "json":
+            # Iterators can only be read once, so read them now.
+            first = read_items(first, second)
+        recorder.record(log_level, kind, first, second)
+
+    def _format_record(
+        self,
+        log_file_key: str,
+        log_level: str,
+        kind: str,
+        first: Any,
+        second: Any,
+        created: float | None = None,
+    ) -> str | bytes:
+        formatter = self.get_formatter(log_file_key)
+        if kind == "message":
+            return formatter.format_message(first, second, log_level, created)
+        if kind == "call":
+            return formatter.format_function_call(first, second, log_level, created)
+        if kind == "json":
+            return formatter.format_json(first, log_level, second, created)
+        return first
+
+    def dump_recorder(
+        self, log_file_key: str, trigger: str, exception: BaseException | None = None
+    ) -> list[tuple[str | bytes, str]]:
+        """
+        Empties the flight recorder of a log file key and formats its records, each
+        with the time it was logged, after a record saying why they are written.
+
+        Args:
+            log_file_key (str): The key of the log file path in the logging configuration.
+            trigger (str): What caused the dump.
+            exception (BaseException | None, optional): The unhandled exception that
+                caused the dump, if any.
+
+        Returns:
+            list[tuple[str | bytes, str]]: The formatted entry and level of each record
+                to write, oldest first, or nothing if no records were kept.
+        """
+        recorder = self.recorders.get(log_file_key)
+        records = [] if recorder is None else recorder.drain()
+        if not records:
+            return []
+        variables = {"trigger": trigger}
+        if exception is not None:
+            variables["exception"] = f"{type(exception).__name__}: {exception}"
+        log_entries = [
+            (
+                self.get_formatter(log_file_key).format_message(
+                    f"Flight recorder: {len(records)} earlier records",
+                    variables,
+                    RECORDER_DUMP_LEVEL,
+                ),
+                RECORDER_DUMP_LEVEL,
+            )
+        ]
+        for created, log_level, kind, first, second in records:
+            log_entries.append(
+                (
+                    self._format_record(
+                        log_file_key, log_level, kind, first, second, created
+                    ),
+                    log_level,
+                )
+            )
+        return log_entries
+
+    def destinations(
+        self, log_file_keys: str | Iterable[str], log_level: str
+    ) -> tuple[str, ...]:
+        """
+        Returns the log file keys a record is written to: the keys it was logged to
+        and the keys the "routes" section sends it to, each key once.
+
+        Args:
+            log_file_keys (str | Iterable[str]): The key or keys the record was
+                logged to.
+            log_level (str): The log level of the record.
+
+        Returns:
+            tuple[str, ...]: The destination keys, in order.
+        """
+        if self.routes is not None:
+            return self.routes.destinations(log_file_keys, log_level)
+        if isinstance(log_file_keys, str):
+            return (log_file_keys,)
+        return tuple(dict.fromkeys(log_file_keys))
+
+    def route_record(
+        self,
+        log_file_keys: tuple[str, ...],
+        log_level: str,
+        kind: str,
+        first: Any,
+        second: Any,
+    ) -> list[tuple[str | None, str, str | bytes, str, int | None]]:
+        """
+        Decides which of several log file keys write a record, then formats it once
+        for each formatter those keys use. Keys that write to the same file get a
+        single entry.
+
+        Each key applies its own level threshold, rate limit, sampling, coalescing
+        and flight recorder. Lazy values are resolved once, before formatting, and
+        every formatter is given the same time.
+
+        Args:
+            log_file_keys (tuple[str, ...]): The destination keys of the record.
+            log_level (str): The log level of the record.
+            kind (str): "message", "call" or "json".
+            first: The message, function name or JSON content of the record.
+            second: The variables, arguments or max_items of the record.
+
+        Returns:
+            list[tuple[str | None, str, str | bytes, str, int | None]]: The output
+                path, log file key, entry and level of each entry to write, in
+                order, with the nanoseconds spent formatting records. Summaries and
+                flight recorder records have None instead.
+        """
+        outputs = []
+        admitted = []
+        for log_file_key in log_file_keys:
+            log_file_path = self.output_paths[log_file_key]
+            allowed, summary = self.check_record(log_file_key, log_level)
+            if summary is not None:
+                outputs.append((log_file_path, log_file_key, *summary, None))
+            if not allowed:
+                if self.is_level_recorded(log_file_key, log_level):
+                    if kind == "json":
+                        # Iterators can only be read once, and other keys may
+                        # need the items.
+                        first = read_items(first, second)
+                    self.record_filtered(log_file_key, log_level, kind, first, second)
+                continue
+            if self.recorders and log_level in FLUSH_IMMEDIATELY_LEVELS:
+                for log_entry, entry_level in self.dump_recorder(
+                    log_file_key, f"{log_level} record"
+                ):
+                    outputs.append(
+                        (log_file_path, log_file_key, log_entry, entry_level, None)
+                    )
+            admitted.append((log_file_key, log_file_path))
+        if not admitted:
+            return outputs
+
+        if kind == "json":
+            # Iterators can only be read once, and every formatter needs the items.
+            first = read_items(first, second)
+        if self.formatters or self.coalescers:
+            # Lazy values are computed once, however many formatters use them.
+            if kind == "message":
+                first, second = resolve_record(first, second)
+            elif kind == "call":
+                _, second = resolve_record(None, second)
+        written: dict[str | None, str] = {}
+        for log_file_key, log_file_path in admitted:
+            if log_file_key in self.coalescers:
+                repeated, summary = self.check_repeat(
+                    log_file_key,
+                    log_level,
+                    None if kind == "json" else (kind, first, second),
+                )
+                if summary is not None:
+                    outputs.append((log_file_path, log_file_key, *summary, None))
+                if repeated:
+                    continue
+            written.setdefault(log_file_path, log_file_key)
+
+        # Formatters of different keys stamp the record with the same time.
+        created = time.time() if self.formatters and len(written) > 1 else None
+        log_entries: dict[int, str | bytes] = {}
+        for log_file_path, log_file_key in written.items():
+            started = time.perf_counter_ns()
+            formatter = self.formatters.get(log_file_key, self.formatter)
+            log_entry = log_entries.get(id(formatter))
+            if log_entry is None:
+                log_entry = self._format_record(
+                    log_file_key, log_level, kind, first, second, created
+                )
+                log_entries[id(formatter)] = log_entry
+            outputs.append(
+                (
+                    log_file_path,
+                    log_file_key,
+                    log_entry,
+                    log_level,
+                    time.perf_counter_ns() - started,
+                )
+            )
+        return outputs
+
+    def summary_check_interval(self) -> float | None:
+        """
+        Returns how often LogKonfig looks for suppression summaries that are due
+        and runs of repeats that have lasted their window, while no record arrives
+        to carry them, or None if no key writes summaries.
+        """
+        intervals = [gate.summary_interval for gate in self.gates.values()]
+        intervals += [coalescer.window_seconds for coalescer in self.coalescers.values()]
+        if not intervals:
+            return None
+        return max(min(intervals) / 2, MIN_SUMMARY_CHECK_INTERVAL)
+
+    def is_coalescing(self, log_file_key: str) -> bool:
+        """
+        Checks whether repeated records of a log file key are coalesced.
+        """
+        return log_file_key in self.coalescers
+
+    def check_record(
+        self, log_file_key: str, log_level: str
+    ) -> tuple[bool, tuple[str | bytes, str] | None]:
+        """
+        Decides whether a record is written to a log file key, by level and then by
+        the key's rate limit and sampling rates.
+
+        Args:
+            log_file_key (str): The key of the log file path in the logging configuration.
+            log_level (str): The log level of the record.
+
+        Returns:
+            tuple[bool, tuple[str | bytes, str] | None]: Whether the record should be
+                written, and the formatted summary entry and its level, if one is due.
+        """
+        if not self.is_level_enabled(log_file_key, log_level):
+            return False, None
+        gate = self.gates.get(log_file_key)
+        if gate is None:
+            return True, None
+        admitted, suppressed = gate.admit(log_level)
+        if not suppressed:
+            return admitted, None
+        return admitted, self._format_summary(log_file_key, suppressed)
+
+    def _format_summary(self, log_file_key: str, suppressed: dict) -> tuple[str | bytes, str]:
+        message, variables = format_summary(suppressed)
+        log_entry = self.get_formatter(log_file_key).format_message(
+            message, variables, SUMMARY_LEVEL
+        )
+        return log_entry, SUMMARY_LEVEL
+
+    def check_repeat(
+        self, log_file_key: str, log_level: str, content: tuple | None
+    ) -> tuple[bool, tuple[str | bytes, str] | None]:
+        """
+        Checks whether a record repeats the previous record of a log file key.
+
+        Args:
+            log_file_key (str): The key of the log file path in the logging configuration.
+            log_level (str): The log level of the record.
+            content (tuple | None): The resolved message and values of the record,
+                or None for records that are never coalesced.
+
+        Returns:
+            tuple[bool, tuple[str | bytes, str] | None]: Whether the record is held
+                back, and the formatted summary entry and its level, if a run ended.
+        """
+        coalescer = self.coalescers.get(log_file_key)
+        if coalescer is None:
+            return False, None
+        repeated, run = coalescer.observe(log_level, content)
+        if run is None:
+            return repeated, None
+        return repeated, self._format_repeats(log_file_key, coalescer, run)
+
+    def _format_repeats(
+        self, log_file_key: str, coalescer: Coalescer, run: RepeatRun
+    ) -> tuple[str | bytes, str]:
+        message, variables = coalescer.describe(run)
+        log_entry = self.get_formatter(log_file_key).format_message(
+            message, variables, run.log_level
+        )
+        return log_entry, run.log_level
+
+    def drain_repeats(self) -> list[tuple[str, str | bytes, str]]:
+        """
+        Ends every run of held back repeats.
+
+        Returns:
+            list[tuple[str, str | bytes, str]]: The log file key, formatted summary
+                entry and level of each run that was ended.
+        """
+        summaries = []
+        for log_file_key, coalescer in self.coalescers.items():
+            run = coalescer.drain()
+            if run is not None:
+                summaries.append(
+                    (log_file_key, *self._format_repeats(log_file_key, coalescer, run))
+                )
+        return summaries
+
+    def expire_repeats(self, write: Callable[[str, str | bytes, str], None]) -> None:
+        """
+        Ends every run of held back repeats that has lasted its key's window.
+
+        Args:
+            write (Callable[[str, str | bytes, str], None]): Writes the log file key,
+                formatted summary entry and level of each run that was ended.
+        """
+        for log_file_key, coalescer in self.coalescers.items():
+
+            def emit(run: RepeatRun, log_file_key=log_file_key, coalescer=coalescer):
+                write(log_file_key, *self._format_repeats(log_file_key, coalescer, run))
+
+            coalescer.expire(emit)
+
+    def drain_suppressed(self, due_only: bool = False) -> list[tuple[str, str | bytes, str]]:
+        """
+        Collects the summaries of records suppressed and not yet reported.
+
+        Args:
+            due_only (bool, optional): Only collect the summaries of keys whose
+                summary interval has passed. Defaults to False.
+
+        Returns:
+            list[tuple[str, str | bytes, str]]: The log file key, formatted summary
+                entry and level of each key with suppressed records.
+        """
+        summaries = []
+        for log_file_key, gate in self.gates.items():
+            suppressed = gate.drain_due() if due_only else gate.drain()
+            if suppressed:
+                summaries.append(
+                    (log_file_key, *self._format_summary(log_file_key, suppressed))
+                )
+        return summaries
 
 
 class LogKonfig:
     _instance = None
-    _logging_config = None
+    _compiled = CompiledConfig()
+    _sink_pool = None
+    _background_writer = None
+    _collector = None
+    _config_watcher = None
+    # The config file version the running configuration was loaded from by
+    # init_logging(config_cache_path=...), if it still is the running one.
+    _config_signature = None
+    _metrics = PipelineMetrics()
+    _metrics_reporter = None
+    _summary_reporter = None
+    _config_lock = None
+    _loggers: dict = {}
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance._sink_pool = SinkPool()
+            cls._instance._config_lock = threading.Lock()
+            cls._instance._loggers = {}
+            atexit.register(cls._instance.shutdown)
         return cls._instance
 
     def init_logging(
-        self, config_file_path: str | None = None, log_directory: str = "logs"
+        self,
+        config_file_path: str | None = None,
+        log_directory: str = "logs",
+        watch_interval: float | None = None,
+        config_cache_path: str | None = None,
     ) -> None:
         """
         Initializes the logging configuration.
@@ -29,6 +875,12 @@ class LogKonfig:
                 If not provided, defaults to "logging_config.yaml".
             log_directory (str, optional): The directory where log files will be stored.
                 Defaults to "logs".
+            watch_interval (float | None, optional): If set, the configuration file is
+                polled every watch_interval seconds and applied again when it changes.
+            config_cache_path (str | None, optional): If set, the parsed and validated
+                configuration is cached in this file, keyed by the config file's
+                path, modification time and size, and later starts read it from
+                there instead of parsing the YAML.
         """
         if config_file_path is None:
             config_file_path = "logging_config.yaml"
@@ -49,22 +901,441 @@ class LogKonfig:
             }
 
             # Write the default configuration to the YAML file
+            import yaml
+
             with open(config_file_path, "w") as config_file:
                 yaml.dump(default_config, config_file)
 
         # Load the logging configuration from the YAML file
-        self._logging_config = self.load_logging_config(config_file_path)
+        if config_cache_path is None:
+            self.set_logging_config(self.load_logging_config(config_file_path))
+        else:
+            self._apply_cached_config(config_file_path, config_cache_path)
 
         # Initialize the log files if the logging configuration is loaded successfully
-        if self._logging_config is not None:
-            for log_file_key in self._logging_config["log_file_paths"]:
+        if self._compiled.config is not None:
+            for log_file_key in self._compiled.config["log_file_paths"]:
                 self.initialize_log_file(log_file_key)
 
+        if watch_interval is not None:
+            self.watch_config(config_file_path, watch_interval)
+
+    def _apply_cached_config(self, config_file_path: str, config_cache_path: str) -> None:
+        signature = config_signature(config_file_path)
+        if signature == self._config_signature:
+            # This version of the file is already the running configuration.
+            return
+        config = read_cached_config(config_cache_path, signature)
+        if config is None:
+            config = self.load_logging_config(config_file_path)
+            self.set_logging_config(config)
+            if isinstance(config, dict):
+                write_cached_config(config_cache_path, signature, config)
+        else:
+            self.set_logging_config(config)
+        self._config_signature = signature
+
     def get_logging_config(self) -> dict | None:
-        return self._logging_config
+        return self._compiled.config
+
+    def get_compiled_config(self) -> CompiledConfig:
+        """
+        Returns the configuration log calls currently read.
+        """
+        return self._compiled
 
     def set_logging_config(self, config: dict) -> None:
-        self._logging_config = config
+        """
+        Validates and builds a logging configuration, then makes it the one log
+        calls read. Nothing changes if the configuration is invalid.
+
+        Args:
+            config (dict): The logging configuration.
+
+        Raises:
+            ValueError: If the configuration is invalid.
+        """
+        compiled = CompiledConfig(config)
+        with self._config_lock:
+            collector = None
+            if isinstance(config, dict) and config.get("collector"):
+                from .collector import CollectorClient
+
+                collector = CollectorClient.from_config(
+                    self._sink_pool, config["collector"], self._metrics.record_error
+                )
+            background_writer = None
+            if isinstance(config, dict) and config.get("background_writer"):
+                background_writer = BackgroundWriter.from_config(
+                    self._sink_pool,
+                    config["background_writer"],
+                    self._metrics.record_error,
+                )
+            # Records queued under the previous configuration belong to its files,
+            # and handles opened for it may point at paths that are no longer
+            # configured, so drain the writer and start from an empty pool.
+            self.shutdown()
+            self._sink_pool.max_open_files = compiled.max_open_files
+            self._sink_pool.set_flush_policies(compiled.flush_policies)
+            self._sink_pool.set_console(compiled.console_policy, compiled.console_tee)
+            self._sink_pool.set_rotation_policies(compiled.rotation_policies)
+            self._sink_pool.set_binary_formats(compiled.binary_formats)
+            self._background_writer = background_writer
+            self._collector = collector
+            self._compiled = compiled
+            self._config_signature = None
+            if compiled.recorders:
+                install_excepthooks(self._dump_on_exception)
+            if compiled.metrics_report is not None:
+                log_file_key, interval = compiled.metrics_report
+                self._metrics_reporter = MetricsReporter(
+                    interval,
+                    lambda: log_json_content(log_file_key, self.stats(), log_level="INFO"),
+                    on_error=lambda error: self._record_report_error(log_file_key, error),
+                )
+            summary_interval = compiled.summary_check_interval()
+            if summary_interval is not None:
+                self._summary_reporter = MetricsReporter(
+                    summary_interval, self._write_due_summaries, "summaries"
+                )
+
+    def watch_config(
+        self, config_file_path: str, interval: float = DEFAULT_POLL_INTERVAL
+    ) -> ConfigWatcher:
+        """
+        Applies a configuration file again whenever it changes, polling its
+        modification time from a background thread. Replaces any previous watcher.
+
+        Log calls keep reading the configuration that was in place until the new
+        one is fully built; an invalid file leaves the current configuration alone.
+
+        Args:
+            config_file_path (str): The path to the logging configuration file.
+            interval (float, optional): The number of seconds between polls.
+
+        Returns:
+            ConfigWatcher: The running watcher.
+        """
+        self.stop_watching()
+        watcher = ConfigWatcher(
+            config_file_path, self.load_logging_config, self.set_logging_config, interval
+        )
+        watcher.start()
+        atexit.register(watcher.stop)
+        self._config_watcher = watcher
+        return watcher
+
+    def stop_watching(self) -> None:
+        """
+        Stops the configuration file watcher, if any.
+        """
+        watcher = self._config_watcher
+        if watcher is not None:
+            watcher.stop()
+            atexit.unregister(watcher.stop)
+            self._config_watcher = None
+
+    def get_logger(self, log_file_key: str | None = None):
+        """
+        Returns a handle that logs to one log file key without looking the key up on
+        every call. The handle follows configuration changes.
+
+        Args:
+            log_file_key (str | None, optional): The key of the log file path in the
+                logging configuration. Defaults to the only configured key.
+
+        Returns:
+            Logger: The handle of the key, shared by every caller.
+        """
+        logger = self._loggers.get(log_file_key)
+        if logger is None:
+            from .logger import Logger
+
+            logger = self._loggers.setdefault(log_file_key, Logger(log_file_key))
+        return logger
+
+    def is_level_enabled(self, log_file_key: str, log_level: str) -> bool:
+        """
+        Checks whether records of a level are written to a log file key.
+
+        Args:
+            log_file_key (str): The key of the log file path in the logging configuration.
+            log_level (str): The log level of the record.
+
+        Returns:
+            bool: True if the record passes the configured threshold.
+        """
+        return self._compiled.is_level_enabled(log_file_key, log_level)
+
+    def get_formatter(self, log_file_key: str | None = None):
+        """
+        Returns the formatter used for a log file key.
+
+        Args:
+            log_file_key (str | None, optional): The key of the log file path. The
+                shared text formatter is returned if None.
+
+        Returns:
+            RecordFormatter | JsonLinesFormatter | BinaryFormatter: The formatter of
+                the key.
+        """
+        return self._compiled.get_formatter(log_file_key)
+
+    def admit_record(self, log_file_key: str, log_level: str) -> bool:
+        """
+        Decides whether a record is written to a log file key, by level and then by
+        the key's rate limit and sampling rates. Called before the record is
+        formatted. Writes a summary of suppressed records when one is due.
+
+        Args:
+            log_file_key (str): The key of the log file path in the logging configuration.
+            log_level (str): The log level of the record.
+
+        Returns:
+            bool: True if the record should be formatted and written.
+        """
+        return _admit_record(self._compiled, log_file_key, log_level)
+
+    def is_repeat(
+        self, log_file_key: str, log_level: str, content: tuple | None
+    ) -> bool:
+        """
+        Checks whether a record repeats the previous record of a log file key, and
+        writes the summary of a run of repeats that just ended.
+
+        Args:
+            log_file_key (str): The key of the log file path in the logging configuration.
+            log_level (str): The log level of the record.
+            content (tuple | None): The resolved message and values of the record,
+                or None for records that are never coalesced.
+
+        Returns:
+            bool: True if the record is held back as a repeat.
+        """
+        return _is_repeat(self._compiled, log_file_key, log_level, content)
+
+    def flush_summaries(self, due_only: bool = False) -> None:
+        """
+        Writes a summary record for every log file key with suppressed records not
+        yet reported.
+
+        Args:
+            due_only (bool, optional): Only write the summaries of keys whose
+                summary interval has passed. Defaults to False.
+        """
+        compiled = self._compiled
+        for log_file_key, log_entry, log_level in compiled.drain_suppressed(due_only):
+            _write_log_entry(compiled.config, log_file_key, log_entry, log_level)
+
+    def flush_repeats(self) -> None:
+        """
+        Ends every run of held back repeats and writes its summary.
+        """
+        compiled = self._compiled
+        for log_file_key, log_entry, log_level in compiled.drain_repeats():
+            _write_log_entry(compiled.config, log_file_key, log_entry, log_level)
+
+    def _record_report_error(self, log_file_key: str, error: Exception) -> None:
+        # Failed writes to the file are already counted where they happen.
+        log_file_path = self._compiled.output_paths.get(log_file_key)
+        if log_file_path is not None and not isinstance(error, OSError):
+            self._metrics.record_error(log_file_path)
+
+    def _write_due_summaries(self) -> None:
+        # Called periodically, so summaries are written even while nothing else is.
+        compiled = self._compiled
+        compiled.expire_repeats(
+            lambda log_file_key, log_entry, log_level: _write_log_entry(
+                compiled.config, log_file_key, log_entry, log_level
+            )
+        )
+        self.flush_summaries(due_only=True)
+
+    def dump_flight_recorder(
+        self, log_file_key: str | None = None, trigger: str = "requested"
+    ) -> int:
+        """
+        Writes the records kept by flight recorders to their log files and empties
+        the recorders.
+
+        Args:
+            log_file_key (str | None, optional): The key whose recorder is written.
+                Defaults to every key with a flight recorder.
+            trigger (str, optional): What caused the dump, written before the records.
+
+        Returns:
+            int: The number of records written.
+        """
+        compiled = self._compiled
+        log_file_keys = compiled.recorders if log_file_key is None else [log_file_key]
+        written = 0
+        for key in log_file_keys:
+            log_entries = compiled.dump_recorder(key, trigger)
+            _write_recorded(compiled, key, log_entries)
+            written += max(len(log_entries) - 1, 0)
+        return written
+
+    def _dump_on_exception(self, exception: BaseException) -> None:
+        compiled = self._compiled
+        for log_file_key in compiled.recorders:
+            _write_recorded(
+                compiled,
+                log_file_key,
+                compiled.dump_recorder(log_file_key, "unhandled exception", exception),
+            )
+        self.flush()
+
+    def get_sink_pool(self) -> SinkPool:
+        return self._sink_pool
+
+    def get_background_writer(self) -> BackgroundWriter | None:
+        return self._background_writer
+
+    def get_collector(self):
+        """
+        Returns the client sending records to the collector process, if the
+        configuration has a "collector" section.
+        """
+        return self._collector
+
+    def write_entry(
+        self, log_file_path: str | None, log_entry: str, log_level: str | None = None
+    ) -> None:
+        """
+        Writes a formatted log entry to a log file, through the collector process or
+        the background writer when one is configured. Console entries are already
+        written in batches and skip both.
+
+        Args:
+            log_file_path (str | None): The path of the log file, or None for the
+                console.
+            log_entry (str): The fully formatted log entry.
+            log_level (str | None, optional): The level of the entry.
+        """
+        background_writer = self._background_writer
+        if log_file_path is None:
+            self._sink_pool.console.write(log_entry, log_level)
+        elif self._collector is not None:
+            self._collector.write(log_file_path, log_entry, log_level)
+        elif background_writer is not None:
+            background_writer.submit(log_file_path, log_entry, log_level)
+        else:
+            self._sink_pool.write(log_file_path, log_entry, log_level)
+
+    def write_stream(
+        self,
+        log_file_path: str | None,
+        parts: Iterable[str],
+        log_level: str | None = None,
+    ) -> None:
+        """
+        Writes a log entry produced piece by piece, in bounded chunks, without
+        joining it in memory first.
+
+        Records already queued on the background writer are written first so the
+        file keeps the order in which records were logged. Entries sent to the
+        collector process are joined, since they travel as one record.
+
+        Args:
+            log_file_path (str | None): The path of the log file, or None for the
+                console.
+            parts (Iterable[str]): The pieces of the log entry, in order.
+            log_level (str | None, optional): The level of the entry.
+        """
+        collector = self._collector
+        if collector is not None and log_file_path is not None:
+            parts = list(parts)
+            if parts:
+                collector.write(log_file_path, parts[0][:0].join(parts), log_level)
+            return
+        background_writer = self._background_writer
+        if background_writer is not None:
+            background_writer.wait_idle()
+        self._sink_pool.write_stream(log_file_path, parts, log_level)
+
+    def get_dropped_counts(self) -> dict[str, int]:
+        """
+        Returns the number of records dropped by the background writer's
+        backpressure policy, keyed by log file path.
+        """
+        if self._background_writer is None:
+            return {}
+        return self._background_writer.dropped_counts()
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the logging pipeline's counters since the process
+        started or reset_stats() was called.
+
+        Returns:
+            dict: Records, bytes, formatting and write seconds per log file key and
+                level, totals of the formatting and write seconds, a histogram of
+                write latencies, write errors and records dropped by the background
+                writer, both keyed by log file path.
+        """
+        stats = self._metrics.snapshot()
+        stats["dropped"] = self.get_dropped_counts()
+        return stats
+
+    def reset_stats(self) -> None:
+        """
+        Sets every counter reported by stats() back to zero.
+        """
+        self._metrics.reset()
+
+    def shutdown(self, timeout: float | None = None) -> bool:
+        """
+        Sends pending records to the collector process and disconnects, stops the
+        background writer, if any, after draining its queue, then flushes and
+        closes every log file handle.
+
+        Args:
+            timeout (float | None, optional): The maximum number of seconds to wait
+                for queued records. Waits indefinitely if None.
+
+        Returns:
+            bool: True if every queued record was written before the timeout.
+        """
+        metrics_reporter = self._metrics_reporter
+        if metrics_reporter is not None:
+            metrics_reporter.stop()
+            self._metrics_reporter = None
+        summary_reporter = self._summary_reporter
+        if summary_reporter is not None:
+            summary_reporter.stop()
+            self._summary_reporter = None
+        self.flush_repeats()
+        self.flush_summaries()
+        drained = True
+        collector = self._collector
+        if collector is not None:
+            collector.close()
+            self._collector = None
+        background_writer = self._background_writer
+        if background_writer is not None:
+            drained = background_writer.shutdown(timeout)
+            self._background_writer = None
+        self._sink_pool.close_all()
+        return drained
+
+    def flush(self) -> None:
+        """
+        Writes all buffered log records to their files, ending held back runs of
+        repeated records with their summaries first.
+        """
+        self.flush_repeats()
+        if self._collector is not None:
+            self._collector.flush()
+        self._sink_pool.flush_all()
+
+    def close(self) -> None:
+        """
+        Flushes buffered records and closes every open log file handle. Handles are
+        reopened on the next write.
+        """
+        if self._collector is not None:
+            self._collector.flush()
+        self._sink_pool.close_all()
 
     @staticmethod
     def load_logging_config(config_file_path: str) -> dict:
@@ -77,8 +1348,9 @@ class LogKonfig:
         Returns:
             dict: The loaded logging configuration.
         """
-        config_path = Path(config_file_path)
-        with open(config_path, "r") as config_file:
+        import yaml
+
+        with open(config_file_path, "r") as config_file:
             config = yaml.safe_load(config_file)
         return config
 
@@ -89,24 +1361,30 @@ class LogKonfig:
         Args:
             log_file_key (str): The key of the log file path in the logging configuration.
         """
-        if self._logging_config is None:
+        logging_config = self._compiled.config
+        if logging_config is None:
             raise ValueError(
                 "Logging configuration is not initialized. Please call init_logging() first"
             )
 
         # Check if log_file_key is not provided and if only one log path is configured
         if log_file_key is None:
-            keys = list(self._logging_config["log_file_paths"].keys())
+            keys = list(logging_config["log_file_paths"].keys())
             if len(keys) == 1:
                 log_file_key = keys[0]
             else:
                 print("Multiple log files configured, please specify a log_file_key.")
                 return
 
-        log_file_path = self._logging_config["log_file_paths"][log_file_key]
+        log_file_path = logging_config["log_file_paths"][log_file_key]
         if not os.path.exists(log_file_path):
+            formatter = self.get_formatter(log_file_key)
+            if formatter.binary:
+                with open(log_file_path, "wb") as log_file:
+                    log_file.write(formatter.file_header())
+                return
             with open(log_file_path, "w") as log_file:
-                log_file.write("Log File Initialized\n\n")
+                log_file.write(LOG_FILE_HEADER)
 
 
 def initialize_log_file(log_file_key: str | None) -> None:
@@ -119,25 +1397,309 @@ def initialize_log_file(log_file_key: str | None) -> None:
     pass
 
 
-def truncate_string(value: Any, max_length: int = 500) -> str:
+def _resolve_log_file_key(logging_config: dict, log_file_key: str | None) -> str | None:
     """
-    Truncates a string to a maximum length and appends "..." if truncated.
+    Resolves the log file key to write to, defaulting to the only configured key.
 
     Args:
-        value: The value to truncate.
-        max_length (int, optional): The maximum length of the truncated string.
+        logging_config (dict): The logging configuration.
+        log_file_key (str | None): The requested key of the log file path.
 
     Returns:
-        str: The truncated string.
+        str | None: The resolved key, or None if no key could be chosen.
     """
-    str_value = str(value)
-    if len(str_value) > max_length:
-        return str_value[:max_length] + "..."
-    return str_value
+    # Check if log_file_key is not provided and if only one log path is configured
+    if log_file_key is None:
+        keys = list(logging_config["log_file_paths"].keys())
+        if len(keys) == 1:
+            return keys[0]
+        print("Multiple log files configured, please specify a log_file_key.")
+        return None
+    return log_file_key
+
+
+def _get_compiled_config() -> CompiledConfig | None:
+    compiled = LogKonfig().get_compiled_config()
+    if compiled.config is None:
+        print(
+            "Logging configuration is not initialized. Please call init_logging() first."
+        )
+        return None
+    return compiled
+
+
+def _admit_record(compiled: CompiledConfig, log_file_key: str, log_level: str) -> bool:
+    admitted, summary = compiled.check_record(log_file_key, log_level)
+    if summary is not None:
+        _write_log_entry(compiled.config, log_file_key, *summary)
+    if compiled.recorders and admitted and log_level in FLUSH_IMMEDIATELY_LEVELS:
+        _write_recorded(
+            compiled,
+            log_file_key,
+            compiled.dump_recorder(log_file_key, f"{log_level} record"),
+        )
+    return admitted
+
+
+def _write_recorded(
+    compiled: CompiledConfig, log_file_key: str, log_entries: list[tuple]
+) -> None:
+    for log_entry, log_level in log_entries:
+        _write_log_entry(compiled.config, log_file_key, log_entry, log_level)
+
+
+def _is_repeat(
+    compiled: CompiledConfig, log_file_key: str, log_level: str, content: tuple | None
+) -> bool:
+    repeated, summary = compiled.check_repeat(log_file_key, log_level, content)
+    if summary is not None:
+        _write_log_entry(compiled.config, log_file_key, *summary)
+    return repeated
+
+
+def _output_path(logging_config: dict, log_file_key: str) -> str | None:
+    # None sends records to the console only; in tee mode the sink pool copies
+    # file writes to the console.
+    console_output = logging_config.get("console_output", False)
+    if console_output and console_output != CONSOLE_TEE:
+        return None
+    return logging_config["log_file_paths"][log_file_key]
+
+
+def _write_output(
+    log_file_path: str | None, log_entry: str | bytes, log_level: str
+) -> None:
+    LogKonfig().write_entry(log_file_path, log_entry, log_level)
+
+
+def _write_log_entry(
+    logging_config: dict, log_file_key: str, log_entry: str, log_level: str
+) -> None:
+    _write_output(_output_path(logging_config, log_file_key), log_entry, log_level)
+
+
+def _write_record(
+    log_file_key: str,
+    log_file_path: str | None,
+    log_entry: str | bytes,
+    log_level: str,
+    started: int,
+) -> None:
+    # Writes a record formatted since started and counts it in LogKonfig.stats().
+    formatted = time.perf_counter_ns()
+    try:
+        _write_output(log_file_path, log_entry, log_level)
+    except OSError:
+        LogKonfig._metrics.record_error(log_file_path)
+        raise
+    LogKonfig._metrics.record(
+        log_file_key,
+        log_level,
+        len(log_entry),
+        formatted - started,
+        time.perf_counter_ns() - formatted,
+    )
+
+
+def _emit_message(
+    compiled: CompiledConfig,
+    log_file_key: str,
+    log_file_path: str | None,
+    message: Any,
+    variables: dict | None,
+    log_level: str,
+) -> None:
+    if compiled.routes is not None:
+        log_file_keys = compiled.routes.destinations(log_file_key, log_level)
+        if len(log_file_keys) > 1:
+            _emit_routed(
+                compiled, log_file_keys, "message", message, variables, log_level
+            )
+            return
+    if not _admit_record(compiled, log_file_key, log_level):
+        if compiled.recorders:
+            compiled.record_filtered(
+                log_file_key, log_level, "message", message, variables
+            )
+        return
+    if compiled.is_coalescing(log_file_key):
+        message, variables = resolve_record(message, variables)
+        if _is_repeat(
+            compiled, log_file_key, log_level, ("message", message, variables)
+        ):
+            return
+
+    started = time.perf_counter_ns()
+    log_entry = compiled.get_formatter(log_file_key).format_message(
+        message, variables, log_level
+    )
+    _write_record(log_file_key, log_file_path, log_entry, log_level, started)
+
+
+def _emit_function_call(
+    compiled: CompiledConfig,
+    log_file_key: str,
+    log_file_path: str | None,
+    function_name: str,
+    kwargs: dict,
+    log_level: str,
+) -> None:
+    if compiled.routes is not None:
+        log_file_keys = compiled.routes.destinations(log_file_key, log_level)
+        if len(log_file_keys) > 1:
+            _emit_routed(
+                compiled, log_file_keys, "call", function_name, kwargs, log_level
+            )
+            return
+    if not _admit_record(compiled, log_file_key, log_level):
+        if compiled.recorders:
+            compiled.record_filtered(
+                log_file_key, log_level, "call", function_name, kwargs
+            )
+        return
+    if compiled.is_coalescing(log_file_key):
+        _, kwargs = resolve_record(None, kwargs)
+        if _is_repeat(
+            compiled, log_file_key, log_level, ("call", function_name, kwargs)
+        ):
+            return
+
+    started = time.perf_counter_ns()
+    log_entry = compiled.get_formatter(log_file_key).format_function_call(
+        function_name, kwargs, log_level
+    )
+    _write_record(log_file_key, log_file_path, log_entry, log_level, started)
+
+
+def _emit_variable(
+    compiled: CompiledConfig,
+    log_file_key: str,
+    log_file_path: str | None,
+    variable_name: str,
+    variable_value: Any,
+    log_level: str,
+) -> None:
+    if compiled.routes is not None:
+        log_file_keys = compiled.routes.destinations(log_file_key, log_level)
+        if len(log_file_keys) > 1:
+            _emit_routed(
+                compiled,
+                log_file_keys,
+                "message",
+                None,
+                {variable_name: variable_value},
+                log_level,
+            )
+            return
+    if not _admit_record(compiled, log_file_key, log_level):
+        if compiled.recorders:
+            compiled.record_filtered(
+                log_file_key, log_level, "message", None, {variable_name: variable_value}
+            )
+        return
+    if compiled.is_coalescing(log_file_key):
+        variable_value = resolve_lazy(variable_value)
+        if _is_repeat(
+            compiled,
+            log_file_key,
+            log_level,
+            ("message", None, {variable_name: variable_value}),
+        ):
+            return
+
+    started = time.perf_counter_ns()
+    log_entry = compiled.get_formatter(log_file_key).format_message(
+        None, {variable_name: variable_value}, log_level
+    )
+    _write_record(log_file_key, log_file_path, log_entry, log_level, started)
+
+
+def _emit_json(
+    compiled: CompiledConfig,
+    log_file_key: str,
+    json_content: Any,
+    log_level: str,
+    max_items: int | None,
+) -> None:
+    if compiled.routes is not None:
+        log_file_keys = compiled.routes.destinations(log_file_key, log_level)
+        if len(log_file_keys) > 1:
+            _emit_routed(
+                compiled, log_file_keys, "json", json_content, max_items, log_level
+            )
+            return
+    if not _admit_record(compiled, log_file_key, log_level):
+        if compiled.recorders:
+            compiled.record_filtered(
+                log_file_key, log_level, "json", json_content, max_items
+            )
+        return
+    if compiled.is_coalescing(log_file_key):
+        # JSON content is not coalesced, but it does end a run of repeats.
+        _is_repeat(compiled, log_file_key, log_level, None)
+
+    log_file_path = _output_path(compiled.config, log_file_key)
+    formatter = compiled.get_formatter(log_file_key)
+    started = time.perf_counter_ns()
+    if is_streamable_json(json_content):
+        # Streamed entries are formatted while they are written, so all of their
+        # time is counted as write time.
+        sizes: list[int] = []
+        try:
+            LogKonfig().write_stream(
+                log_file_path,
+                _measure_parts(
+                    formatter.iter_json(json_content, log_level, max_items), sizes
+                ),
+                log_level,
+            )
+        except OSError:
+            LogKonfig._metrics.record_error(log_file_path)
+            raise
+        LogKonfig._metrics.record(
+            log_file_key, log_level, sum(sizes), 0, time.perf_counter_ns() - started
+        )
+    else:
+        log_entry = formatter.format_json(json_content, log_level)
+        _write_record(log_file_key, log_file_path, log_entry, log_level, started)
+
+
+def _emit_routed(
+    compiled: CompiledConfig,
+    log_file_keys: tuple[str, ...],
+    kind: str,
+    first: Any,
+    second: Any,
+    log_level: str,
+) -> None:
+    # Writes a record to each of its destination keys, formatted once per formatter.
+    if len(log_file_keys) == 1 and kind == "json":
+        # A single destination can still stream its JSON content.
+        _emit_json(compiled, log_file_keys[0], first, log_level, second)
+        return
+    for log_file_path, log_file_key, log_entry, entry_level, format_ns in (
+        compiled.route_record(log_file_keys, log_level, kind, first, second)
+    ):
+        if format_ns is None:
+            _write_output(log_file_path, log_entry, entry_level)
+        else:
+            _write_record(
+                log_file_key,
+                log_file_path,
+                log_entry,
+                entry_level,
+                time.perf_counter_ns() - format_ns,
+            )
+
+
+def _measure_parts(parts: Iterable[str], sizes: list[int]) -> Iterable[str]:
+    for part in parts:
+        sizes.append(len(part))
+        yield part
 
 
 def log_message(
-    log_file_key: str | None,
+    log_file_key: str | list[str] | None,
     message: str | None = None,
     variables: dict | None = None,
     log_level: str = "DEBUG",
@@ -146,90 +1708,85 @@ def log_message(
     Logs a message and/or variable values to a file.
 
     Args:
-        log_file_key (str): The key of the log file path in the logging configuration.
-        message (str, optional): The message to log. Defaults to None.
+        log_file_key (str | list[str]): The key of the log file path in the logging
+            configuration, or a list of keys to write the record to.
+        message (str, optional): The message to log, or a callable returning it that
+            is only called if the record passes level filtering. Defaults to None.
         variables (dict, optional): A dictionary of variables and their values to log.
+            Values wrapped with lazy() are only computed if the record is written.
             Defaults to None.
         log_level (str, optional): The log level of the message. Defaults to "DEBUG".
     """
-
-    logging_config = LogKonfig().get_logging_config()
-    if logging_config is None:
-        print(
-            "Logging configuration is not initialized. Please call init_logging() first."
-        )
+    compiled = _get_compiled_config()
+    if compiled is None:
         return
-
-    # Check if log_file_key is not provided and if only one log path is configured
+    logging_config = compiled.config
+    log_file_key = _resolve_log_file_key(logging_config, log_file_key)
     if log_file_key is None:
-        keys = list(logging_config["log_file_paths"].keys())
-        if len(keys) == 1:
-            log_file_key = keys[0]
-        else:
-            print("Multiple log files configured, please specify a log_file_key.")
-            return
-
-    log_file_path = logging_config["log_file_paths"][log_file_key]
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] [{log_level}]\n"
-
-    if message:
-        if log_level == "TRUNCATED":
-            message = truncate_string(message)
-        log_entry += f"Message: {message}\n"
-
-    if variables:
-        for variable_name, variable_value in variables.items():
-            if log_level == "TRUNCATED":
-                variable_value = truncate_string(variable_value)
-            log_entry += f"{variable_name}: {variable_value}\n"
-    log_entry += "\n"
-
-    if logging_config.get("console_output", False):
-        print(log_entry)
-    else:
-        with open(log_file_path, "a") as log_file:
-            log_file.write(log_entry)
+        return
+    if not isinstance(log_file_key, str):
+        _emit_routed(
+            compiled,
+            compiled.destinations(log_file_key, log_level),
+            "message",
+            message, variables,
+            log_level,
+        )
+        return
+    _emit_message(
+        compiled,
+        log_file_key,
+        _output_path(logging_config, log_file_key),
+        message,
+        variables,
+        log_level,
+    )
 
 
 def log_function_call(
-    log_file_key: str | None, function_name: str, log_level: str = "DEBUG", **kwargs
+    log_file_key: str | list[str] | None,
+    function_name: str,
+    log_level: str = "DEBUG",
+    **kwargs,
 ) -> None:
     """
     Logs a function call with its arguments.
 
     Args:
-        log_file_key (str): The key of the log file path in the logging configuration.
+        log_file_key (str | list[str]): The key of the log file path in the logging
+            configuration, or a list of keys to write the record to.
         function_name (str): The name of the function being called.
         log_level (str, optional): The log level of the function call. Defaults to "DEBUG".
         **kwargs: Keyword arguments representing the function's arguments.
     """
-    logging_config = LogKonfig().get_logging_config()
-    if logging_config is None:
-        print(
-            "Logging configuration is not initialized. Please call init_logging() first."
-        )
+    compiled = _get_compiled_config()
+    if compiled is None:
         return
-
-    # Check if log_file_key is not provided and if only one log path is configured
+    logging_config = compiled.config
+    log_file_key = _resolve_log_file_key(logging_config, log_file_key)
     if log_file_key is None:
-        keys = list(logging_config["log_file_paths"].keys())
-        if len(keys) == 1:
-            log_file_key = keys[0]
-        else:
-            print("Multiple log files configured, please specify a log_file_key.")
-            return
-
-    log_entry = f"Function Call: {function_name}()\n"
-    for arg_name, arg_value in kwargs.items():
-        if log_level == "TRUNCATED":
-            arg_value = truncate_string(arg_value)
-        log_entry += f"  {arg_name}: {arg_value}\n"
-    log_message(log_file_key, log_entry, log_level=log_level)
+        return
+    if not isinstance(log_file_key, str):
+        _emit_routed(
+            compiled,
+            compiled.destinations(log_file_key, log_level),
+            "call",
+            function_name, kwargs,
+            log_level,
+        )
+        return
+    _emit_function_call(
+        compiled,
+        log_file_key,
+        _output_path(logging_config, log_file_key),
+        function_name,
+        kwargs,
+        log_level,
+    )
 
 
 def log_variable(
-    log_file_key: str | None,
+    log_file_key: str | list[str] | None,
     variable_name: str,
     variable_value: Any,
     log_level: str = "DEBUG",
@@ -238,82 +1795,106 @@ def log_variable(
     Logs a variable and its value.
 
     Args:
-        log_file_key (str): The key of the log file path in the logging configuration.
+        log_file_key (str | list[str]): The key of the log file path in the logging
+            configuration, or a list of keys to write the record to.
         variable_name (str): The name of the variable.
-        variable_value: The value of the variable.
+        variable_value: The value of the variable, optionally wrapped with lazy().
         log_level (str, optional): The log level of the variable. Defaults to "DEBUG".
     """
-    logging_config = LogKonfig().get_logging_config()
-    if logging_config is None:
-        print(
-            "Logging configuration is not initialized. Please call init_logging() first."
-        )
+    compiled = _get_compiled_config()
+    if compiled is None:
         return
-
-    # Check if log_file_key is not provided and if only one log path is configured
+    logging_config = compiled.config
+    log_file_key = _resolve_log_file_key(logging_config, log_file_key)
     if log_file_key is None:
-        keys = list(logging_config["log_file_paths"].keys())
-        if len(keys) == 1:
-            log_file_key = keys[0]
-        else:
-            print("Multiple log files configured, please specify a log_file_key.")
-            return
-
-    if log_level == "TRUNCATED":
-        variable_value = truncate_string(variable_value)
-    log_message(
-        log_file_key, variables={variable_name: variable_value}, log_level=log_level
+        return
+    if not isinstance(log_file_key, str):
+        _emit_routed(
+            compiled,
+            compiled.destinations(log_file_key, log_level),
+            "message",
+            None, {variable_name: variable_value},
+            log_level,
+        )
+        return
+    _emit_variable(
+        compiled,
+        log_file_key,
+        _output_path(logging_config, log_file_key),
+        variable_name,
+        variable_value,
+        log_level,
     )
 
 
 def log_json_content(
-    log_file_key: str | None, json_content: dict | list[dict], log_level: str = "DEBUG"
+    log_file_key: str | list[str] | None,
+    json_content: dict | list[dict] | Iterable[dict],
+    log_level: str = "DEBUG",
+    max_items: int | None = None,
 ) -> None:
     """
     Logs the content of a JSON object or a list of JSON objects in a pretty-printed format.
 
+    Lists, iterators and generators are serialized one item at a time and written
+    in bounded chunks, so memory use does not grow with the number of items.
+
     Args:
-        log_file_key (str): The key of the log file path in the logging configuration.
-        json_content (dict | list[dict]): The JSON object or list of JSON objects to log.
+        log_file_key (str | list[str]): The key of the log file path in the logging
+            configuration, or a list of keys to write the record to.
+        json_content (dict | list[dict] | Iterable[dict]): The JSON object, or list,
+            iterator or generator of JSON objects, to log.
         log_level (str, optional): The log level of the JSON content. Defaults to "DEBUG".
+        max_items (int | None, optional): The maximum number of items of a list or
+            iterator to log. The entry records how many items were left out.
+            Defaults to None, which logs every item.
     """
-    logging_config = LogKonfig().get_logging_config()
-    if logging_config is None:
-        print(
-            "Logging configuration is not initialized. Please call init_logging() first."
+    compiled = _get_compiled_config()
+    if compiled is None:
+        return
+    log_file_key = _resolve_log_file_key(compiled.config, log_file_key)
+    if log_file_key is None:
+        return
+    if not isinstance(log_file_key, str):
+        _emit_routed(
+            compiled,
+            compiled.destinations(log_file_key, log_level),
+            "json",
+            json_content,
+            max_items,
+            log_level,
         )
         return
+    _emit_json(compiled, log_file_key, json_content, log_level, max_items)
 
-    # Check if log_file_key is not provided and if only one log path is configured
-    if log_file_key is None:
-        keys = list(logging_config["log_file_paths"].keys())
-        if len(keys) == 1:
-            log_file_key = keys[0]
-        else:
-            print("Multiple log files configured, please specify a log_file_key.")
-            return
 
-    log_file_path = logging_config["log_file_paths"][log_file_key]
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] [{log_level}]\n"
-    log_entry += "JSON Content:\n"
-
-    if isinstance(json_content, dict):
-        log_entry += json.dumps(json_content, indent=2)
-    elif isinstance(json_content, list):
-        for item in json_content:
-            if isinstance(item, dict):
-                log_entry += json.dumps(item, indent=2)
-                log_entry += "\n"
-            else:
-                log_entry += f"{item}\n"
-    else:
-        log_entry += f"{json_content}\n"
+def get_logger(log_file_key: str | None = None):
+    """
+    Returns a handle that logs to one log file key without looking the key up on
+    every call.
+
+    Args:
+        log_file_key (str | None, optional): The key of the log file path in the
+            logging configuration. Defaults to the only configured key.
+
+    Returns:
+        Logger: The handle of the key.
+    """
+    return LogKonfig().get_logger(log_file_key)
+
 
-    log_entry += "\n"
+def dump_flight_recorder(log_file_key: str | None = None) -> int:
+    """
+    Writes the records kept by flight recorders to their log files.
 
-    with open(log_file_path, "a") as log_file:
-        log_file.write(log_entry)
+    Args:
+        log_file_key (str | None, optional): The key whose recorder is written.
+            Defaults to every key with a flight recorder.
+
+    Returns:
+        int: The number of records written.
+    """
+    return LogKonfig().dump_flight_recorder(log_file_key)
 
 
 def load_logging_config(config_file_path: str) -> dict:
@@ -0,0 +1,219 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import threading
+import time
+from typing import Callable
+
+# Write latencies are counted in power-of-two buckets of microseconds: bucket 0
+# holds writes under 1us, bucket n those under 2**n us, and the last reported
+# bucket every slower write. Threads count into enough buckets for any duration,
+# so no clamping happens while recording; the slowest are folded on snapshot.
+LATENCY_BUCKETS = 22
+_LAST_BUCKET = LATENCY_BUCKETS - 1
+_RECORDED_BUCKETS = 64
+
+
+def latency_bucket_labels() -> list[str]:
+    """
+    Returns the labels of the write latency histogram buckets, in order.
+    """
+    labels = [f"<{2 ** bucket}us" for bucket in range(_LAST_BUCKET)]
+    labels.append(f">={2 ** (_LAST_BUCKET - 1)}us")
+    return labels
+
+
+class _ThreadMetrics:
+    """
+    The counters updated by one thread. Only that thread writes to them, so
+    recording a record needs no lock.
+    """
+
+    __slots__ = ("thread", "records", "latencies")
+
+    def __init__(self, thread: threading.Thread | None) -> None:
+        self.thread = thread
+        # (log file key, level) -> [records, bytes, formatting ns, write ns]
+        self.records: dict[tuple[str, str], list[int]] = {}
+        self.latencies = [0] * _RECORDED_BUCKETS
+
+    def merge(self, other: "_ThreadMetrics") -> None:
+        for record_key, counters in other.records.copy().items():
+            totals = self.records.setdefault(record_key, [0, 0, 0, 0])
+            for index, value in enumerate(counters):
+                totals[index] += value
+        for bucket, count in enumerate(other.latencies):
+            self.latencies[bucket] += count
+
+
+class PipelineMetrics:
+    """
+    Counts the records and bytes written per log file key and level, the time
+    spent formatting and writing them, a histogram of write latencies and write
+    errors.
+
+    Each thread updates counters of its own, which are only combined when a
+    snapshot is taken, so recording a record costs a few additions.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads: list[_ThreadMetrics] = []
+        self._retired = _ThreadMetrics(None)
+        self._errors: dict[str, int] = {}
+        self._since = time.time()
+
+    def _register(self) -> _ThreadMetrics:
+        metrics = _ThreadMetrics(threading.current_thread())
+        with self._lock:
+            self._threads.append(metrics)
+        self._local.metrics = metrics
+        return metrics
+
+    def record(
+        self, log_file_key: str, log_level: str, size: int, format_ns: int, write_ns: int
+    ) -> None:
+        """
+        Counts a written record.
+
+        Args:
+            log_file_key (str): The key the record was written to.
+            log_level (str): The level of the record.
+            size (int): The length of the formatted entry.
+            format_ns (int): The nanoseconds spent formatting the record.
+            write_ns (int): The nanoseconds spent handing it to its file or queue.
+        """
+        try:
+            metrics = self._local.metrics
+        except AttributeError:
+            metrics = self._register()
+        counters = metrics.records.get((log_file_key, log_level))
+        if counters is None:
+            counters = metrics.records[(log_file_key, log_level)] = [0, 0, 0, 0]
+        counters[0] += 1
+        counters[1] += size
+        counters[2] += format_ns
+        counters[3] += write_ns
+        metrics.latencies[(write_ns // 1000).bit_length()] += 1
+
+    def record_error(self, log_file_path: str) -> None:
+        """
+        Counts a failed write to a log file.
+        """
+        with self._lock:
+            self._errors[log_file_path] = self._errors.get(log_file_path, 0) + 1
+
+    def reset(self) -> None:
+        """
+        Starts counting from zero.
+        """
+        with self._lock:
+            for metrics in self._threads:
+                metrics.records = {}
+                metrics.latencies = [0] * _RECORDED_BUCKETS
+            self._retired = _ThreadMetrics(None)
+            self._errors = {}
+            self._since = time.time()
+
+    def snapshot(self) -> dict:
+        """
+        Combines the counters of every thread.
+
+        Returns:
+            dict: The counters, in a form that can be serialized as JSON.
+        """
+        totals = _ThreadMetrics(None)
+        with self._lock:
+            # Threads that have finished will not count anything else.
+            live = []
+            for metrics in self._threads:
+                if metrics.thread.is_alive():
+                    live.append(metrics)
+                else:
+                    self._retired.merge(metrics)
+            self._threads = live
+            totals.merge(self._retired)
+            for metrics in live:
+                totals.merge(metrics)
+            errors = dict(self._errors)
+            since = self._since
+
+        latencies = totals.latencies[:_LAST_BUCKET]
+        latencies.append(sum(totals.latencies[_LAST_BUCKET:]))
+        records: dict[str, dict[str, dict]] = {}
+        format_ns = write_ns = 0
+        for (log_file_key, log_level), counters in sorted(totals.records.items()):
+            records.setdefault(log_file_key, {})[log_level] = {
+                "records": counters[0],
+                "bytes": counters[1],
+                "format_seconds": counters[2] / 1e9,
+                "write_seconds": counters[3] / 1e9,
+            }
+            format_ns += counters[2]
+            write_ns += counters[3]
+        from datetime import datetime
+
+        return {
+            "since": datetime.fromtimestamp(since).isoformat(timespec="seconds"),
+            "seconds": round(time.time() - since, 3),
+            "records": records,
+            "format_seconds": format_ns / 1e9,
+            "write_seconds": write_ns / 1e9,
+            "write_latency": {
+                label: count
+                for label, count in zip(latency_bucket_labels(), latencies)
+                if count
+            },
+            "errors": errors,
+        }
+
+
+class MetricsReporter:
+    """
+    Calls a report function at a fixed interval from a daemon thread. A report
+    that fails is printed and passed to on_error, and reporting goes on.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        report: Callable[[], None],
+        name: str = "metrics",
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """
+        Args:
+            interval (float): The number of seconds between reports.
+            report (Callable[[], None]): Writes one report.
+            name (str, optional): What is reported, for the thread name and error
+                messages. Defaults to "metrics".
+            on_error (Callable[[Exception], None] | None, optional): Called with
+                the exception of each report that failed.
+        """
+        self.interval = interval
+        self.name = name
+        self._report = report
+        self._on_error = on_error
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"logkontrol-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stops reporting and waits for the thread to finish.
+        """
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self._report()
+            except Exception as error:
+                print(f"Failed to write logkontrol {self.name}: {error}")
+                if self._on_error is not None:
+                    self._on_error(error)
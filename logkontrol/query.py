@@ -0,0 +1,406 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import argparse
+import contextlib
+import functools
+import json
+import mmap
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Iterator
+from .formatting import DEFAULT_TIMESTAMP_FORMAT
+from .logkontrol import LOG_LEVELS
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+DEFAULT_BUCKET_SECONDS = 60
+# Record offsets kept per level and segment; busier levels fall back to a segment scan.
+MAX_OFFSETS_PER_LEVEL = 256
+_IDENTITY_BYTES = 64
+
+# The "[timestamp] [LEVEL]" line that starts every text record.
+_RECORD_HEADER = re.compile(rb"^\[([^\]\n]+)\] \[([A-Z_]+)\]", re.M)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_timestamp(text: bytes, timestamp_format: str) -> float | None:
+    try:
+        return datetime.strptime(text.decode(), timestamp_format).timestamp()
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def parse_time(value: str, timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT) -> float:
+    """
+    Parses a --since/--until argument into a POSIX timestamp.
+
+    Accepts the log file's timestamp_format, ISO 8601 dates and times, or a bare
+    "HH:MM[:SS]" time, which refers to today.
+
+    Args:
+        value (str): The time to parse.
+        timestamp_format (str, optional): The timestamp format of the log file.
+
+    Returns:
+        float: The parsed time as a POSIX timestamp in local time.
+    """
+    with contextlib.suppress(ValueError):
+        return datetime.strptime(value, timestamp_format).timestamp()
+    with contextlib.suppress(ValueError):
+        return datetime.fromisoformat(value).timestamp()
+    for time_format in ("%H:%M", "%H:%M:%S"):
+        with contextlib.suppress(ValueError):
+            parsed = datetime.strptime(value, time_format).time()
+            return datetime.combine(datetime.now().date(), parsed).timestamp()
+    raise ValueError(f"Unrecognized time: {value!r}")
+
+
+def levels_at_or_above(log_level: str) -> set[str]:
+    """
+    Returns the level names whose severity is at least that of log_level.
+
+    Levels logkontrol does not know only match themselves.
+
+    Args:
+        log_level (str): The minimum level.
+
+    Returns:
+        set[str]: The matching level names.
+    """
+    log_level = log_level.upper()
+    threshold = LOG_LEVELS.get(log_level)
+    if threshold is None:
+        return {log_level}
+    return {name for name, severity in LOG_LEVELS.items() if severity >= threshold}
+
+
+class LogIndex:
+    """
+    A sidecar index of a text log file, stored next to it in "<path>.idx".
+
+    The file is split into segments: runs of consecutive records whose timestamps
+    fall into the same bucket_seconds-wide time bucket. Each segment records its
+    byte range and, per level, how many records it holds and (up to
+    MAX_OFFSETS_PER_LEVEL) where they start. Queries use it to skip straight to the
+    segments that can match.
+
+    The index covers the file up to indexed_to, the start of the last record seen,
+    since that record may still be growing. update() indexes whatever was appended
+    since, and rebuilds the index if the file was replaced or truncated.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT,
+        bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+    ) -> None:
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.timestamp_format = timestamp_format
+        self.bucket_seconds = bucket_seconds
+        self.segments: list[dict] = []
+        self.indexed_to = 0
+        self._identity: list | None = None
+        self._changed = False
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT,
+        bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+    ) -> "LogIndex":
+        """
+        Reads the sidecar index of a log file, or starts an empty one if it is
+        missing, unreadable or was built with different settings.
+
+        Args:
+            path (str): The path of the log file.
+            timestamp_format (str, optional): The timestamp format of the log file.
+            bucket_seconds (int, optional): The width of a time bucket in seconds.
+
+        Returns:
+            LogIndex: The index of the file.
+        """
+        index = cls(path, timestamp_format, bucket_seconds)
+        try:
+            with open(index.index_path, "r") as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return index
+        if (
+            data.get("version") == INDEX_VERSION
+            and data.get("timestamp_format") == timestamp_format
+            and data.get("bucket_seconds") == bucket_seconds
+        ):
+            index.segments = data["segments"]
+            index.indexed_to = data["indexed_to"]
+            index._identity = data["identity"]
+        return index
+
+    def save(self) -> None:
+        """
+        Writes the index next to the log file if it changed. The index is only a
+        cache, so failing to write it is not an error.
+        """
+        if not self._changed:
+            return
+        data = {
+            "version": INDEX_VERSION,
+            "timestamp_format": self.timestamp_format,
+            "bucket_seconds": self.bucket_seconds,
+            "identity": self._identity,
+            "indexed_to": self.indexed_to,
+            "segments": self.segments,
+        }
+        temporary = f"{self.index_path}.{os.getpid()}.tmp"
+        with contextlib.suppress(OSError):
+            with open(temporary, "w") as index_file:
+                json.dump(data, index_file, separators=(",", ":"))
+            os.replace(temporary, self.index_path)
+            self._changed = False
+
+    def update(self, data: mmap.mmap | bytes, inode: int) -> None:
+        """
+        Indexes the records appended to the file since the last update.
+
+        Args:
+            data (mmap.mmap | bytes): The content of the log file.
+            inode (int): The inode of the log file, used to detect replacement.
+        """
+        identity = [inode, data[:_IDENTITY_BYTES].hex()]
+        if (
+            self._identity is None
+            or self._identity[0] != identity[0]
+            or not identity[1].startswith(self._identity[1])
+            or len(data) < self.indexed_to
+        ):
+            self.segments = []
+            self.indexed_to = 0
+        if self._identity != identity:
+            self._identity = identity
+            self._changed = True
+
+        previous = None
+        for match in _RECORD_HEADER.finditer(data, self.indexed_to):
+            if previous is not None:
+                self._add_record(
+                    previous.start(), match.start(), previous.group(1), previous.group(2).decode()
+                )
+            previous = match
+        if previous is not None and previous.start() != self.indexed_to:
+            self.indexed_to = previous.start()
+            self._changed = True
+
+    def _add_record(self, start: int, end: int, timestamp: bytes, log_level: str) -> None:
+        parsed = _parse_timestamp(timestamp, self.timestamp_format)
+        bucket = None if parsed is None else int(parsed // self.bucket_seconds)
+        segment = self.segments[-1] if self.segments else None
+        if segment is None or segment["bucket"] != bucket or segment["end"] != start:
+            segment = {"bucket": bucket, "start": start, "end": start, "levels": {}}
+            self.segments.append(segment)
+        segment["end"] = end
+        level = segment["levels"].setdefault(log_level, {"count": 0, "offsets": []})
+        level["count"] += 1
+        if level["offsets"] is not None:
+            if len(level["offsets"]) < MAX_OFFSETS_PER_LEVEL:
+                level["offsets"].append(start)
+            else:
+                level["offsets"] = None
+        self.indexed_to = end
+        self._changed = True
+
+    def ranges(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        log_levels: set[str] | None = None,
+    ) -> Iterator[tuple[int, int | None]]:
+        """
+        Yields the byte ranges of the indexed part of the file that may hold
+        matching records, in file order.
+
+        A range whose end is None is a single record starting at the given offset.
+
+        Args:
+            since (float | None, optional): The earliest timestamp wanted.
+            until (float | None, optional): The timestamp before which records are wanted.
+            log_levels (set[str] | None, optional): The levels wanted.
+        """
+        first_bucket = None if since is None else int(since // self.bucket_seconds)
+        last_bucket = None if until is None else int(until // self.bucket_seconds)
+        pending = None
+        for segment in self.segments:
+            bucket = segment["bucket"]
+            if (first_bucket is not None or last_bucket is not None) and bucket is None:
+                continue
+            if first_bucket is not None and bucket < first_bucket:
+                continue
+            if last_bucket is not None and bucket > last_bucket:
+                continue
+            levels = segment["levels"]
+            if log_levels is not None:
+                wanted = [levels[name] for name in log_levels if name in levels]
+                if not wanted:
+                    continue
+                if all(level["offsets"] is not None for level in wanted):
+                    if pending is not None:
+                        yield pending
+                        pending = None
+                    for offset in sorted(o for level in wanted for o in level["offsets"]):
+                        yield offset, None
+                    continue
+            if pending is not None and pending[1] == segment["start"]:
+                pending = (pending[0], segment["end"])
+            else:
+                if pending is not None:
+                    yield pending
+                pending = (segment["start"], segment["end"])
+        if pending is not None:
+            yield pending
+
+
+def _iter_range(data: mmap.mmap | bytes, start: int, end: int | None):
+    if end is None:
+        match = _RECORD_HEADER.match(data, start)
+        if match is None:
+            return
+        following = _RECORD_HEADER.search(data, match.end())
+        yield match, following.start() if following else len(data)
+        return
+    match = _RECORD_HEADER.search(data, start, end)
+    while match is not None:
+        following = _RECORD_HEADER.search(data, match.end(), end)
+        yield match, following.start() if following else end
+        match = following
+
+
+def query_file(
+    path: str,
+    since: float | None = None,
+    until: float | None = None,
+    log_levels: set[str] | None = None,
+    pattern: re.Pattern | None = None,
+    timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT,
+    use_index: bool = True,
+) -> Iterator[bytes]:
+    """
+    Yields the records of a text log file that match every given filter.
+
+    The file is memory-mapped rather than read, and unless use_index is False its
+    sidecar index is brought up to date and used to skip regions that cannot match.
+
+    Args:
+        path (str): The path of the log file.
+        since (float | None, optional): Only records at or after this POSIX timestamp.
+        until (float | None, optional): Only records before this POSIX timestamp.
+        log_levels (set[str] | None, optional): Only records with one of these levels.
+        pattern (re.Pattern | None, optional): Only records whose text matches this
+            bytes pattern.
+        timestamp_format (str, optional): The timestamp format of the log file.
+        use_index (bool, optional): Whether to use and update the sidecar index.
+            Defaults to True.
+
+    Yields:
+        bytes: Each matching record, exactly as it appears in the file.
+    """
+    with open(path, "rb") as log_file:
+        size = os.fstat(log_file.fileno()).st_size
+        if size == 0:
+            return
+        inode = os.fstat(log_file.fileno()).st_ino
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if use_index:
+                index = LogIndex.load(path, timestamp_format)
+                index.update(data, inode)
+                index.save()
+                ranges = list(index.ranges(since, until, log_levels))
+                ranges.append((index.indexed_to, size))
+            else:
+                ranges = [(0, size)]
+
+            for start, end in ranges:
+                for match, record_end in _iter_range(data, start, end):
+                    if log_levels is not None and match.group(2).decode() not in log_levels:
+                        continue
+                    if since is not None or until is not None:
+                        timestamp = _parse_timestamp(match.group(1), timestamp_format)
+                        if timestamp is None:
+                            continue
+                        if since is not None and timestamp < since:
+                            continue
+                        if until is not None and timestamp >= until:
+                            continue
+                    record = data[match.start():record_end]
+                    if pattern is not None and not pattern.search(record):
+                        continue
+                    yield record
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds the arguments of the query command to a parser.
+    """
+    parser.add_argument("paths", nargs="+", help="text log files to search")
+    parser.add_argument("--since", help="only records at or after this time")
+    parser.add_argument("--until", help="only records before this time")
+    parser.add_argument("--level", help="only records at or above this level")
+    parser.add_argument("--grep", help="only records matching this regular expression")
+    parser.add_argument(
+        "--timestamp-format",
+        default=DEFAULT_TIMESTAMP_FORMAT,
+        help="the timestamp_format the files were written with",
+    )
+    parser.add_argument(
+        "--no-index", action="store_true", help="scan the files without the sidecar index"
+    )
+    parser.add_argument(
+        "--count", action="store_true", help="print the number of matching records"
+    )
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Runs the query command, writing matching records to stdout.
+
+    Returns:
+        int: The exit status.
+    """
+    try:
+        since = None if args.since is None else parse_time(args.since, args.timestamp_format)
+        until = None if args.until is None else parse_time(args.until, args.timestamp_format)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    log_levels = None if args.level is None else levels_at_or_above(args.level)
+    pattern = None if args.grep is None else re.compile(args.grep.encode())
+
+    count = 0
+    output = sys.stdout.buffer
+    for path in args.paths:
+        try:
+            records = query_file(
+                path,
+                since,
+                until,
+                log_levels,
+                pattern,
+                args.timestamp_format,
+                use_index=not args.no_index,
+            )
+            for record in records:
+                count += 1
+                if not args.count:
+                    output.write(record)
+        except OSError as error:
+            print(f"Failed to read log file {path}: {error}", file=sys.stderr)
+            return 1
+    if args.count:
+        output.write(f"{count}\n".encode())
+    output.flush()
+    return 0
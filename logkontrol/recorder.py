@@ -0,0 +1,148 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+DEFAULT_CAPACITY = 1000
+RECORDER_MODES = ("raw", "formatted")
+
+
+class FlightRecorder:
+    """
+    Keeps the last records a log file key did not write, so they can be written
+    after the fact when something goes wrong.
+
+    In raw mode a record is kept as the values it was logged with and the time it
+    was logged, so recording it costs a single append, and it is only formatted if
+    it is dumped. In formatted mode it is formatted when it is recorded, which
+    captures values that change afterwards. Once capacity records are kept, each
+    new record discards the oldest.
+    """
+
+    def __init__(
+        self, capacity: int = DEFAULT_CAPACITY, threshold: int = 0, mode: str = "raw"
+    ) -> None:
+        """
+        Args:
+            capacity (int, optional): The number of records kept. Defaults to 1000.
+            threshold (int, optional): The minimum severity of recorded records.
+                Defaults to 0, which records every level.
+            mode (str, optional): "raw" or "formatted". Defaults to "raw".
+        """
+        if capacity <= 0:
+            raise ValueError("flight_recorder capacity must be positive")
+        if mode not in RECORDER_MODES:
+            raise ValueError(
+                f"Invalid flight_recorder mode: {mode}. "
+                f"Expected one of {', '.join(RECORDER_MODES)}"
+            )
+        self.capacity = capacity
+        self.threshold = threshold
+        self.formatted = mode == "formatted"
+        self._records: deque = deque(maxlen=capacity)
+
+    @classmethod
+    def from_config(
+        cls, options: dict | bool | None, log_levels: dict[str, int]
+    ) -> "FlightRecorder":
+        """
+        Builds a recorder from a log key's entry in the "flight_recorder" section.
+
+        Args:
+            options (dict | bool | None): True, or a dict with capacity, level and mode.
+            log_levels (dict[str, int]): The severity of each log level name.
+
+        Returns:
+            FlightRecorder: The recorder of the key.
+        """
+        if options is True or options is None:
+            options = {}
+        if not isinstance(options, dict):
+            raise ValueError(f"Invalid flight_recorder options: {options!r}")
+        unknown = set(options) - {"capacity", "level", "mode"}
+        if unknown:
+            raise ValueError(
+                f"Unknown flight_recorder options: {', '.join(sorted(unknown))}"
+            )
+        level = str(options.get("level", "DEBUG")).upper()
+        if level not in log_levels:
+            raise ValueError(f"Invalid flight_recorder level: {options['level']}")
+        return cls(
+            int(options.get("capacity", DEFAULT_CAPACITY)),
+            log_levels[level],
+            options.get("mode", "raw"),
+        )
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def record(self, log_level: str, kind: str, first: Any, second: Any) -> None:
+        """
+        Keeps a record, discarding the oldest one if the recorder is full.
+
+        Args:
+            log_level (str): The log level of the record.
+            kind (str): "message", "call", "json", or "entry" for a formatted entry.
+            first: The message, function name, JSON content or formatted entry.
+            second: The variables, arguments or max_items of the record.
+        """
+        self._records.append((time.time(), log_level, kind, first, second))
+
+    def drain(self) -> list[tuple]:
+        """
+        Removes and returns the kept records, oldest first.
+
+        Returns:
+            list[tuple]: The time, level, kind and values of each record.
+        """
+        records = []
+        # popleft() is atomic, so records appended meanwhile are never lost.
+        while True:
+            try:
+                records.append(self._records.popleft())
+            except IndexError:
+                return records
+
+
+_excepthooks_installed = False
+
+
+def install_excepthooks(dump: Callable[[BaseException], None]) -> None:
+    """
+    Makes unhandled exceptions, in the main thread or any other thread, call dump
+    before the hook that was installed until then. Installs the hooks only once.
+
+    Args:
+        dump (Callable[[BaseException], None]): Writes the flight recorders, given
+            the unhandled exception.
+    """
+    global _excepthooks_installed
+    if _excepthooks_installed:
+        return
+    _excepthooks_installed = True
+    previous_excepthook = sys.excepthook
+    previous_threading_excepthook = threading.excepthook
+
+    def excepthook(exc_type, exc_value, exc_traceback) -> None:
+        _dump_safely(dump, exc_value)
+        previous_excepthook(exc_type, exc_value, exc_traceback)
+
+    def threading_excepthook(args) -> None:
+        if args.exc_type is not SystemExit:
+            _dump_safely(dump, args.exc_value)
+        previous_threading_excepthook(args)
+
+    sys.excepthook = excepthook
+    threading.excepthook = threading_excepthook
+
+
+def _dump_safely(dump: Callable[[BaseException], None], exc_value: BaseException) -> None:
+    # The original exception must still be reported if writing the records fails.
+    try:
+        dump(exc_value)
+    except Exception as error:
+        print(f"Failed to write flight recorder: {error}", file=sys.stderr)
@@ -0,0 +1,275 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import atexit
+import contextlib
+import os
+import queue
+import re
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+LOG_FILE_HEADER = "Log File Initialized\n\n"
+DEFAULT_BACKUP_COUNT = 5
+_GENERATION_PATTERN = r"\.(\d{8}-\d{6})(?:\.(\d+))?(\.gz)?$"
+
+
+class RotationPolicy:
+    """
+    Decides when a log file is rotated and how many old generations are kept.
+
+    A file is rotated once writing the next record would take it past max_bytes,
+    or when the wall clock enters a new interval_seconds period since the file was
+    last written. Rotated generations are named after the time of rotation and
+    gzip-compressed in the background when compress is set.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int | None = None,
+        interval_seconds: float | None = None,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        compress: bool = True,
+    ) -> None:
+        if max_bytes is None and interval_seconds is None:
+            raise ValueError("Rotation needs max_size_mb or interval_seconds")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_size_mb must be positive")
+        if interval_seconds is not None and interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        if backup_count < 0:
+            raise ValueError("backup_count must not be negative")
+        self.max_bytes = max_bytes
+        self.interval_seconds = interval_seconds
+        self.backup_count = backup_count
+        self.compress = compress
+
+    @classmethod
+    def from_config(cls, options: dict) -> "RotationPolicy":
+        """
+        Builds a policy from a log key's entry in the "rotation" config section.
+
+        Args:
+            options (dict): The rotation options for a log key.
+
+        Returns:
+            RotationPolicy: The policy described by the options.
+        """
+        if not isinstance(options, dict):
+            raise ValueError(f"Invalid rotation options: {options!r}")
+        max_size_mb = options.get("max_size_mb")
+        return cls(
+            max_bytes=None if max_size_mb is None else int(float(max_size_mb) * 1024 * 1024),
+            interval_seconds=options.get("interval_seconds"),
+            backup_count=int(options.get("backup_count", DEFAULT_BACKUP_COUNT)),
+            compress=bool(options.get("compress", True)),
+        )
+
+    def period(self, timestamp: float) -> int | None:
+        """
+        Returns the interval period a point in time falls into.
+        """
+        if self.interval_seconds is None:
+            return None
+        return int(timestamp // self.interval_seconds)
+
+    def is_due(self, size: int, incoming: int, period: int | None) -> bool:
+        """
+        Checks whether the file must be rotated before writing the next record.
+
+        Args:
+            size (int): The current size of the file.
+            incoming (int): The size of the data about to be written.
+            period (int | None): The interval period the file was last written in.
+
+        Returns:
+            bool: True if the file should be rotated.
+        """
+        if self.max_bytes is not None and size > 0 and size + incoming > self.max_bytes:
+            return True
+        return period is not None and size > 0 and self.period(time.time()) > period
+
+
+class InterprocessLock:
+    """
+    An exclusive advisory lock shared by every process writing to a log file.
+
+    The lock lives in a "<path>.lock" file that stays open between acquisitions.
+    Acquiring the lock while it is already held only counts the nesting, so a record
+    written in several chunks keeps it throughout. A forked child opens the lock
+    file again instead of sharing its parent's lock. On platforms without fcntl only
+    the calling process's threads are serialized, by the caller's own locks.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): The path of the log file.
+        """
+        self.path = path
+        self._file = None
+        self._pid = None
+        self._depth = 0
+
+    def __enter__(self) -> "InterprocessLock":
+        if self._depth == 0 and fcntl is not None:
+            if self._pid != os.getpid():
+                self.close()
+            if self._file is None:
+                self._file = open(f"{self.path}.lock", "a")
+                self._pid = os.getpid()
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """
+        Closes the lock file. It is reopened the next time the lock is acquired.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def list_generations(path: str) -> list[str]:
+    """
+    Returns the rotated generations of a log file, oldest first.
+
+    Args:
+        path (str): The path of the log file.
+
+    Returns:
+        list[str]: The paths of the rotated files, compressed or not.
+    """
+    directory = os.path.dirname(path) or "."
+    pattern = re.compile(re.escape(os.path.basename(path)) + _GENERATION_PATTERN)
+    generations = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        match = pattern.fullmatch(name)
+        if match:
+            generations.append(
+                ((match.group(1), int(match.group(2) or 0)), os.path.join(directory, name))
+            )
+    return [generation for _, generation in sorted(generations)]
+
+
+def rotate_file(path: str, policy: RotationPolicy) -> str:
+    """
+    Moves the current log file aside and prunes generations beyond backup_count.
+
+    Must be called while holding the InterprocessLock of path. Writers check the
+    file under the same lock before every write, so a generation is complete once
+    it is moved aside and may be compressed at once.
+
+    Args:
+        path (str): The path of the log file.
+        policy (RotationPolicy): The rotation policy of the file.
+
+    Returns:
+        str: The path the file was moved to.
+    """
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    target = f"{path}.{stamp}"
+    counter = 0
+    while os.path.exists(target) or os.path.exists(f"{target}.gz"):
+        counter += 1
+        target = f"{path}.{stamp}.{counter}"
+    os.rename(path, target)
+
+    generations = list_generations(path)
+    excess = len(generations) - policy.backup_count
+    for generation in generations[: max(excess, 0)]:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(generation)
+    if policy.compress:
+        # Also pick up generations left uncompressed by a process that exited.
+        for generation in generations[max(excess, 0):]:
+            if not generation.endswith(".gz"):
+                compressor.submit(generation)
+    return target
+
+
+def compress_file(path: str) -> None:
+    """
+    Gzip-compresses a rotated log file to "<path>.gz" and removes the original.
+
+    The file is claimed by renaming it first, so several processes may safely try
+    to compress the same generation.
+
+    Args:
+        path (str): The path of the rotated log file.
+    """
+    claimed = f"{path}.compressing-{os.getpid()}-{threading.get_ident()}"
+    try:
+        os.rename(path, claimed)
+    except FileNotFoundError:
+        return
+    import gzip
+    import shutil
+
+    temporary = f"{claimed}.gz"
+    with open(claimed, "rb") as source, gzip.open(temporary, "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.rename(temporary, f"{path}.gz")
+    os.remove(claimed)
+
+
+class Compressor:
+    """
+    Compresses rotated log files on a background thread, so rotation never makes
+    the logging call wait for gzip. Queued files are finished at interpreter exit.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, path: str) -> None:
+        """
+        Queues a rotated log file for compression.
+
+        Args:
+            path (str): The path of the rotated log file.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="logkontrol-compressor", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.wait_idle)
+        self._queue.put(path)
+
+    def wait_idle(self) -> None:
+        """
+        Waits until every queued file has been compressed.
+        """
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            path = self._queue.get()
+            try:
+                compress_file(path)
+            except OSError as error:
+                print(f"Failed to compress log file {path}: {error}")
+            finally:
+                self._queue.task_done()
+
+
+compressor = Compressor()
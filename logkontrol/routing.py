@@ -0,0 +1,163 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+from typing import Iterable
+
+
+def _key_list(value, option: str, log_file_paths: dict) -> tuple[str, ...]:
+    keys = (value,) if isinstance(value, str) else tuple(value or ())
+    if not keys:
+        raise ValueError(f"Route option {option} needs at least one log file key")
+    for log_file_key in keys:
+        if log_file_key not in log_file_paths:
+            raise ValueError(
+                f"Route configured for unknown log file key: {log_file_key}"
+            )
+    return keys
+
+
+class Route:
+    """
+    Sends records of a level or above, logged to any of the source keys, to the
+    target keys as well.
+    """
+
+    __slots__ = ("threshold", "sources", "targets")
+
+    def __init__(
+        self,
+        targets: tuple[str, ...],
+        threshold: int = 0,
+        sources: frozenset[str] | None = None,
+    ) -> None:
+        """
+        Args:
+            targets (tuple[str, ...]): The log file keys records are copied to.
+            threshold (int, optional): The minimum severity of routed records.
+                Defaults to 0, which routes every level.
+            sources (frozenset[str] | None, optional): The log file keys whose records
+                are routed. Defaults to None, which routes records of every key.
+        """
+        self.targets = targets
+        self.threshold = threshold
+        self.sources = sources
+
+    @classmethod
+    def from_config(
+        cls, options: dict, log_file_paths: dict, log_levels: dict[str, int]
+    ) -> "Route":
+        """
+        Builds a route from an entry of the "routes" section.
+
+        Args:
+            options (dict): The entry, with "to" and optional "level" and "from".
+            log_file_paths (dict): The configured log file paths, keyed by log file key.
+            log_levels (dict[str, int]): The severity of each log level name.
+
+        Returns:
+            Route: The route.
+        """
+        if not isinstance(options, dict):
+            raise ValueError(f"Invalid route: {options!r}")
+        unknown = set(options) - {"to", "level", "from"}
+        if unknown:
+            raise ValueError(f"Unknown route options: {', '.join(sorted(unknown))}")
+        if "to" not in options:
+            raise ValueError(f"Route without target log file keys: {options!r}")
+        threshold = 0
+        if "level" in options:
+            threshold = log_levels.get(str(options["level"]).upper())
+            if threshold is None:
+                raise ValueError(f"Invalid route level: {options['level']}")
+        sources = None
+        if "from" in options:
+            sources = frozenset(_key_list(options["from"], "from", log_file_paths))
+        return cls(_key_list(options["to"], "to", log_file_paths), threshold, sources)
+
+    def applies(self, log_file_key: str, value: int) -> bool:
+        """
+        Checks whether a record of a key and severity is routed.
+        """
+        return value >= self.threshold and (
+            self.sources is None or log_file_key in self.sources
+        )
+
+
+class RouteTable:
+    """
+    Resolves the log file keys a record is written to: the keys it was logged to,
+    followed by the targets of every route that applies to one of them, each key
+    once. Resolved destinations are kept per requested keys and level, since both
+    come from a small set of values.
+    """
+
+    def __init__(self, routes: list[Route], log_levels: dict[str, int]) -> None:
+        """
+        Args:
+            routes (list[Route]): The configured routes, in order.
+            log_levels (dict[str, int]): The severity of each log level name.
+        """
+        self.routes = routes
+        self._log_levels = log_levels
+        self._destinations: dict[tuple, tuple[str, ...]] = {}
+
+    @classmethod
+    def from_config(
+        cls, config: dict, log_levels: dict[str, int]
+    ) -> "RouteTable | None":
+        """
+        Builds the route table of the "routes" section.
+
+        Args:
+            config (dict): The logging configuration.
+            log_levels (dict[str, int]): The severity of each log level name.
+
+        Returns:
+            RouteTable | None: The table, or None if no routes are configured.
+        """
+        routes = config.get("routes") or []
+        if not isinstance(routes, list):
+            raise ValueError("routes must be a list of routes")
+        log_file_paths = config.get("log_file_paths") or {}
+        if not routes:
+            return None
+        return cls(
+            [
+                Route.from_config(options, log_file_paths, log_levels)
+                for options in routes
+            ],
+            log_levels,
+        )
+
+    def destinations(
+        self, log_file_keys: str | Iterable[str], log_level: str
+    ) -> tuple[str, ...]:
+        """
+        Returns the log file keys a record is written to.
+
+        Args:
+            log_file_keys (str | Iterable[str]): The key or keys the record was
+                logged to.
+            log_level (str): The log level of the record.
+
+        Returns:
+            tuple[str, ...]: The requested keys and the keys they are routed to, in
+                order and without duplicates.
+        """
+        if not isinstance(log_file_keys, str):
+            log_file_keys = tuple(log_file_keys)
+        destinations = self._destinations.get((log_file_keys, log_level))
+        if destinations is not None:
+            return destinations
+        requested = (log_file_keys,) if isinstance(log_file_keys, str) else log_file_keys
+        value = self._log_levels.get(log_level)
+        if value is None:
+            # Levels unknown to logkontrol are only routed by routes without a level.
+            value = self._log_levels.get(str(log_level).upper(), 0)
+        keys = dict.fromkeys(requested)
+        for route in self.routes:
+            if any(route.applies(log_file_key, value) for log_file_key in requested):
+                keys.update(dict.fromkeys(route.targets))
+        destinations = tuple(keys)
+        self._destinations[(log_file_keys, log_level)] = destinations
+        return destinations
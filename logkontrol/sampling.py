@@ -0,0 +1,249 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import sys
+import threading
+import time
+
+DEFAULT_SUMMARY_INTERVAL = 60.0
+SUMMARY_LEVEL = "WARNING"
+
+
+def _random() -> float:
+    # random is only imported once a sampled level is logged.
+    import random
+
+    return random.random()
+
+
+def call_site() -> tuple[str, int]:
+    """
+    Returns the file name and line number of the code that called into logkontrol.
+
+    Returns:
+        tuple[str, int]: The file name and line number of the first frame outside
+            the logkontrol package.
+    """
+    frame = sys._getframe(1)
+    while frame.f_back is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module != "logkontrol" and not module.startswith("logkontrol."):
+            break
+        frame = frame.f_back
+    return frame.f_code.co_filename, frame.f_lineno
+
+
+class TokenBucket:
+    """
+    Lets through up to burst records at once, refilled at rate records per second.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> bool:
+        """
+        Takes a token if one is available.
+
+        Args:
+            now (float): The current time.monotonic() value.
+
+        Returns:
+            bool: True if the record may be written.
+        """
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class RecordGate:
+    """
+    Decides whether a record is written under a log file key's rate limit and
+    per-level sampling rates. Decisions are made before the record is formatted.
+
+    Sampling keeps each record of a sampled level with the configured probability,
+    and always keeps the first record from each call site so that rare sites are
+    never lost. With per_call_site, every call site also gets its own token bucket.
+    Suppressed records are counted per reason and call site, and the counts are
+    handed out for a summary record at most once per summary_interval seconds:
+    with the next admitted record, or to a timer through drain_due() while no
+    record gets through.
+    """
+
+    def __init__(
+        self,
+        records_per_second: float | None = None,
+        burst: float | None = None,
+        per_call_site: bool = False,
+        sample_rates: dict[str, float] | None = None,
+        summary_interval: float = DEFAULT_SUMMARY_INTERVAL,
+    ) -> None:
+        if records_per_second is not None and records_per_second <= 0:
+            raise ValueError("records_per_second must be positive")
+        if burst is not None and burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.sample_rates = {}
+        for log_level, sample_rate in (sample_rates or {}).items():
+            if not 0 <= sample_rate <= 1:
+                raise ValueError(f"Invalid sampling rate for {log_level}: {sample_rate}")
+            self.sample_rates[str(log_level).upper()] = float(sample_rate)
+        self.records_per_second = records_per_second
+        self.burst = burst if burst is not None else records_per_second
+        self.per_call_site = per_call_site
+        self.summary_interval = summary_interval
+        self._bucket = (
+            None
+            if records_per_second is None or per_call_site
+            else TokenBucket(records_per_second, self.burst)
+        )
+        self._site_buckets: dict[tuple[str, int], TokenBucket] = {}
+        self._seen_sites: set[tuple[str, int]] = set()
+        self._suppressed: dict[tuple[str, tuple[str, int] | None], int] = {}
+        self._summarized_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls,
+        rate_limit: dict | None,
+        sample_rates: dict | None,
+        summary_interval: float = DEFAULT_SUMMARY_INTERVAL,
+    ) -> "RecordGate":
+        """
+        Builds a gate from a log key's entries in the "rate_limits" and "sampling"
+        config sections.
+
+        Args:
+            rate_limit (dict | None): The records_per_second, burst and per_call_site
+                options of the key.
+            sample_rates (dict | None): The fraction of records kept, keyed by level.
+            summary_interval (float, optional): The minimum number of seconds between
+                summary records.
+
+        Returns:
+            RecordGate: The gate of the key.
+        """
+        if rate_limit is not None and not isinstance(rate_limit, dict):
+            raise ValueError(f"Invalid rate limit options: {rate_limit!r}")
+        if sample_rates is not None and not isinstance(sample_rates, dict):
+            raise ValueError(f"Invalid sampling options: {sample_rates!r}")
+        rate_limit = rate_limit or {}
+        unknown = set(rate_limit) - {"records_per_second", "burst", "per_call_site"}
+        if unknown:
+            raise ValueError(f"Unknown rate limit options: {', '.join(sorted(unknown))}")
+        if rate_limit and rate_limit.get("records_per_second") is None:
+            raise ValueError("Rate limits need records_per_second")
+        records_per_second = rate_limit.get("records_per_second")
+        burst = rate_limit.get("burst")
+        return cls(
+            records_per_second=None if records_per_second is None else float(records_per_second),
+            burst=None if burst is None else float(burst),
+            per_call_site=bool(rate_limit.get("per_call_site", False)),
+            sample_rates={level: float(rate) for level, rate in (sample_rates or {}).items()},
+            summary_interval=summary_interval,
+        )
+
+    def admit(self, log_level: str) -> tuple[bool, dict | None]:
+        """
+        Decides whether a record is written.
+
+        Args:
+            log_level (str): The log level of the record, in any case.
+
+        Returns:
+            tuple[bool, dict | None]: Whether the record is written, and the
+                suppressed record counts to report if a summary is due.
+        """
+        sample_rate = self.sample_rates.get(log_level)
+        if sample_rate is None and self.sample_rates:
+            # Levels are matched case-insensitively, as by the level threshold.
+            sample_rate = self.sample_rates.get(str(log_level).upper())
+        site = call_site() if sample_rate is not None or self.per_call_site else None
+        now = time.monotonic()
+        with self._lock:
+            reason = None
+            if sample_rate is not None and site in self._seen_sites:
+                if sample_rate < 1 and _random() >= sample_rate:
+                    reason = "sampled_out"
+            elif site is not None:
+                self._seen_sites.add(site)
+            if reason is None and self.records_per_second is not None:
+                bucket = self._bucket
+                if bucket is None:
+                    bucket = self._site_buckets.get(site)
+                    if bucket is None:
+                        bucket = TokenBucket(self.records_per_second, self.burst)
+                        self._site_buckets[site] = bucket
+                if not bucket.take(now):
+                    reason = "rate_limited"
+            if reason is not None:
+                counted = (reason, site if self.per_call_site or reason == "sampled_out" else None)
+                self._suppressed[counted] = self._suppressed.get(counted, 0) + 1
+                return False, None
+            if self._suppressed and now - self._summarized_at >= self.summary_interval:
+                return True, self._drain_locked(now)
+            return True, None
+
+    def drain(self) -> dict | None:
+        """
+        Returns the suppressed record counts not yet reported, and resets them.
+
+        Returns:
+            dict | None: The counts, or None if no record was suppressed.
+        """
+        with self._lock:
+            if not self._suppressed:
+                return None
+            return self._drain_locked(time.monotonic())
+
+    def drain_due(self) -> dict | None:
+        """
+        Returns the suppressed record counts not yet reported, and resets them, if
+        summary_interval seconds have passed since the last summary.
+
+        Returns:
+            dict | None: The counts, or None if no summary is due.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not self._suppressed or now - self._summarized_at < self.summary_interval:
+                return None
+            return self._drain_locked(now)
+
+    def _drain_locked(self, now: float) -> dict:
+        suppressed = self._suppressed
+        self._suppressed = {}
+        self._summarized_at = now
+        return suppressed
+
+
+def format_summary(suppressed: dict) -> tuple[str, dict[str, int]]:
+    """
+    Describes suppressed record counts as the message and variables of a summary
+    record.
+
+    Args:
+        suppressed (dict): Counts keyed by reason and call site, as returned by
+            RecordGate.admit() and RecordGate.drain().
+
+    Returns:
+        tuple[str, dict[str, int]]: The message and the counts, named after the
+            reason and, when known, the call site.
+    """
+    variables = {}
+    for (reason, site), count in sorted(
+        suppressed.items(), key=lambda item: (item[0][0], item[0][1] or ("", 0))
+    ):
+        name = reason if site is None else f"{reason} {site[0]}:{site[1]}"
+        variables[name] = count
+    total = sum(suppressed.values())
+    return f"Suppressed {total} records", variables
@@ -0,0 +1,869 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import atexit
+import contextlib
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable
+from .rotation import LOG_FILE_HEADER, InterprocessLock, RotationPolicy, rotate_file
+
+if TYPE_CHECKING:
+    from .binary import BinaryFormatter
+
+DEFAULT_MAX_OPEN_FILES = 64
+DEFAULT_FLUSH_BYTES = 65536
+DEFAULT_STREAM_CHUNK_SIZE = 65536
+FLUSH_IMMEDIATELY_LEVELS = frozenset({"ERROR", "CRITICAL"})
+# How long console output may wait to be written together with later records.
+DEFAULT_CONSOLE_FLUSH_INTERVAL_MS = 100
+
+
+class FlushPolicy:
+    """
+    Decides when buffered records are written to a log file.
+
+    Pending data is written once flush_bytes characters are buffered, once the
+    oldest pending record is flush_interval_ms old, or immediately when an ERROR
+    record arrives and flush_on_error is set. A flush_bytes of 0 disables
+    buffering entirely.
+    """
+
+    def __init__(
+        self,
+        flush_bytes: int = 0,
+        flush_interval_ms: int | None = None,
+        flush_on_error: bool = True,
+    ) -> None:
+        if flush_bytes < 0:
+            raise ValueError("flush_bytes must not be negative")
+        if flush_interval_ms is not None and flush_interval_ms <= 0:
+            raise ValueError("flush_interval_ms must be positive")
+        self.flush_bytes = flush_bytes
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_on_error = flush_on_error
+
+    @property
+    def buffered(self) -> bool:
+        return self.flush_bytes > 0 or self.flush_interval_ms is not None
+
+    @classmethod
+    def from_config(cls, options: dict | None) -> "FlushPolicy":
+        """
+        Builds a policy from a log key's entry in the "buffering" config section.
+
+        Args:
+            options (dict | None): The buffering options for a log key.
+
+        Returns:
+            FlushPolicy: The policy described by the options.
+        """
+        if not options:
+            return cls()
+        if not isinstance(options, dict):
+            raise ValueError(f"Invalid buffering options: {options!r}")
+        flush_interval_ms = options.get("flush_interval_ms")
+        default_bytes = DEFAULT_FLUSH_BYTES if flush_interval_ms is None else 0
+        return cls(
+            flush_bytes=int(options.get("flush_bytes", default_bytes)),
+            flush_interval_ms=flush_interval_ms,
+            flush_on_error=bool(options.get("flush_on_error", True)),
+        )
+
+
+UNBUFFERED = FlushPolicy()
+
+
+class FileSink:
+    """
+    A persistent append-mode handle for a single log file.
+
+    The file is opened lazily on the first write and kept open until the sink is
+    closed, so a burst of records costs one open() instead of one per record.
+    Records are buffered according to the sink's FlushPolicy and written with a
+    single write() call per flush. With a RotationPolicy the file is rotated
+    before a write that makes it due. Every write to a rotating file holds the
+    file's InterprocessLock and first checks whether another process writing to
+    the same path has rotated it, so no record lands in a moved generation.
+
+    With a BinaryFormatter the file is written in binary mode, and every new file
+    starts with the formatter's header. A sink its SinkPool has let go of is
+    retired: it refuses further writes, so writers that still hold it go back to
+    the pool instead of reopening a handle the pool no longer manages.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        policy: FlushPolicy = UNBUFFERED,
+        rotation: RotationPolicy | None = None,
+        binary_format: "BinaryFormatter | None" = None,
+    ) -> None:
+        self.path = path
+        self.policy = policy
+        self.rotation = rotation
+        self.binary_format = binary_format
+        self._file = None
+        self._size = 0
+        self._inode = None
+        self._period: int | None = None
+        self._interprocess_lock = InterprocessLock(path)
+        # Reentrant so that values rendered while streaming may log to this file.
+        self._lock = threading.RLock()
+        self._pending: list[str] = []
+        self._pending_size = 0
+        self._pending_since: float | None = None
+        self._retired = False
+
+    def write(self, data: str | bytes, log_level: str | None = None) -> bool:
+        """
+        Appends data to the log file, flushing it according to the sink's policy.
+
+        Args:
+            data (str | bytes): The fully formatted log entry.
+            log_level (str | None, optional): The level of the record being written.
+
+        Returns:
+            bool: False if the sink is retired and nothing was written.
+        """
+        policy = self.policy
+        with self._lock:
+            if self._retired:
+                return False
+            if not policy.buffered:
+                self._write_locked(data)
+                return True
+            self._pending.append(data)
+            self._pending_size += len(data)
+            now = time.monotonic()
+            if self._pending_since is None:
+                self._pending_since = now
+            if (
+                (policy.flush_bytes and self._pending_size >= policy.flush_bytes)
+                or (policy.flush_on_error and log_level in FLUSH_IMMEDIATELY_LEVELS)
+                or self._interval_expired(now)
+            ):
+                self._flush_locked()
+        return True
+
+    def write_stream(
+        self,
+        parts,
+        log_level: str | None = None,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    ) -> bool:
+        """
+        Appends a record produced piece by piece, writing it in chunks of about
+        chunk_size characters so it never has to be held in memory as a whole.
+
+        The sink stays locked until the record is complete, so records written by
+        other threads are never interleaved with it.
+
+        Args:
+            parts (Iterable[str]): The pieces of the log entry, in order.
+            log_level (str | None, optional): The level of the record being written.
+            chunk_size (int, optional): The number of characters written at a time.
+
+        Returns:
+            bool: False if the sink is retired and no part was read.
+        """
+        with self._lock, self._stream_lock():
+            if self._retired:
+                return False
+            self._flush_locked()
+            empty = "" if self.binary_format is None else b""
+            chunk: list = []
+            size = 0
+            first_chunk = True
+            for part in parts:
+                chunk.append(part)
+                size += len(part)
+                if size >= chunk_size:
+                    # Only rotate before the record starts, never in the middle of it.
+                    self._write_locked(empty.join(chunk), flush=False, may_rotate=first_chunk)
+                    first_chunk = False
+                    chunk.clear()
+                    size = 0
+            self._write_locked(empty.join(chunk), may_rotate=first_chunk)
+        return True
+
+    def flush(self) -> None:
+        """
+        Writes any buffered records to the log file.
+        """
+        with self._lock:
+            self._flush_locked()
+
+    def flush_if_expired(self, now: float) -> None:
+        """
+        Writes buffered records whose flush interval has elapsed.
+
+        Args:
+            now (float): The current time.monotonic() value.
+        """
+        with self._lock:
+            if self._interval_expired(now):
+                self._flush_locked()
+
+    def close(self) -> None:
+        """
+        Writes any buffered records and closes the underlying file handle.
+        """
+        with self._lock:
+            self._flush_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._interprocess_lock.close()
+
+    def retire(self) -> None:
+        """
+        Closes the sink for good, once its pool no longer holds it.
+        """
+        with self._lock:
+            self._retired = True
+            self.close()
+
+    def _stream_lock(self):
+        # Rotating files stay locked until a streamed record is complete.
+        if self.rotation is None:
+            return contextlib.nullcontext()
+        return self._interprocess_lock
+
+    def _interval_expired(self, now: float) -> bool:
+        interval_ms = self.policy.flush_interval_ms
+        return (
+            interval_ms is not None
+            and self._pending_since is not None
+            and (now - self._pending_since) * 1000 >= interval_ms
+        )
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        data = self._pending[0][:0].join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        self._pending_since = None
+        self._write_locked(data)
+
+    def _write_locked(self, data: str | bytes, flush: bool = True, may_rotate: bool = True) -> None:
+        if self.rotation is None:
+            if self._file is None:
+                self._open_locked()
+            self._file.write(data)
+            self._size += len(data)
+            if flush:
+                self._file.flush()
+            return
+        with self._interprocess_lock:
+            if self._file is None:
+                self._open_locked()
+            if may_rotate:
+                self._check_rotation_locked(len(data))
+            self._file.write(data)
+            self._size += len(data)
+            if flush:
+                self._file.flush()
+
+    def _open_locked(self) -> None:
+        if self.binary_format is None:
+            self._file = open(self.path, "a")
+        else:
+            self._file = open(self.path, "ab")
+        if self.rotation is not None or self.binary_format is not None:
+            stat = os.fstat(self._file.fileno())
+            self._size = stat.st_size
+            self._inode = stat.st_ino
+            if self.rotation is not None:
+                self._period = self.rotation.period(
+                    stat.st_mtime if stat.st_size else time.time()
+                )
+            if self.binary_format is not None and not stat.st_size:
+                header = self.binary_format.file_header()
+                self._file.write(header)
+                self._file.flush()
+                self._size += len(header)
+
+    def _reopen_locked(self) -> None:
+        self._file.close()
+        self._open_locked()
+
+    def _check_rotation_locked(self, incoming: int) -> None:
+        # Called while holding the interprocess lock, so the file cannot be rotated
+        # by another process until this write is done.
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        if stat is None or stat.st_ino != self._inode:
+            # Another process rotated the file; its header is already complete.
+            self._reopen_locked()
+        else:
+            self._size = stat.st_size
+        rotation = self.rotation
+        if not rotation.is_due(self._size, incoming, self._period):
+            return
+        if self.binary_format is not None:
+            # Names interned while the file was written may only be defined by
+            # records still queued for the next file.
+            self._file.write(self.binary_format.definitions())
+        self._file.close()
+        self._file = None
+        rotate_file(self.path, rotation)
+        self._open_locked()
+        if self.binary_format is None:
+            self._file.write(LOG_FILE_HEADER)
+            self._file.flush()
+            self._size += len(LOG_FILE_HEADER)
+
+
+class ConsoleSink(FileSink):
+    """
+    Writes log entries to standard output.
+
+    Entries are buffered according to the sink's FlushPolicy like those of a log
+    file, and each batch is encoded and written to sys.stdout.buffer with a single
+    write() call, instead of one print() and one terminal flush per record.
+    sys.stdout is looked up on every write, so redirecting it takes effect at once.
+    """
+
+    def __init__(self, policy: FlushPolicy = UNBUFFERED) -> None:
+        super().__init__("<stdout>", policy)
+
+    def write(self, data: str | bytes, log_level: str | None = None) -> bool:
+        """
+        Writes data to standard output, flushing it according to the sink's policy.
+
+        Args:
+            data (str | bytes): The fully formatted log entry. Binary entries are
+                written as their representation.
+            log_level (str | None, optional): The level of the record being written.
+
+        Returns:
+            bool: Always True; the console is never retired.
+        """
+        if isinstance(data, bytes):
+            data = f"{data!r}\n"
+        policy = self.policy
+        with self._lock:
+            if not policy.buffered:
+                self._write_locked(data)
+                return True
+            pending = self._pending
+            if not pending:
+                # The pool's flusher writes the batch once the interval is over.
+                self._pending_since = time.monotonic()
+            pending.append(data)
+            self._pending_size += len(data)
+            if (
+                policy.flush_bytes and self._pending_size >= policy.flush_bytes
+            ) or (policy.flush_on_error and log_level in FLUSH_IMMEDIATELY_LEVELS):
+                self._flush_locked()
+        return True
+
+    def tee_stream(
+        self, sink: FileSink, parts, log_level: str | None = None
+    ) -> bool:
+        """
+        Writes a record produced piece by piece to a log file and to standard
+        output at the same time, without holding the whole record in memory.
+
+        Args:
+            sink (FileSink): The sink of the log file.
+            parts (Iterable[str]): The pieces of the log entry, in order.
+            log_level (str | None, optional): The level of the record being written.
+
+        Returns:
+            bool: False if the file's sink is retired and nothing was written.
+        """
+        with self._lock:
+            self._flush_locked()
+            written = sink.write_stream(self._copy_parts(parts), log_level)
+            self._flush_locked()
+        return written
+
+    def close(self) -> None:
+        """
+        Writes any buffered records. Standard output itself stays open.
+        """
+        self.flush()
+
+    def _copy_parts(self, parts):
+        for part in parts:
+            self._pending.append(part)
+            self._pending_size += len(part)
+            if self._pending_size >= DEFAULT_STREAM_CHUNK_SIZE:
+                self._flush_locked()
+            yield part
+
+    def _write_locked(self, data: str, flush: bool = True, may_rotate: bool = True) -> None:
+        stream = sys.stdout
+        if stream is None or not data:
+            return
+        buffer = getattr(stream, "buffer", None)
+        if buffer is None:
+            stream.write(data)
+            if flush:
+                stream.flush()
+            return
+        # Text printed before these records must come out first.
+        stream.flush()
+        buffer.write(data.encode(stream.encoding or "utf-8", stream.errors or "strict"))
+        if flush:
+            buffer.flush()
+
+
+class SinkPool:
+    """
+    Keeps one open FileSink per log file path, closing the least recently used
+    handle once more than max_open_files are open.
+
+    Writes to the path None go to the pool's ConsoleSink. With tee_console set,
+    entries written to text log files are also written to the console.
+    """
+
+    def __init__(self, max_open_files: int = DEFAULT_MAX_OPEN_FILES) -> None:
+        self.max_open_files = max_open_files
+        self._sinks: OrderedDict[str, FileSink] = OrderedDict()
+        self._policies: dict[str, FlushPolicy] = {}
+        self._rotations: dict[str, RotationPolicy] = {}
+        self._binary_formats: "dict[str, BinaryFormatter]" = {}
+        self._lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+        self._flusher_wakeup = threading.Event()
+        self.console = ConsoleSink()
+        self.tee_console = False
+        atexit.register(self.close_all)
+
+    def set_flush_policies(self, policies: dict[str, FlushPolicy]) -> None:
+        """
+        Sets the flush policy used for each log file path.
+
+        Args:
+            policies (dict[str, FlushPolicy]): Flush policies keyed by log file path.
+                Paths without a policy are written unbuffered.
+        """
+        with self._lock:
+            self._policies = {
+                os.path.abspath(path): policy for path, policy in policies.items()
+            }
+            for sink_key, sink in self._sinks.items():
+                sink.policy = self._policies.get(sink_key, UNBUFFERED)
+        if any(p.flush_interval_ms is not None for p in policies.values()):
+            self._start_flusher()
+        self._flusher_wakeup.set()
+
+    def set_console(self, policy: FlushPolicy, tee: bool = False) -> None:
+        """
+        Sets how console output is buffered, and whether it copies the text log files.
+
+        Args:
+            policy (FlushPolicy): The flush policy of the console.
+            tee (bool, optional): Whether entries written to text log files are also
+                written to the console. Defaults to False.
+        """
+        self.console.policy = policy
+        self.tee_console = tee
+        if policy.flush_interval_ms is not None:
+            self._start_flusher()
+        self._flusher_wakeup.set()
+
+    def set_rotation_policies(self, rotations: dict[str, RotationPolicy]) -> None:
+        """
+        Sets the rotation policy used for each log file path.
+
+        Args:
+            rotations (dict[str, RotationPolicy]): Rotation policies keyed by log file
+                path. Paths without a policy are never rotated.
+        """
+        with self._lock:
+            self._rotations = {
+                os.path.abspath(path): rotation for path, rotation in rotations.items()
+            }
+            sinks = list(self._sinks.items())
+        for sink_key, sink in sinks:
+            with sink._lock:
+                sink.rotation = self._rotations.get(sink_key)
+                if sink._file is not None:
+                    sink._reopen_locked()
+
+    def set_binary_formats(self, binary_formats: "dict[str, BinaryFormatter]") -> None:
+        """
+        Sets the log file paths written in the binary format.
+
+        Args:
+            binary_formats (dict[str, BinaryFormatter]): The formatter of each binary
+                log file, keyed by path. Other paths are written as text.
+        """
+        with self._lock:
+            self._binary_formats = {
+                os.path.abspath(path): formatter for path, formatter in binary_formats.items()
+            }
+            sinks = list(self._sinks.items())
+        for sink_key, sink in sinks:
+            binary_format = self._binary_formats.get(sink_key)
+            if binary_format is sink.binary_format:
+                continue
+            with sink._lock:
+                sink.close()
+                sink.binary_format = binary_format
+
+    def get(self, path: str) -> FileSink:
+        """
+        Returns the sink for a log file path, opening a new one if necessary.
+
+        Args:
+            path (str): The path of the log file.
+
+        Returns:
+            FileSink: The sink writing to that path.
+        """
+        sink_key = os.path.abspath(path)
+        evicted = None
+        with self._lock:
+            sink = self._sinks.get(sink_key)
+            if sink is not None:
+                self._sinks.move_to_end(sink_key)
+                return sink
+            if len(self._sinks) >= max(self.max_open_files, 1):
+                _, evicted = self._sinks.popitem(last=False)
+            sink = FileSink(
+                path,
+                self._policies.get(sink_key, UNBUFFERED),
+                self._rotations.get(sink_key),
+                self._binary_formats.get(sink_key),
+            )
+            self._sinks[sink_key] = sink
+        if evicted is not None:
+            evicted.retire()
+        return sink
+
+    def write(self, path: str | None, data: str, log_level: str | None = None) -> None:
+        """
+        Appends data to the log file at path through its pooled handle.
+
+        Args:
+            path (str | None): The path of the log file, or None for the console.
+            data (str): The fully formatted log entry.
+            log_level (str | None, optional): The level of the record being written.
+        """
+        if path is None:
+            self.console.write(data, log_level)
+            return
+        sink = self.get(path)
+        while not sink.write(data, log_level):
+            # The pool let go of the sink meanwhile; write through its successor.
+            sink = self.get(path)
+        if self.tee_console and sink.binary_format is None:
+            self.console.write(data, log_level)
+
+    def write_stream(self, path: str | None, parts, log_level: str | None = None) -> None:
+        """
+        Appends a record produced piece by piece to the log file at path.
+
+        Args:
+            path (str | None): The path of the log file, or None for the console.
+            parts (Iterable[str]): The pieces of the log entry, in order.
+            log_level (str | None, optional): The level of the record being written.
+        """
+        if path is None:
+            self.console.write_stream(parts, log_level)
+            return
+        while True:
+            sink = self.get(path)
+            if self.tee_console and sink.binary_format is None:
+                written = self.console.tee_stream(sink, parts, log_level)
+            else:
+                written = sink.write_stream(parts, log_level)
+            if written:
+                return
+
+    def open_count(self) -> int:
+        """
+        Returns the number of sinks currently held by the pool.
+        """
+        with self._lock:
+            return len(self._sinks)
+
+    def flush_all(self) -> None:
+        """
+        Writes the buffered records of every pooled sink.
+        """
+        with self._lock:
+            sinks = list(self._sinks.values())
+        for sink in sinks:
+            sink.flush()
+        self.console.flush()
+
+    def close_all(self) -> None:
+        """
+        Flushes and closes every pooled handle. The pool stays usable; handles are
+        reopened on the next write.
+        """
+        with self._lock:
+            sinks = list(self._sinks.values())
+            self._sinks.clear()
+        for sink in sinks:
+            sink.retire()
+        self.console.flush()
+
+    def _start_flusher(self) -> None:
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name="logkontrol-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_tick(self) -> float | None:
+        intervals = [
+            p.flush_interval_ms
+            for p in (*self._policies.values(), self.console.policy)
+            if p.flush_interval_ms is not None
+        ]
+        if not intervals:
+            return None
+        return max(min(intervals) / 2000, 0.005)
+
+    def _run_flusher(self) -> None:
+        while True:
+            self._flusher_wakeup.wait(self._flush_tick())
+            self._flusher_wakeup.clear()
+            now = time.monotonic()
+            with self._lock:
+                sinks = list(self._sinks.values())
+            for sink in sinks:
+                sink.flush_if_expired(now)
+            self.console.flush_if_expired(now)
+
+
+BACKPRESSURE_POLICIES = ("block", "drop_newest", "drop_oldest")
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 512
+_STOP = object()
+
+
+class BackgroundWriter:
+    """
+    Moves file writes off the calling thread.
+
+    Formatted records are pushed onto a bounded queue and a dedicated writer thread
+    drains it, joining the records of each batch per log file path so they reach
+    the SinkPool with one write() per destination. When the queue is full the
+    backpressure policy decides whether the caller blocks, the new record is
+    dropped, or the oldest queued record is dropped to make room.
+    """
+
+    def __init__(
+        self,
+        sink_pool: SinkPool,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        backpressure: str = "block",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        on_error: Callable[[str], None] | None = None,
+    ) -> None:
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Invalid backpressure policy: {backpressure}. "
+                f"Expected one of {', '.join(BACKPRESSURE_POLICIES)}"
+            )
+        if queue_size <= 0 or batch_size <= 0:
+            raise ValueError("queue_size and batch_size must be positive")
+        self.sink_pool = sink_pool
+        self.backpressure = backpressure
+        self.batch_size = batch_size
+        self._on_error = on_error
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._dropped: dict[str, int] = {}
+        self._dropped_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="logkontrol-writer", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def from_config(
+        cls,
+        sink_pool: SinkPool,
+        options: dict,
+        on_error: Callable[[str], None] | None = None,
+    ) -> "BackgroundWriter":
+        """
+        Builds a writer from the "background_writer" config section.
+
+        Args:
+            sink_pool (SinkPool): The pool the writer thread writes through.
+            options (dict): The background writer options.
+            on_error (Callable[[str], None] | None, optional): Called with the path
+                of each log file a batch could not be written to.
+
+        Returns:
+            BackgroundWriter: A started writer.
+        """
+        if not isinstance(options, dict):
+            options = {}
+        return cls(
+            sink_pool,
+            queue_size=int(options.get("queue_size", DEFAULT_QUEUE_SIZE)),
+            backpressure=options.get("backpressure", "block"),
+            batch_size=int(options.get("batch_size", DEFAULT_BATCH_SIZE)),
+            on_error=on_error,
+        )
+
+    @property
+    def running(self) -> bool:
+        return not self._closed and self._thread.is_alive()
+
+    def submit(self, path: str, data: str, log_level: str | None = None) -> None:
+        """
+        Queues a formatted record for the writer thread.
+
+        Records submitted after shutdown() are written synchronously.
+
+        Args:
+            path (str): The path of the log file.
+            data (str): The fully formatted log entry.
+            log_level (str | None, optional): The level of the record being written.
+        """
+        if self._closed:
+            self.sink_pool.write(path, data, log_level)
+            return
+        item = (path, data, log_level)
+        if self.backpressure == "block":
+            self._queue.put(item)
+        elif self.backpressure == "drop_newest":
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self._record_drop(path)
+        else:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    pass
+                try:
+                    oldest = self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                if not isinstance(oldest, tuple):
+                    # Never discard the shutdown marker or a wait_idle() barrier;
+                    # write this record directly instead.
+                    self._queue.put(oldest)
+                    self.sink_pool.write(path, data, log_level)
+                    return
+                self._record_drop(oldest[0])
+
+    def dropped_counts(self) -> dict[str, int]:
+        """
+        Returns the number of records dropped by backpressure, keyed by log file path.
+        """
+        with self._dropped_lock:
+            return dict(self._dropped)
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """
+        Waits until every record queued before the call has been written.
+
+        Args:
+            timeout (float | None, optional): The maximum number of seconds to wait.
+                Waits indefinitely if None.
+
+        Returns:
+            bool: True if the queued records were written before the timeout.
+        """
+        if self._closed:
+            return True
+        barrier = threading.Event()
+        try:
+            self._queue.put(barrier, timeout=timeout)
+        except queue.Full:
+            return False
+        return barrier.wait(timeout)
+
+    def shutdown(self, timeout: float | None = None) -> bool:
+        """
+        Stops accepting queued records and waits for the queue to drain.
+
+        Args:
+            timeout (float | None, optional): The maximum number of seconds to wait.
+                Waits indefinitely if None.
+
+        Returns:
+            bool: True if every queued record was written before the timeout.
+        """
+        if not self._closed:
+            self._closed = True
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                return False
+        self._thread.join(timeout)
+        drained = not self._thread.is_alive()
+        if drained:
+            # Records that raced with shutdown() land behind the stop marker.
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, tuple):
+                    self.sink_pool.write(*item)
+                elif item is not _STOP:
+                    item.set()
+            self.sink_pool.flush_all()
+        return drained
+
+    def _record_drop(self, path: str) -> None:
+        with self._dropped_lock:
+            self._dropped[path] = self._dropped.get(path, 0) + 1
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            grouped: dict[str, list] = {}
+            barriers = []
+            for item in batch:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    barriers.append(item)
+                else:
+                    grouped.setdefault(item[0], []).append(item)
+            try:
+                for path, items in grouped.items():
+                    self._write_group(path, items)
+            finally:
+                # Waiters are released even if the writer thread fails.
+                for barrier in barriers:
+                    barrier.set()
+
+    def _write_group(self, path: str, items: list) -> None:
+        log_level = items[-1][2]
+        for item in items:
+            if item[2] in FLUSH_IMMEDIATELY_LEVELS:
+                log_level = item[2]
+                break
+        try:
+            # Binary log files are written bytes rather than text.
+            entries = [item[1] for item in items]
+            self.sink_pool.write(path, entries[0][:0].join(entries), log_level)
+        except Exception as error:
+            # Any failure only loses this batch; the writer thread keeps running.
+            print(f"Failed to write log file {path}: {error}")
+            if self._on_error is not None:
+                self._on_error(path)
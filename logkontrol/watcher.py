@@ -0,0 +1,136 @@
+# This file by voidfemme is released under CC0 1.0 Universal (CC0 1.0) Public Domain Dedication.
+# https://creativecommons.org/publicdomain/zero/1.0
+
+import os
+import threading
+from typing import Callable
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def validate_logging_config(config) -> dict:
+    """
+    Checks that a loaded configuration has the shape logkontrol needs before it is
+    built.
+
+    Args:
+        config: The loaded logging configuration.
+
+    Returns:
+        dict: The configuration.
+
+    Raises:
+        ValueError: If the configuration is not a mapping with log_file_paths.
+    """
+    if not isinstance(config, dict):
+        raise ValueError("The logging configuration must be a mapping")
+    log_file_paths = config.get("log_file_paths")
+    if not isinstance(log_file_paths, dict) or not log_file_paths:
+        raise ValueError("The logging configuration needs log_file_paths")
+    return config
+
+
+class ConfigWatcher:
+    """
+    Polls the modification time of a config file from a background thread and
+    applies the file again when it changes.
+
+    A changed file is loaded and validated off the logging path. If it is invalid
+    the current configuration stays in place and the error is printed; the file is
+    tried again once it changes another time.
+    """
+
+    def __init__(
+        self,
+        config_file_path: str,
+        load: Callable[[str], dict],
+        apply: Callable[[dict], None],
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        """
+        Args:
+            config_file_path (str): The path of the YAML configuration file.
+            load (Callable[[str], dict]): Loads the configuration from the file.
+            apply (Callable[[dict], None]): Builds and swaps in a configuration,
+                raising ValueError if it is invalid.
+            interval (float, optional): The number of seconds between polls.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.config_file_path = config_file_path
+        self.interval = interval
+        self._load = load
+        self._apply = apply
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.config_file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self) -> None:
+        """
+        Starts polling on a daemon thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="logkontrol-config-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stops polling and waits for the thread to finish.
+
+        Args:
+            timeout (float | None, optional): The maximum number of seconds to wait.
+        """
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def check(self) -> bool:
+        """
+        Applies the config file if it changed since the last check.
+
+        Returns:
+            bool: True if a new configuration was applied.
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        import yaml
+
+        try:
+            config = validate_logging_config(self._load(self.config_file_path))
+            self._apply(config)
+        except (OSError, ValueError, yaml.YAMLError) as error:
+            print(
+                f"Ignoring invalid logging configuration in "
+                f"{self.config_file_path}: {error}"
+            )
+            return False
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as error:
+                # A reload that fails unexpectedly must not stop later reloads.
+                print(
+                    f"Failed to reload logging configuration from "
+                    f"{self.config_file_path}: {error!r}"
+                )
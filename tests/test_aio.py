@@ -0,0 +1,132 @@
+# tests/test_aio.py
+
+import asyncio
+import os
+import threading
+import unittest
+from unittest.mock import patch
+from logkontrol.logkontrol import LogKonfig, log_message
+from logkontrol.aio import (
+    aclose,
+    aflush,
+    alog_function_call,
+    alog_json_content,
+    alog_message,
+    alog_variable,
+)
+
+
+class TestAsyncLogging(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        self.log_file_key = "test_log"
+        self.log_file_path = "test_log.log"
+
+    def tearDown(self):
+        self.log_konfig.close()
+        if os.path.exists(self.log_file_path):
+            os.remove(self.log_file_path)
+
+    def read_log(self):
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_all_coroutines_write_after_aflush(self):
+        async def main():
+            await alog_message(self.log_file_key, "async message")
+            await alog_variable(self.log_file_key, "answer", 42)
+            await alog_function_call(self.log_file_key, "handler", arg1="value1")
+            await alog_json_content(self.log_file_key, {"key": "value"})
+            await aflush()
+
+        asyncio.run(main())
+        log_content = self.read_log()
+        self.assertIn("Message: async message", log_content)
+        self.assertIn("answer: 42", log_content)
+        self.assertIn("Function Call: handler()", log_content)
+        self.assertIn("  arg1: value1", log_content)
+        self.assertIn('"key": "value"', log_content)
+
+    def test_file_io_stays_off_the_loop_thread(self):
+        write_threads = set()
+        original_write = LogKonfig.write_entry
+
+        def recording_write(log_konfig, *args):
+            write_threads.add(threading.get_ident())
+            original_write(log_konfig, *args)
+
+        async def main():
+            await alog_message(self.log_file_key, "off loop")
+            await aflush()
+            return threading.get_ident()
+
+        with patch.object(LogKonfig, "write_entry", recording_write):
+            loop_thread = asyncio.run(main())
+        self.assertTrue(write_threads)
+        self.assertNotIn(loop_thread, write_threads)
+
+    def test_entries_from_many_tasks_are_coalesced(self):
+        calls = []
+        original_write = LogKonfig.write_entry
+
+        def recording_write(log_konfig, log_file_path, log_entry, log_level=None):
+            calls.append(log_entry)
+            original_write(log_konfig, log_file_path, log_entry, log_level)
+
+        async def task(index):
+            await alog_variable(self.log_file_key, "task", index)
+
+        async def main():
+            await asyncio.gather(*(task(index) for index in range(50)))
+            await aflush()
+
+        with patch.object(LogKonfig, "write_entry", recording_write):
+            asyncio.run(main())
+        self.assertEqual(self.read_log().count("task: "), 50)
+        self.assertLess(len(calls), 50)
+
+    def test_order_is_preserved(self):
+        async def main():
+            for index in range(20):
+                await alog_variable(self.log_file_key, "index", index)
+                if index % 5 == 0:
+                    await asyncio.sleep(0)
+            await aclose()
+
+        asyncio.run(main())
+        lines = [line for line in self.read_log().splitlines() if line.startswith("index")]
+        self.assertEqual(lines, [f"index: {index}" for index in range(20)])
+
+    def test_aclose_leaves_synchronous_logging_running(self):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": "test_log.log"},
+                "background_writer": {"queue_size": 10},
+            }
+        )
+        background_writer = self.log_konfig.get_background_writer()
+
+        async def main():
+            await alog_message(self.log_file_key, "from the loop")
+            await aclose()
+
+        asyncio.run(main())
+        self.assertIs(self.log_konfig.get_background_writer(), background_writer)
+        self.assertTrue(background_writer.running)
+        log_message(self.log_file_key, "from synchronous code")
+        self.assertTrue(self.log_konfig.shutdown(timeout=5))
+        log_content = self.read_log()
+        self.assertLess(
+            log_content.index("from the loop"), log_content.index("from synchronous code")
+        )
+
+    def test_without_logging_config(self):
+        self.log_konfig.set_logging_config(None)  # type: ignore
+        with patch("builtins.print") as mock_print:
+            asyncio.run(alog_message(self.log_file_key, "message"))
+            mock_print.assert_called_with(
+                "Logging configuration is not initialized. Please call init_logging() first."
+            )
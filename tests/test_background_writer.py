@@ -0,0 +1,143 @@
+# tests/test_background_writer.py
+
+import os
+import threading
+import unittest
+from unittest.mock import patch
+from logkontrol.logkontrol import LogKonfig, log_message, log_variable
+from logkontrol.sinks import BackgroundWriter, SinkPool
+
+
+class BlockingSinkPool(SinkPool):
+    """A SinkPool whose writes wait until the test releases them."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.writes = []
+
+    def write(self, path, data, log_level=None):
+        self.release.wait()
+        self.writes.append((path, data))
+
+
+class FailingSinkPool(SinkPool):
+    """A SinkPool whose first write raises an unexpected exception."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, path, data, log_level=None):
+        if not self.writes:
+            self.writes.append(None)
+            raise UnicodeEncodeError("ascii", "é", 0, 1, "unexpected")
+        self.writes.append((path, data))
+
+
+class TestBackgroundWriter(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_file_key = "test_log"
+        self.log_file_path = "test_log.log"
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        if os.path.exists(self.log_file_path):
+            os.remove(self.log_file_path)
+
+    def configure(self, background_writer):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": "test_log.log"},
+                "background_writer": background_writer,
+            }
+        )
+
+    def test_records_are_written_after_shutdown(self):
+        self.configure({"queue_size": 100})
+        self.assertIsNotNone(self.log_konfig.get_background_writer())
+        for index in range(50):
+            log_variable(self.log_file_key, "index", index)
+        log_message(self.log_file_key, "done")
+        self.assertTrue(self.log_konfig.shutdown(timeout=5))
+        with open(self.log_file_path, "r") as log_file:
+            log_content = log_file.read()
+        self.assertEqual(log_content.count("index: "), 50)
+        self.assertTrue(log_content.endswith("Message: done\n\n"))
+
+    def test_records_after_shutdown_are_written_synchronously(self):
+        self.configure({"queue_size": 10})
+        self.log_konfig.shutdown(timeout=5)
+        self.assertIsNone(self.log_konfig.get_background_writer())
+        log_message(self.log_file_key, "synchronous")
+        with open(self.log_file_path, "r") as log_file:
+            self.assertIn("Message: synchronous", log_file.read())
+
+    def test_batches_are_joined_per_destination(self):
+        pool = BlockingSinkPool()
+        writer = BackgroundWriter(pool, queue_size=100)
+        writer.submit("a.log", "first\n")
+        for index in range(5):
+            writer.submit("a.log", f"a{index}\n")
+            writer.submit("b.log", f"b{index}\n")
+        pool.release.set()
+        self.assertTrue(writer.shutdown(timeout=5))
+        written = {}
+        for path, data in pool.writes:
+            written[path] = written.get(path, "") + data
+        self.assertEqual(written["a.log"], "first\n" + "".join(f"a{i}\n" for i in range(5)))
+        self.assertEqual(written["b.log"], "".join(f"b{i}\n" for i in range(5)))
+        self.assertLess(len(pool.writes), 11)
+
+    def test_drop_newest(self):
+        pool = BlockingSinkPool()
+        writer = BackgroundWriter(pool, queue_size=2, backpressure="drop_newest")
+        writer.submit("a.log", "held\n")
+        while writer._queue.qsize():
+            pass
+        for index in range(5):
+            writer.submit("a.log", f"{index}\n")
+        self.assertEqual(writer.dropped_counts(), {"a.log": 3})
+        pool.release.set()
+        writer.shutdown(timeout=5)
+        self.assertEqual("".join(data for _, data in pool.writes), "held\n0\n1\n")
+
+    def test_drop_oldest(self):
+        pool = BlockingSinkPool()
+        writer = BackgroundWriter(pool, queue_size=2, backpressure="drop_oldest")
+        writer.submit("a.log", "held\n")
+        while writer._queue.qsize():
+            pass
+        for index in range(5):
+            writer.submit("a.log", f"{index}\n")
+        self.assertEqual(writer.dropped_counts(), {"a.log": 3})
+        pool.release.set()
+        writer.shutdown(timeout=5)
+        self.assertEqual("".join(data for _, data in pool.writes), "held\n3\n4\n")
+
+    def test_shutdown_timeout_reports_undrained_queue(self):
+        pool = BlockingSinkPool()
+        writer = BackgroundWriter(pool, queue_size=10)
+        writer.submit("a.log", "held\n")
+        self.assertFalse(writer.shutdown(timeout=0.05))
+        pool.release.set()
+        self.assertTrue(writer.shutdown(timeout=5))
+
+    def test_writer_survives_unexpected_errors(self):
+        pool = FailingSinkPool()
+        errors = []
+        writer = BackgroundWriter(pool, queue_size=10, on_error=errors.append)
+        writer.submit("a.log", "lost\n")
+        with patch("builtins.print"):
+            self.assertTrue(writer.wait_idle(timeout=5))
+        self.assertEqual(errors, ["a.log"])
+        writer.submit("a.log", "kept\n")
+        self.assertTrue(writer.shutdown(timeout=5))
+        self.assertEqual(pool.writes[1:], [("a.log", "kept\n")])
+
+    def test_invalid_backpressure(self):
+        with self.assertRaises(ValueError):
+            BackgroundWriter(SinkPool(), backpressure="sometimes")
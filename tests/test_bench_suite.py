@@ -0,0 +1,60 @@
+# tests/test_bench_suite.py
+
+import unittest
+from benchmarks.bench_suite import compare_reports, run_suite
+from logkontrol.logkontrol import LogKonfig
+
+
+def report(records_per_second=1000.0, p50_us=10.0, alloc_bytes_per_record=500.0):
+    return {
+        "results": {
+            "log_message/small/file": {
+                "records_per_second": records_per_second,
+                "p50_us": p50_us,
+                "alloc_bytes_per_record": alloc_bytes_per_record,
+            }
+        }
+    }
+
+
+class TestBenchSuite(unittest.TestCase):
+    def test_run_suite_reports_every_mode(self):
+        log_konfig = LogKonfig()
+        config = {"log_file_paths": {"test_log": "test_log.log"}}
+        log_konfig.set_logging_config(config)
+        result = run_suite(0.001, "log_message/small", rounds=1, log=lambda line: None)
+        self.assertEqual(
+            sorted(result["results"]),
+            [
+                "log_message/small/console",
+                "log_message/small/file",
+                "log_message/small/tee",
+                "log_message/small/threads",
+            ],
+        )
+        for case in result["results"].values():
+            self.assertGreater(case["records_per_second"], 0)
+            self.assertLessEqual(case["p50_us"], case["p99_us"])
+            self.assertGreater(case["alloc_bytes_per_record"], 0)
+        self.assertEqual(log_konfig.get_logging_config(), config)
+
+    def test_changes_within_threshold_pass(self):
+        self.assertEqual(
+            compare_reports(report(), report(950.0, 10.5, 520.0), threshold=0.10), []
+        )
+
+    def test_regressions_are_listed(self):
+        regressions = compare_reports(report(), report(800.0, 13.0, 700.0), threshold=0.10)
+        self.assertEqual(len(regressions), 3)
+        self.assertIn("records/s 1000 -> 800 (-20.0%)", regressions[0])
+
+    def test_improvements_and_new_cases_are_not_regressions(self):
+        faster = report(2000.0, 5.0, 100.0)
+        faster["results"]["log_variable/small/file"] = faster["results"][
+            "log_message/small/file"
+        ]
+        self.assertEqual(compare_reports(report(), faster), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
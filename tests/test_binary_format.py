@@ -0,0 +1,155 @@
+# tests/test_binary_format.py
+
+import gzip
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from logkontrol.binary import FRAME_STRING, MAGIC, BinaryDecoder, BinaryFormatter, decode_file
+from logkontrol.logkontrol import (
+    LogKonfig,
+    lazy,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+)
+from logkontrol.rotation import compressor, list_generations
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def without_timestamps(text):
+    return re.sub(r"^\[[^\]\n]+\]", "[timestamp]", text, flags=re.M)
+
+
+def log_records():
+    log_message("test_log", "hello", {"count": 1, "items": [1, 2], 3: "é✓"})
+    log_message("test_log", "only a message", log_level="INFO")
+    log_message("test_log", None, {"text": "x" * 1000}, log_level="TRUNCATED")
+    log_message("test_log", "nul\0inside", {"value": "a\0b"})
+    log_message("test_log", lambda: "deferred", {"state": lazy(lambda: {"ready": True})})
+    log_function_call("test_log", "handler", log_level="WARNING", arg1=1, arg2="two")
+    log_function_call("test_log", "no_arguments")
+    log_function_call("test_log", "handler", log_level="TRUNCATED", arg1="y" * 900)
+    log_json_content("test_log", {"key": [1, 2]})
+    log_json_content("test_log", [{"a": 1}] * 3, max_items=2)
+    log_variable("test_log", "value", 3.5, log_level="AUDIT")
+
+
+class TestBinaryFormat(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.lkb")
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        compressor.wait_idle()
+        shutil.rmtree(self.log_directory)
+
+    def configure(self, log_file_path, log_file_format="binary", **options):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": log_file_path},
+                "log_file_formats": {"test_log": log_file_format},
+                **options,
+            }
+        )
+
+    def decode(self, path=None):
+        return "".join(decode_file(path or self.log_file_path))
+
+    def test_decoded_records_match_text_format(self):
+        text_path = os.path.join(self.log_directory, "test.log")
+        self.configure(text_path, "text")
+        log_records()
+        self.configure(self.log_file_path)
+        log_records()
+        self.log_konfig.close()
+        with open(text_path, "r") as log_file:
+            expected = log_file.read()
+        self.assertEqual(without_timestamps(self.decode()), without_timestamps(expected))
+        self.assertLess(os.path.getsize(self.log_file_path), os.path.getsize(text_path))
+
+    def test_names_are_defined_once(self):
+        self.configure(self.log_file_path)
+        for index in range(10):
+            log_message("test_log", None, {"index": index, "name": "value"})
+            log_function_call("test_log", "handler", index=index)
+        self.log_konfig.close()
+        with open(self.log_file_path, "rb") as log_file:
+            data = log_file.read()
+        self.assertTrue(data.startswith(MAGIC))
+        frames = list(BinaryDecoder.iter_frames(data))
+        definitions = {frame for frame in frames if frame[0] == FRAME_STRING}
+        self.assertEqual(len(definitions), 3)
+        self.assertEqual(len(frames) - sum(frame[0] == FRAME_STRING for frame in frames), 20)
+        self.assertIn("Function Call: handler()\n  index: 9\n", self.decode())
+
+    def test_initialized_file_starts_with_header(self):
+        self.configure(self.log_file_path)
+        self.log_konfig.initialize_log_file("test_log")
+        log_variable("test_log", "value", 1)
+        self.log_konfig.close()
+        self.assertEqual(without_timestamps(self.decode()), "[timestamp] [DEBUG]\nvalue: 1\n\n")
+
+    def test_incomplete_trailing_record_is_ignored(self):
+        self.configure(self.log_file_path)
+        log_variable("test_log", "first", 1)
+        log_variable("test_log", "second", 2)
+        self.log_konfig.close()
+        with open(self.log_file_path, "rb+") as log_file:
+            log_file.truncate(os.path.getsize(self.log_file_path) - 3)
+        self.assertEqual(without_timestamps(self.decode()), "[timestamp] [DEBUG]\nfirst: 1\n\n")
+
+    def test_rotated_files_decode_on_their_own(self):
+        self.configure(
+            self.log_file_path,
+            rotation={"test_log": {"max_size_mb": 0.0005, "backup_count": 100}},
+        )
+        for index in range(100):
+            log_message("test_log", "record", {"index": index})
+        self.log_konfig.close()
+        compressor.wait_idle()
+        generations = list_generations(self.log_file_path)
+        self.assertGreater(len(generations), 1)
+        self.assertTrue(generations[-1].endswith(".gz"))
+        decoded = "".join(self.decode(path) for path in generations + [self.log_file_path])
+        self.assertEqual(decoded.count("Message: record\n"), 100)
+        self.assertIn("index: 99\n", self.decode())
+        self.assertNotIn("unknown name", decoded)
+
+    def test_background_writer(self):
+        self.configure(self.log_file_path, background_writer={"queue_size": 100})
+        for index in range(50):
+            log_variable("test_log", "index", index)
+        self.log_konfig.shutdown()
+        self.assertEqual(self.decode().count("index: "), 50)
+
+    def test_not_a_binary_log_file(self):
+        with open(self.log_file_path, "w") as log_file:
+            log_file.write("Log File Initialized\n\n")
+        with self.assertRaises(ValueError):
+            self.decode()
+
+    def test_decode_command(self):
+        formatter = BinaryFormatter()
+        with gzip.open(self.log_file_path + ".gz", "wb") as log_file:
+            log_file.write(formatter.file_header())
+            log_file.write(formatter.format_message("compressed", None, "ERROR"))
+        result = subprocess.run(
+            [
+                sys.executable, "-m", "logkontrol", "decode", self.log_file_path + ".gz",
+                "--log-format", "{level} {message}",
+            ],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.decode(), "ERROR Message: compressed\n\n")
@@ -0,0 +1,90 @@
+# tests/test_buffering.py
+
+import os
+import time
+import unittest
+from logkontrol.logkontrol import LogKonfig, log_message, log_variable
+from logkontrol.sinks import FlushPolicy
+
+
+class TestBuffering(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_file_key = "test_log"
+        self.log_file_path = "test_log.log"
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        if os.path.exists(self.log_file_path):
+            os.remove(self.log_file_path)
+
+    def configure(self, buffering):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": "test_log.log"},
+                "buffering": {"test_log": buffering},
+            }
+        )
+
+    def read_log(self):
+        if not os.path.exists(self.log_file_path):
+            return ""
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_records_are_held_until_flush_bytes(self):
+        self.configure({"flush_bytes": 4096})
+        for index in range(10):
+            log_variable(self.log_file_key, "index", index)
+        self.assertEqual(self.read_log(), "")
+        self.log_konfig.flush()
+        self.assertEqual(self.read_log().count("index: "), 10)
+
+    def test_flush_bytes_threshold_writes_batch(self):
+        self.configure({"flush_bytes": 64})
+        log_message(self.log_file_key, "x" * 80)
+        self.assertIn("x" * 80, self.read_log())
+
+    def test_error_record_flushes_immediately(self):
+        self.configure({"flush_bytes": 4096})
+        log_message(self.log_file_key, "pending")
+        log_message(self.log_file_key, "failure", log_level="ERROR")
+        log_content = self.read_log()
+        self.assertIn("Message: pending", log_content)
+        self.assertIn("Message: failure", log_content)
+
+    def test_error_flush_can_be_disabled(self):
+        self.configure({"flush_bytes": 4096, "flush_on_error": False})
+        log_message(self.log_file_key, "failure", log_level="ERROR")
+        self.assertEqual(self.read_log(), "")
+
+    def test_flush_interval_drains_in_background(self):
+        self.configure({"flush_interval_ms": 20})
+        log_message(self.log_file_key, "eventually")
+        deadline = time.monotonic() + 2
+        while "eventually" not in self.read_log() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn("Message: eventually", self.read_log())
+
+    def test_close_drains_buffer(self):
+        self.configure({"flush_bytes": 4096})
+        log_message(self.log_file_key, "drained")
+        self.log_konfig.close()
+        self.assertIn("Message: drained", self.read_log())
+
+    def test_unknown_key_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.log_konfig.set_logging_config(
+                {
+                    "log_file_paths": {"test_log": "test_log.log"},
+                    "buffering": {"missing": {"flush_bytes": 10}},
+                }
+            )
+
+    def test_invalid_policy_values(self):
+        with self.assertRaises(ValueError):
+            FlushPolicy.from_config({"flush_bytes": -1})
+        with self.assertRaises(ValueError):
+            FlushPolicy.from_config({"flush_interval_ms": 0})
@@ -0,0 +1,164 @@
+# tests/test_coalescing.py
+
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from logkontrol.aio import aclose, alog_message
+from logkontrol.coalescing import Coalescer
+from logkontrol.logkontrol import (
+    LogKonfig,
+    lazy,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+)
+
+
+class TestCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def configure(self, coalescing=True, **options):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": self.log_file_path},
+                "coalescing": {"test_log": coalescing},
+                **options,
+            }
+        )
+
+    def read_bodies(self):
+        self.log_konfig.close()
+        with open(self.log_file_path, "r") as log_file:
+            return re.split(r"^\[[^\]\n]+\] ", log_file.read(), flags=re.M)[1:]
+
+    def test_repeats_are_summarized_when_the_run_ends(self):
+        self.configure()
+        for _ in range(1000):
+            log_message("test_log", "Retrying", {"attempt_limit": 5, "hosts": ["a", "b"]})
+        log_message("test_log", "Connected")
+        bodies = self.read_bodies()
+        self.assertEqual(len(bodies), 3)
+        self.assertTrue(bodies[0].startswith("[DEBUG]\nMessage: Retrying\n"))
+        self.assertRegex(
+            bodies[1],
+            r"^\[DEBUG\]\nMessage: Last record repeated 999 times\n"
+            r"first_repeat: \d{4}-\d\d-\d\d \d\d:\d\d:\d\d\n"
+            r"last_repeat: \d{4}-\d\d-\d\d \d\d:\d\d:\d\d\n",
+        )
+        self.assertTrue(bodies[2].startswith("[DEBUG]\nMessage: Connected\n"))
+
+    def test_different_content_or_level_is_not_coalesced(self):
+        self.configure()
+        log_message("test_log", "Polling", {"count": 1})
+        log_message("test_log", "Polling", {"count": 2})
+        log_message("test_log", "Polling", {"count": 2}, log_level="INFO")
+        log_variable("test_log", "count", 2)
+        log_message("test_log", None, {"count": 2})
+        log_function_call("test_log", "poll", count=2)
+        log_function_call("test_log", "poll", count=2)
+        bodies = self.read_bodies()
+        self.assertEqual(len(bodies), 6)
+        self.assertIn("Last record repeated 1 times", bodies[4])
+
+    def test_lazy_values_are_compared_by_result(self):
+        self.configure()
+        for _ in range(3):
+            log_message("test_log", lambda: "state", {"value": lazy(lambda: 42)})
+        log_json_content("test_log", {"key": "value"})
+        bodies = self.read_bodies()
+        self.assertEqual(len(bodies), 3)
+        self.assertIn("Last record repeated 2 times", bodies[1])
+        self.assertIn('"key": "value"', bodies[2])
+
+    def test_window_expiry_writes_a_summary(self):
+        self.configure({"window_seconds": 10})
+        with patch("logkontrol.coalescing.time.time") as clock:
+            for now in (100, 101, 105, 112, 113, 114):
+                clock.return_value = now
+                log_message("test_log", "Polling")
+        self.log_konfig.flush()
+        bodies = self.read_bodies()
+        self.assertEqual(len(bodies), 3)
+        self.assertIn("Last record repeated 3 times", bodies[1])
+        self.assertIn("Last record repeated 2 times", bodies[2])
+
+    def test_expired_runs_are_summarized_without_another_record(self):
+        self.configure({"window_seconds": 0.05})
+        for _ in range(3):
+            log_message("test_log", "Polling")
+        deadline = time.monotonic() + 5
+        content = ""
+        while "Last record repeated" not in content and time.monotonic() < deadline:
+            time.sleep(0.02)
+            with open(self.log_file_path, "r") as log_file:
+                content = log_file.read()
+        self.assertIn("Message: Last record repeated 2 times", content)
+        log_message("test_log", "Polling")
+        bodies = self.read_bodies()
+        self.assertEqual(len(bodies), 2)
+
+    def test_held_repeats_are_summarized_at_shutdown(self):
+        self.configure()
+        for _ in range(5):
+            log_message("test_log", "Polling")
+        self.log_konfig.shutdown()
+        bodies = self.read_bodies()
+        self.assertEqual(len(bodies), 2)
+        self.assertIn("Last record repeated 4 times", bodies[1])
+
+    def test_async_repeats_keep_their_order(self):
+        self.configure()
+
+        async def main():
+            for _ in range(5):
+                await alog_message("test_log", "Polling")
+            await alog_message("test_log", "Done")
+            await aclose()
+
+        asyncio.run(main())
+        bodies = self.read_bodies()
+        self.assertEqual(len(bodies), 3)
+        self.assertIn("Message: Polling", bodies[0])
+        self.assertIn("Last record repeated 4 times", bodies[1])
+        self.assertIn("Message: Done", bodies[2])
+
+    def test_invalid_config(self):
+        invalid_options = [
+            {"coalescing": {"other_log": True}},
+            {"coalescing": {"test_log": {"window_seconds": 0}}},
+            {"coalescing": {"test_log": {"window": 5}}},
+            {"coalescing": {"test_log": 5}},
+        ]
+        for options in invalid_options:
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    self.log_konfig.set_logging_config(
+                        {"log_file_paths": {"test_log": self.log_file_path}, **options}
+                    )
+
+    def test_unhashable_content_is_compared_by_repr(self):
+        coalescer = Coalescer()
+        self.assertEqual(coalescer.observe("DEBUG", ("message", "x", {"a": [1]})), (False, None))
+        self.assertEqual(coalescer.observe("DEBUG", ("message", "x", {"a": [1]})), (True, None))
+        repeated, run = coalescer.observe("DEBUG", ("message", "x", {"a": [2]}))
+        self.assertFalse(repeated)
+        self.assertEqual(run.count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,291 @@
+# tests/test_collector.py
+
+import multiprocessing
+import os
+import re
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from logkontrol.__main__ import build_parser
+from logkontrol.collector import (
+    MAX_LEVEL_BYTES,
+    MAX_PATH_BYTES,
+    CollectorClient,
+    CollectorServer,
+    decode_batch,
+    encode_batch,
+)
+from logkontrol.logkontrol import LogKonfig, log_message
+from logkontrol.sinks import SinkPool
+
+
+class RecordingSinkPool(SinkPool):
+    """A SinkPool that also counts the writes it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+        self.written = threading.Condition()
+
+    def write(self, path, data, log_level=None):
+        super().write(path, data, log_level)
+        with self.written:
+            self.writes.append((path, data, log_level))
+            self.written.notify_all()
+
+    def wait_for(self, text, path, timeout=5):
+        # Waits until the records written to path contain text.
+        with self.written:
+            return self.written.wait_for(
+                lambda: any(
+                    text in data
+                    for write_path, data, _ in self.writes
+                    if write_path == path
+                ),
+                timeout,
+            )
+
+
+def _log_from_worker(worker: int, records: int) -> None:
+    for index in range(records):
+        log_message(
+            "shared",
+            f"worker {worker} record {index}",
+            {"lines": "first\nsecond\nthird", "worker": worker},
+            log_level="INFO",
+        )
+    LogKonfig().shutdown()
+
+
+class TestFraming(unittest.TestCase):
+    def test_batches_round_trip(self):
+        records = [
+            ("a.log", "text entry\n", "INFO"),
+            ("b.bin", b"\x00\x01binary", None),
+            ("ünïcode.log", "ünïcode\n", "ERROR"),
+        ]
+        frame = encode_batch(records)
+        self.assertEqual(int.from_bytes(frame[:4], "big"), len(frame) - 4)
+        self.assertEqual(decode_batch(frame[4:]), records)
+
+    def test_truncated_frames_are_rejected(self):
+        frame = encode_batch([("a.log", "entry\n", "INFO")])
+        with self.assertRaises(ValueError):
+            decode_batch(frame[4:-1])
+
+    def test_oversized_fields_are_rejected(self):
+        for record in (
+            ("a" * (MAX_PATH_BYTES + 1), "entry\n", "INFO"),
+            ("a.log", "entry\n", "L" * (MAX_LEVEL_BYTES + 1)),
+        ):
+            with self.subTest(record=record[0][:8]):
+                with self.assertRaises(ValueError):
+                    encode_batch([record])
+
+
+class TestCollector(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.directory = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.directory, "collector.sock")
+        self.log_file_path = os.path.join(self.directory, "shared.log")
+        self.pool = RecordingSinkPool()
+        self.server = None
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        if self.server is not None:
+            self.server.stop(timeout=1)
+        self.pool.close_all()
+        shutil.rmtree(self.directory)
+
+    def start_server(self):
+        self.server = CollectorServer(
+            self.socket_path, self.pool.write, [self.log_file_path]
+        )
+        self.server.start()
+
+    def configure(self, **collector):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"shared": self.log_file_path},
+                "collector": {"socket_path": self.socket_path, **collector},
+            }
+        )
+
+    def read(self):
+        self.log_konfig.close()
+        self.pool.flush_all()
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_records_are_written_by_the_collector(self):
+        self.start_server()
+        self.configure()
+        log_message("shared", "first")
+        log_message("shared", "second", log_level="INFO")
+        self.assertEqual(self.pool.writes, [])
+        self.log_konfig.flush()
+        self.assertTrue(self.pool.wait_for("Message: second", self.log_file_path))
+        self.assertTrue(self.log_konfig.get_collector().connected)
+        # Both records arrive in one frame and are written with one call.
+        self.assertEqual(len(self.pool.writes), 1)
+        log_content = self.read()
+        self.assertLess(log_content.index("first"), log_content.index("second"))
+
+    def test_error_records_are_sent_at_once(self):
+        self.start_server()
+        self.configure(flush_interval_ms=60000)
+        log_message("shared", "failure", log_level="ERROR")
+        self.assertTrue(self.pool.wait_for("Message: failure", self.log_file_path))
+        self.assertEqual(self.pool.writes[0][2], "ERROR")
+
+    def test_full_batches_are_sent(self):
+        self.start_server()
+        self.configure(batch_size=3, flush_interval_ms=60000)
+        for index in range(3):
+            log_message("shared", f"record {index}")
+        self.assertTrue(self.pool.wait_for("record 2", self.log_file_path))
+
+    def test_pending_records_are_sent_periodically(self):
+        self.start_server()
+        self.configure(flush_interval_ms=10)
+        log_message("shared", "eventually")
+        self.assertTrue(self.pool.wait_for("eventually", self.log_file_path))
+
+    def test_unreachable_collector_falls_back_to_the_file(self):
+        self.configure(max_backoff_seconds=0.01)
+        log_message("shared", "direct", log_level="ERROR")
+        collector = self.log_konfig.get_collector()
+        self.assertFalse(collector.connected)
+        self.assertIn("Message: direct", self.read())
+
+        self.start_server()
+        time.sleep(0.05)
+        log_message("shared", "collected", log_level="ERROR")
+        self.assertTrue(self.pool.wait_for("collected", self.log_file_path))
+        self.assertTrue(collector.connected)
+
+    def test_collector_restart_reconnects(self):
+        self.start_server()
+        self.configure(max_backoff_seconds=0.01)
+        log_message("shared", "before", log_level="ERROR")
+        self.assertTrue(self.pool.wait_for("before", self.log_file_path))
+        self.server.stop(timeout=0.1)
+        # The first write after the collector went away may still reach the closed
+        # socket; every record must end up in the file either way.
+        for index in range(3):
+            log_message("shared", f"during {index}", log_level="ERROR")
+            time.sleep(0.02)
+        self.start_server()
+        time.sleep(0.05)
+        log_message("shared", "after", log_level="ERROR")
+        self.assertTrue(self.pool.wait_for("after", self.log_file_path))
+        log_content = self.read()
+        for index in range(3):
+            self.assertIn(f"during {index}", log_content)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_worker_processes_never_interleave_records(self):
+        self.start_server()
+        self.configure()
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_log_from_worker, args=(worker, 100))
+            for worker in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(10)
+            self.assertEqual(worker.exitcode, 0)
+        for worker in range(4):
+            self.assertTrue(
+                self.pool.wait_for(f"worker {worker} record 99", self.log_file_path)
+            )
+        records = [record for record in self.read().split("\n\n") if record]
+        self.assertEqual(len(records), 400)
+        pattern = re.compile(
+            r"\[[^\]]+\] \[INFO\]\nMessage: worker (\d) record \d+\n"
+            r"lines: first\nsecond\nthird\nworker: \1"
+        )
+        for record in records:
+            self.assertRegex(record, pattern)
+
+    def test_server_replaces_stale_sockets_only(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()
+        self.start_server()
+        with self.assertRaises(OSError):
+            CollectorServer(self.socket_path, self.pool.write, []).start()
+        self.server.stop(timeout=1)
+        self.server = None
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_server_never_replaces_other_files(self):
+        with open(self.socket_path, "w") as other_file:
+            other_file.write("not a socket")
+        with self.assertRaises(OSError):
+            CollectorServer(self.socket_path, self.pool.write, []).start()
+        with open(self.socket_path, "r") as other_file:
+            self.assertEqual(other_file.read(), "not a socket")
+
+    def test_socket_is_private(self):
+        self.start_server()
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+
+    def test_records_for_unconfigured_paths_are_dropped(self):
+        self.start_server()
+        other_path = os.path.join(self.directory, "other.log")
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sender.connect(self.socket_path)
+        with sender:
+            sender.sendall(
+                encode_batch(
+                    [
+                        (other_path, "intruder\n", "INFO"),
+                        (self.log_file_path, "kept\n", "INFO"),
+                    ]
+                )
+            )
+            self.assertTrue(self.pool.wait_for("kept", self.log_file_path))
+        self.assertEqual([write[0] for write in self.pool.writes], [self.log_file_path])
+        self.assertFalse(os.path.exists(other_path))
+
+    def test_records_too_long_to_send_are_written_directly(self):
+        self.start_server()
+        local_pool = RecordingSinkPool()
+        client = CollectorClient(self.socket_path, local_pool)
+        try:
+            client.write(self.log_file_path, "local\n", "L" * (MAX_LEVEL_BYTES + 1))
+            client.flush()
+            self.assertTrue(local_pool.wait_for("local", self.log_file_path))
+            self.assertFalse(client.connected)
+        finally:
+            client.close()
+            local_pool.close_all()
+        self.assertEqual(self.pool.writes, [])
+
+    def test_invalid_options(self):
+        for options in ({}, {"socket_path": ""}, {"socket_path": "x", "size": 1}):
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    CollectorClient.from_config(SinkPool(), options)
+        with self.assertRaises(ValueError):
+            CollectorClient("x", SinkPool(), batch_size=0)
+
+    def test_collect_command(self):
+        args = build_parser().parse_args(["collect", "--socket", self.socket_path])
+        self.assertEqual(args.config, "logging_config.yaml")
+        self.assertEqual(args.socket, self.socket_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+# tests/test_config_cache.py
+
+import datetime
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import yaml
+from logkontrol.cache import config_signature, read_cached_config, write_cached_config
+from logkontrol.logkontrol import LogKonfig
+
+
+class TestConfigCache(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.directory = tempfile.mkdtemp()
+        self.config_file_path = os.path.join(self.directory, "logging_config.yaml")
+        self.cache_path = os.path.join(self.directory, "logging_config.cache")
+        self.config = {
+            "log_file_paths": {"test_log": os.path.join(self.directory, "test.log")},
+            "log_level": "INFO",
+        }
+        self.write_config(self.config)
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.directory)
+
+    def write_config(self, config):
+        with open(self.config_file_path, "w") as config_file:
+            yaml.dump(config, config_file)
+
+    def init_logging(self):
+        self.log_konfig.init_logging(
+            self.config_file_path, config_cache_path=self.cache_path
+        )
+
+    def test_warm_start_skips_yaml(self):
+        self.init_logging()
+        self.assertTrue(os.path.exists(self.cache_path))
+        # A new configuration in between stands in for a fresh process.
+        self.log_konfig.set_logging_config({"log_file_paths": {"other": "other.log"}})
+        with patch.object(LogKonfig, "load_logging_config") as load:
+            self.init_logging()
+        load.assert_not_called()
+        self.assertEqual(self.log_konfig.get_logging_config(), self.config)
+
+    def test_unchanged_file_keeps_running_config(self):
+        self.init_logging()
+        compiled = self.log_konfig.get_compiled_config()
+        self.init_logging()
+        self.assertIs(self.log_konfig.get_compiled_config(), compiled)
+
+    def test_changed_file_is_parsed_again(self):
+        self.init_logging()
+        changed = {**self.config, "log_level": "DEBUG"}
+        self.write_config(changed)
+        stat = os.stat(self.config_file_path)
+        os.utime(self.config_file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.init_logging()
+        self.assertEqual(self.log_konfig.get_logging_config(), changed)
+        self.assertEqual(
+            read_cached_config(self.cache_path, config_signature(self.config_file_path)),
+            changed,
+        )
+
+    def test_invalid_config_is_not_cached(self):
+        self.write_config({"log_file_paths": {"test_log": "test.log"}, "log_level": "LOUD"})
+        with self.assertRaises(ValueError):
+            self.init_logging()
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_damaged_cache_is_ignored(self):
+        with open(self.cache_path, "wb") as cache_file:
+            cache_file.write(b"not a cache")
+        self.init_logging()
+        self.assertEqual(self.log_konfig.get_logging_config(), self.config)
+        self.assertEqual(
+            read_cached_config(self.cache_path, config_signature(self.config_file_path)),
+            self.config,
+        )
+
+    @unittest.skipUnless(hasattr(os, "geteuid"), "needs POSIX file ownership")
+    def test_caches_other_users_could_change_are_ignored(self):
+        self.init_logging()
+        signature = config_signature(self.config_file_path)
+        self.assertEqual(os.stat(self.cache_path).st_mode & 0o777, 0o600)
+        self.assertEqual(read_cached_config(self.cache_path, signature), self.config)
+        os.chmod(self.cache_path, 0o666)
+        self.assertIsNone(read_cached_config(self.cache_path, signature))
+        os.chmod(self.cache_path, 0o600)
+        with patch("logkontrol.cache.os.geteuid", return_value=os.geteuid() + 1):
+            self.assertIsNone(read_cached_config(self.cache_path, signature))
+
+    def test_values_marshal_cannot_store_are_not_cached(self):
+        signature = config_signature(self.config_file_path)
+        config = {**self.config, "since": datetime.date(2024, 5, 1)}
+        self.assertFalse(write_cached_config(self.cache_path, signature, config))
+        self.assertIsNone(read_cached_config(self.cache_path, signature))
+
+    def test_import_defers_heavy_modules(self):
+        code = (
+            "import sys, logkontrol; "
+            "print(' '.join(m for m in ('yaml', 'json', 'asyncio', 'inspect', "
+            "'datetime', 'random', 'mmap', 'struct') "
+            "if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+# tests/test_config_reload.py
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+import yaml
+from logkontrol.logkontrol import LogKonfig, log_message
+from logkontrol.watcher import ConfigWatcher
+
+
+class TestConfigReload(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.config_file_path = os.path.join(self.log_directory, "logging_config.yaml")
+        self.first_path = os.path.join(self.log_directory, "first.log")
+        self.second_path = os.path.join(self.log_directory, "second.log")
+
+    def tearDown(self):
+        self.log_konfig.stop_watching()
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def write_config(self, config):
+        with open(self.config_file_path, "w") as config_file:
+            yaml.dump(config, config_file)
+        # Make every rewrite visible even on file systems with coarse timestamps.
+        stat = os.stat(self.config_file_path)
+        os.utime(self.config_file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def config(self, log_level="INFO", **options):
+        return {
+            "log_file_paths": {"test_log": self.first_path},
+            "log_level": log_level,
+            **options,
+        }
+
+    def watcher(self):
+        return ConfigWatcher(
+            self.config_file_path,
+            self.log_konfig.load_logging_config,
+            self.log_konfig.set_logging_config,
+        )
+
+    def read(self, path):
+        self.log_konfig.close()
+        with open(path, "r") as log_file:
+            return log_file.read()
+
+    def test_changed_file_is_applied(self):
+        self.write_config(self.config())
+        self.log_konfig.set_logging_config(self.config())
+        watcher = self.watcher()
+        self.assertFalse(watcher.check())
+        log_message("test_log", "hidden debug")
+        self.write_config(self.config("DEBUG"))
+        self.assertTrue(watcher.check())
+        self.assertFalse(watcher.check())
+        log_message("test_log", "visible debug")
+        content = self.read(self.first_path)
+        self.assertNotIn("hidden debug", content)
+        self.assertIn("visible debug", content)
+
+    def test_invalid_file_keeps_current_config(self):
+        self.write_config(self.config())
+        self.log_konfig.set_logging_config(self.config())
+        compiled = self.log_konfig.get_compiled_config()
+        watcher = self.watcher()
+        invalid_configs = [
+            self.config("LOUD"),
+            ["not", "a", "mapping"],
+            {"log_level": "DEBUG"},
+            self.config(max_open_files=0),
+            self.config(max_open_files="8"),
+        ]
+        for section in (
+            "log_levels",
+            "buffering",
+            "rotation",
+            "log_file_formats",
+            "coalescing",
+            "flight_recorder",
+        ):
+            invalid_configs.append(self.config(**{section: [1]}))
+        for invalid in invalid_configs:
+            with self.subTest(config=invalid):
+                self.write_config(invalid)
+                with patch("builtins.print") as mock_print:
+                    self.assertFalse(watcher.check())
+                self.assertIn(
+                    "Ignoring invalid logging configuration", mock_print.call_args[0][0]
+                )
+                self.assertIs(self.log_konfig.get_compiled_config(), compiled)
+        with open(self.config_file_path, "w") as config_file:
+            config_file.write("log_file_paths: [unclosed")
+        os.utime(self.config_file_path, ns=(0, 10**9))
+        with patch("builtins.print"):
+            self.assertFalse(watcher.check())
+        self.assertIs(self.log_konfig.get_compiled_config(), compiled)
+
+    def test_invalid_config_leaves_logging_untouched(self):
+        self.log_konfig.set_logging_config(self.config())
+        log_message("test_log", "before", log_level="INFO")
+        self.assertEqual(self.log_konfig.get_sink_pool().open_count(), 1)
+        with self.assertRaises(ValueError):
+            self.log_konfig.set_logging_config(self.config(log_levels={"unknown": "INFO"}))
+        self.assertEqual(self.log_konfig.get_sink_pool().open_count(), 1)
+        self.assertEqual(self.log_konfig.get_logging_config(), self.config())
+
+    def test_handles_of_removed_keys_are_closed(self):
+        config = self.config(
+            log_file_paths={"test_log": self.first_path, "other": self.second_path}
+        )
+        self.log_konfig.set_logging_config(config)
+        log_message("test_log", "first", log_level="INFO")
+        log_message("other", "second", log_level="INFO")
+        self.assertEqual(self.log_konfig.get_sink_pool().open_count(), 2)
+        self.log_konfig.set_logging_config(self.config())
+        self.assertEqual(self.log_konfig.get_sink_pool().open_count(), 0)
+        log_message("test_log", "first again", log_level="INFO")
+        self.assertEqual(self.log_konfig.get_sink_pool().open_count(), 1)
+        self.assertIn("Message: second", self.read(self.second_path))
+
+    def test_watcher_thread_reloads_config(self):
+        self.write_config(self.config())
+        self.log_konfig.init_logging(self.config_file_path, watch_interval=0.01)
+        self.assertTrue(self.log_konfig._config_watcher.running)
+        self.write_config(self.config("ERROR"))
+        deadline = time.monotonic() + 5
+        while self.log_konfig.get_logging_config()["log_level"] != "ERROR":
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.log_konfig.stop_watching()
+        self.assertIsNone(self.log_konfig._config_watcher)
+
+    def test_watcher_thread_survives_failed_reloads(self):
+        self.write_config(self.config())
+        self.log_konfig.init_logging(self.config_file_path, watch_interval=0.01)
+        watcher = self.log_konfig._config_watcher
+        failures = []
+
+        def fail_once(config):
+            failures.append(config)
+            raise AttributeError("unexpected")
+
+        with patch.object(watcher, "_apply", fail_once), patch("builtins.print"):
+            self.write_config(self.config("WARNING"))
+            deadline = time.monotonic() + 5
+            while not failures:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+        self.assertTrue(watcher.running)
+        self.write_config(self.config("ERROR"))
+        while self.log_konfig.get_logging_config()["log_level"] != "ERROR":
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_log_calls_never_see_a_half_applied_config(self):
+        text_config = self.config()
+        json_config = self.config(
+            log_file_paths={"test_log": self.second_path},
+            log_file_formats={"test_log": "jsonl"},
+        )
+        self.log_konfig.set_logging_config(text_config)
+        stop = threading.Event()
+        errors = []
+
+        def log_until_stopped():
+            try:
+                while not stop.is_set():
+                    log_message("test_log", "record", {"value": 1}, log_level="INFO")
+            except Exception as error:  # pragma: no cover - reported below
+                errors.append(error)
+
+        threads = [threading.Thread(target=log_until_stopped) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for index in range(40):
+            self.log_konfig.set_logging_config(json_config if index % 2 else text_config)
+            time.sleep(0.002)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        text = self.read(self.first_path)
+        self.assertNotIn('"level"', text)
+        for line in self.read(self.second_path).splitlines():
+            self.assertEqual(json.loads(line)["message"], "record")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+# tests/test_console_output.py
+
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from logkontrol.aio import aflush, alog_message
+from logkontrol.formatting import RecordFormatter
+from logkontrol.logkontrol import (
+    LogKonfig,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+)
+
+
+class CountingBuffer(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+def make_stdout():
+    buffer = CountingBuffer()
+    return io.TextIOWrapper(buffer, encoding="utf-8", write_through=False), buffer
+
+
+class TestConsoleOutput(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+        self.stdout, self.buffer = make_stdout()
+        redirect = contextlib.redirect_stdout(self.stdout)
+        redirect.__enter__()
+        self.addCleanup(redirect.__exit__, None, None, None)
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def set_config(self, **options):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": self.log_file_path}, **options}
+        )
+
+    def console(self):
+        return self.buffer.getvalue().decode("utf-8")
+
+    def read(self):
+        self.log_konfig.close()
+        if not os.path.exists(self.log_file_path):
+            return ""
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_records_are_written_in_batches(self):
+        self.set_config(console_output=True)
+        for index in range(20):
+            log_message("test_log", f"record {index}", log_level="INFO")
+        self.assertEqual(self.buffer.writes, 0)
+        self.log_konfig.flush()
+        self.assertEqual(self.buffer.writes, 1)
+        self.assertEqual(self.console().count("Message: record"), 20)
+        self.assertEqual(self.read(), "")
+
+    def test_console_shows_the_file_entry(self):
+        self.set_config()
+        log_message("test_log", "same", {"count": 1}, log_level="INFO")
+        file_entry = self.read()
+        self.set_config(console_output=True)
+        log_message("test_log", "same", {"count": 1}, log_level="INFO")
+        self.log_konfig.flush()
+        self.assertEqual(self.console(), file_entry)
+
+    def test_flush_interval(self):
+        self.set_config(console_output=True, console_buffering={"flush_interval_ms": 20})
+        log_message("test_log", "eventually", log_level="INFO")
+        deadline = time.monotonic() + 2
+        while "eventually" not in self.console() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn("Message: eventually", self.console())
+
+    def test_errors_are_written_at_once(self):
+        self.set_config(console_output=True)
+        log_message("test_log", "pending", log_level="INFO")
+        log_message("test_log", "failed", log_level="ERROR")
+        self.assertEqual(self.buffer.writes, 1)
+        self.assertIn("Message: failed", self.console())
+
+    def test_unbuffered_console(self):
+        self.set_config(console_output=True, console_buffering=False)
+        log_message("test_log", "first", log_level="INFO")
+        log_message("test_log", "second", log_level="INFO")
+        self.assertEqual(self.buffer.writes, 2)
+
+    def test_printed_text_comes_first(self):
+        self.set_config(console_output=True)
+        print("printed before")
+        log_message("test_log", "logged after", log_level="ERROR")
+        console = self.console()
+        self.assertLess(console.index("printed before"), console.index("logged after"))
+
+    def test_tee_writes_file_and_console(self):
+        self.set_config(console_output="tee")
+        with patch.object(
+            RecordFormatter,
+            "format_message",
+            autospec=True,
+            side_effect=RecordFormatter.format_message,
+        ) as format_message:
+            log_message("test_log", "both", log_level="INFO")
+        format_message.assert_called_once()
+        log_variable("test_log", "value", 42, log_level="INFO")
+        log_function_call("test_log", "handler", log_level="INFO", arg=1)
+        log_json_content("test_log", {"key": "value"}, log_level="INFO")
+        log_json_content("test_log", [{"id": 1}, {"id": 2}], log_level="INFO")
+        log_content = self.read()
+        self.assertEqual(self.console(), log_content)
+        for expected in ("Message: both", "value: 42", "Function Call: handler", '"id": 2'):
+            self.assertIn(expected, log_content)
+
+    def test_tee_skips_binary_files(self):
+        self.set_config(console_output="tee", log_file_formats={"test_log": "binary"})
+        log_message("test_log", "binary", log_level="INFO")
+        self.log_konfig.flush()
+        self.assertEqual(self.console(), "")
+
+    def test_json_content_follows_console_output(self):
+        self.set_config(console_output=True)
+        log_json_content("test_log", {"key": "value"}, log_level="INFO")
+        log_json_content("test_log", iter([{"id": 1}]), log_level="INFO")
+        self.log_konfig.flush()
+        self.assertIn('"key": "value"', self.console())
+        self.assertIn('"id": 1', self.console())
+        self.assertEqual(self.read(), "")
+
+    def test_background_writer(self):
+        self.set_config(console_output="tee", background_writer={"queue_size": 10})
+        for index in range(5):
+            log_message("test_log", f"record {index}", log_level="INFO")
+        self.log_konfig.shutdown()
+        self.assertEqual(self.console().count("Message: record"), 5)
+        self.assertEqual(self.read().count("Message: record"), 5)
+
+    def test_async_records(self):
+        self.set_config(console_output=True)
+
+        async def log_records():
+            await alog_message("test_log", "from a coroutine", log_level="INFO")
+            await aflush()
+
+        asyncio.run(log_records())
+        self.assertIn("Message: from a coroutine", self.console())
+        self.assertEqual(self.read(), "")
+
+    def test_invalid_console_buffering(self):
+        with self.assertRaises(ValueError):
+            self.set_config(console_output=True, console_buffering={"flush_bytes": -1})
+
+
+if __name__ == "__main__":
+    unittest.main()
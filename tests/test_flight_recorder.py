@@ -0,0 +1,242 @@
+# tests/test_flight_recorder.py
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from logkontrol import LogKontrolHandler, dump_flight_recorder, lazy, log_calls
+from logkontrol.aio import aflush, alog_message
+from logkontrol.logkontrol import (
+    LogKonfig,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+)
+from logkontrol import recorder
+from logkontrol.recorder import FlightRecorder
+
+
+class TestFlightRecorder(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+        self.set_config()
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def set_config(self, recorder=True, **options):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": self.log_file_path},
+                "log_level": "INFO",
+                "timestamp_format": "%H:%M:%S.%f",
+                "flight_recorder": {"test_log": recorder},
+                **options,
+            }
+        )
+
+    def read(self):
+        self.log_konfig.close()
+        if not os.path.exists(self.log_file_path):
+            return ""
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_filtered_records_are_written_before_an_error(self):
+        log_message("test_log", "context", {"step": 1})
+        log_message("test_log", "written", log_level="INFO")
+        self.assertNotIn("context", self.read())
+        log_message("test_log", "failed", log_level="ERROR")
+        log_content = self.read()
+        header = log_content.index("Message: Flight recorder: 1 earlier records")
+        self.assertIn("trigger: ERROR record", log_content)
+        context = log_content.index("Message: context\nstep: 1")
+        self.assertLess(log_content.index("Message: written"), header)
+        self.assertLess(header, context)
+        self.assertLess(context, log_content.index("Message: failed"))
+
+    def test_records_keep_the_time_they_were_logged(self):
+        log_message("test_log", "context")
+        log_message("test_log", "failed", log_level="ERROR")
+        stamps = [
+            line.split("]")[0].strip("[")
+            for line in self.read().splitlines()
+            if line.startswith("[")
+        ]
+        self.assertEqual(len(stamps), 3)
+        self.assertLess(stamps[1], stamps[0])
+
+    def test_capacity_bounds_the_records(self):
+        self.set_config({"capacity": 5})
+        for index in range(20):
+            log_message("test_log", f"record {index}")
+        self.assertEqual(dump_flight_recorder(), 5)
+        log_content = self.read()
+        self.assertNotIn("record 14\n", log_content)
+        for index in range(15, 20):
+            self.assertIn(f"record {index}\n", log_content)
+        self.assertEqual(dump_flight_recorder(), 0)
+
+    def test_raw_records_are_formatted_when_dumped(self):
+        calls = []
+        log_message("test_log", lambda: calls.append("message") or "deferred")
+        log_variable("test_log", "value", lazy(lambda: calls.append("value") or 42))
+        self.assertEqual(calls, [])
+        dump_flight_recorder("test_log")
+        self.assertEqual(calls, ["message", "value"])
+        log_content = self.read()
+        self.assertIn("Message: deferred", log_content)
+        self.assertIn("value: 42", log_content)
+
+    def test_formatted_records_capture_values(self):
+        self.set_config({"mode": "formatted"})
+        items = [1]
+        log_variable("test_log", "items", items)
+        items.append(2)
+        dump_flight_recorder()
+        self.assertIn("items: [1]\n", self.read())
+
+    def test_recorded_level(self):
+        self.set_config({"level": "debug"}, log_level="WARNING")
+        self.assertTrue(self.log_konfig.get_compiled_config().is_level_recorded("test_log", "INFO"))
+        self.set_config({"level": "INFO"}, log_level="WARNING")
+        log_message("test_log", "skipped")
+        log_message("test_log", "kept", log_level="INFO")
+        self.assertEqual(dump_flight_recorder(), 1)
+        self.assertNotIn("skipped", self.read())
+
+    def test_every_record_type_is_kept(self):
+        log_function_call("test_log", "handler", arg=1)
+        log_json_content("test_log", {"key": "value"})
+        log_json_content("test_log", (item for item in [{"id": 1}, {"id": 2}]))
+        self.assertEqual(dump_flight_recorder(), 3)
+        log_content = self.read()
+        self.assertIn("Function Call: handler()\n  arg: 1", log_content)
+        self.assertIn('"key": "value"', log_content)
+        self.assertIn('"id": 2', log_content)
+
+    def test_recorded_iterators_are_read_up_to_max_items(self):
+        items = itertools.count()
+        log_json_content("test_log", items, max_items=3, log_level="DEBUG")
+        self.assertEqual(next(items), 4)
+        dump_flight_recorder()
+        log_content = self.read()
+        self.assertIn("0\n1\n2\n... more items omitted\n", log_content)
+        self.assertNotIn("\n3\n", log_content)
+
+    def test_decorated_calls_are_kept(self):
+        @log_calls("test_log")
+        def add(a, b):
+            return a + b
+
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual(dump_flight_recorder(), 1)
+        self.assertIn("return: 3", self.read())
+
+    def test_stdlib_records_are_kept(self):
+        logger = logging.getLogger(f"logkontrol.tests.{self.id()}")
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        handler = LogKontrolHandler("test_log")
+        logger.addHandler(handler)
+        try:
+            logger.debug("stdlib %s", "context")
+            logger.error("stdlib failure")
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+        log_content = self.read()
+        self.assertIn("Message: stdlib context", log_content)
+        self.assertLess(
+            log_content.index("stdlib context"), log_content.index("stdlib failure")
+        )
+
+    def test_async_records_are_kept(self):
+        async def log_records():
+            await alog_message("test_log", "async context")
+            await alog_message("test_log", "async failure", log_level="ERROR")
+            await aflush()
+
+        asyncio.run(log_records())
+        log_content = self.read()
+        self.assertLess(
+            log_content.index("async context"), log_content.index("async failure")
+        )
+
+    def install_hooks(self):
+        # Installs the hooks again, in front of stand-ins for the previous hooks.
+        self.previous_hooks = []
+        stack = contextlib.ExitStack()
+        stack.enter_context(patch.object(recorder, "_excepthooks_installed", False))
+        stack.enter_context(
+            patch.object(sys, "excepthook", lambda *args: self.previous_hooks.append(args))
+        )
+        stack.enter_context(
+            patch.object(threading, "excepthook", self.previous_hooks.append)
+        )
+        self.addCleanup(stack.close)
+        self.set_config()
+
+    def test_unhandled_exceptions_dump_the_recorder(self):
+        self.install_hooks()
+        log_message("test_log", "before the crash")
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError as error:
+            sys.excepthook(type(error), error, error.__traceback__)
+        self.assertEqual(len(self.previous_hooks), 1)
+        log_content = self.read()
+        self.assertIn("trigger: unhandled exception", log_content)
+        self.assertIn("exception: RuntimeError: boom", log_content)
+        self.assertIn("Message: before the crash", log_content)
+
+    def test_unhandled_thread_exceptions_dump_the_recorder(self):
+        self.install_hooks()
+
+        def fail():
+            log_message("test_log", "in the thread")
+            raise ValueError("thread failure")
+
+        thread = threading.Thread(target=fail)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(self.previous_hooks), 1)
+        log_content = self.read()
+        self.assertIn("exception: ValueError: thread failure", log_content)
+        self.assertIn("Message: in the thread", log_content)
+
+    def test_invalid_options(self):
+        for enabled in ({"capacity": 0}, {"mode": "eager"}, {"level": "LOUD"}, {"size": 1}):
+            with self.subTest(recorder=enabled):
+                with self.assertRaises(ValueError):
+                    self.set_config(enabled)
+        with self.assertRaises(ValueError):
+            self.set_config({"mode": "formatted"}, log_file_formats={"test_log": "binary"})
+        with self.assertRaises(ValueError):
+            self.log_konfig.set_logging_config(
+                {"log_file_paths": {"test_log": "x"}, "flight_recorder": {"other": True}}
+            )
+
+    def test_drain_keeps_order(self):
+        recorder = FlightRecorder(capacity=3)
+        for index in range(4):
+            recorder.record("DEBUG", "message", index, None)
+        self.assertEqual([record[3] for record in recorder.drain()], [1, 2, 3])
+        self.assertEqual(len(recorder), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_formatting.py
+
+import os
+import re
+import unittest
+from unittest.mock import patch
+from logkontrol.logkontrol import LogKonfig, log_function_call, log_message
+from logkontrol.formatting import RecordFormatter, TimestampCache, compile_log_format
+
+
+class TestRecordFormatter(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_file_key = "test_log"
+        self.log_file_path = "test_log.log"
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        if os.path.exists(self.log_file_path):
+            os.remove(self.log_file_path)
+
+    def read_log(self):
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_default_format_matches_existing_entries(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        log_message(self.log_file_key, "hello", {"x": 1}, log_level="INFO")
+        self.assertRegex(
+            self.read_log(),
+            r"^\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] \[INFO\]\nMessage: hello\nx: 1\n\n$",
+        )
+
+    def test_configured_formats_are_used(self):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": "test_log.log"},
+                "log_format": "{level:<5}|{timestamp}| {message}",
+                "timestamp_format": "%H:%M",
+            }
+        )
+        log_message(self.log_file_key, "hello", log_level="INFO")
+        self.assertRegex(self.read_log(), r"^INFO \|\d{2}:\d{2}\| Message: hello\n\n$")
+
+    def test_literal_braces_are_preserved(self):
+        formatter = RecordFormatter("{{{level}}} {message}", "%Y")
+        self.assertEqual(formatter.render("INFO", "body"), "{INFO} body\n")
+
+    def test_unknown_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            compile_log_format("[{timestamp}] {thread}")
+        with self.assertRaises(ValueError):
+            self.log_konfig.set_logging_config(
+                {"log_file_paths": {"test_log": "test_log.log"}, "log_format": "{oops"}
+            )
+
+    def test_timestamp_is_cached_per_second(self):
+        cache = TimestampCache("%S")
+        with patch("logkontrol.formatting.time.time", return_value=1000.1), patch(
+            "datetime.datetime"
+        ) as mock_datetime:
+            mock_datetime.fromtimestamp.return_value.strftime.return_value = "40"
+            self.assertEqual(cache.now(), "40")
+            self.assertEqual(cache.now(), "40")
+        self.assertEqual(mock_datetime.fromtimestamp.call_count, 1)
+
+    def test_sub_second_timestamps_are_not_cached(self):
+        cache = TimestampCache("%S.%f")
+        self.assertRegex(cache.now(), r"^\d{2}\.\d{6}$")
+        self.assertFalse(cache._cacheable)
+
+    def test_many_arguments_are_formatted(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        kwargs = {f"arg{index}": index for index in range(200)}
+        log_function_call(self.log_file_key, "wide", **kwargs)
+        log_content = self.read_log()
+        self.assertEqual(len(re.findall(r"^  arg\d+: \d+$", log_content, re.M)), 200)
@@ -0,0 +1,109 @@
+# tests/test_json_streaming.py
+
+import itertools
+import json
+import os
+import re
+import unittest
+from unittest.mock import patch
+from logkontrol.logkontrol import LogKonfig, log_json_content, log_message
+from logkontrol.sinks import FileSink
+
+
+class TestJsonStreaming(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        self.log_file_key = "test_log"
+        self.log_file_path = "test_log.log"
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        if os.path.exists(self.log_file_path):
+            os.remove(self.log_file_path)
+
+    def read_log(self):
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_generator_items_are_logged(self):
+        log_json_content(self.log_file_key, ({"item": index} for index in range(3)))
+        log_content = self.read_log()
+        self.assertIn("JSON Content:\n", log_content)
+        for index in range(3):
+            self.assertIn(f'"item": {index}', log_content)
+        self.assertTrue(log_content.endswith("}\n\n"))
+
+    def test_stream_matches_list_output(self):
+        items = [{"item": index} for index in range(5)] + ["plain"]
+        log_json_content(self.log_file_key, items)
+        log_json_content(self.log_file_key, iter(items))
+        _, first, second = re.split(r"^\[.*\] \[DEBUG\]\n", self.read_log(), flags=re.M)
+        self.assertEqual(first, second)
+
+    def test_large_payload_is_written_in_chunks(self):
+        writes = []
+        original_write = FileSink._write_locked
+
+        def recording_write(sink, data, **kwargs):
+            writes.append(len(data))
+            original_write(sink, data, **kwargs)
+
+        items = ({"item": index, "padding": "x" * 100} for index in range(5000))
+        with patch.object(FileSink, "_write_locked", recording_write):
+            log_json_content(self.log_file_key, items)
+        self.assertGreater(len(writes), 1)
+        self.assertLess(max(writes), 2 * 65536)
+        self.assertEqual(self.read_log().count('"padding"'), 5000)
+
+    def test_max_items_on_list_records_omitted_count(self):
+        log_json_content(
+            self.log_file_key, [{"item": index} for index in range(10)], max_items=3
+        )
+        log_content = self.read_log()
+        self.assertIn('"item": 2', log_content)
+        self.assertNotIn('"item": 3', log_content)
+        self.assertIn("... 7 more items omitted\n", log_content)
+
+    def test_max_items_stops_infinite_generator(self):
+        log_json_content(
+            self.log_file_key, ({"item": index} for index in itertools.count()), max_items=2
+        )
+        log_content = self.read_log()
+        self.assertIn('"item": 1', log_content)
+        self.assertIn("... more items omitted\n", log_content)
+
+    def test_jsonl_stream(self):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": "test_log.log"},
+                "log_file_formats": {"test_log": "jsonl"},
+            }
+        )
+        log_json_content(self.log_file_key, (index for index in range(5)), max_items=10)
+        log_json_content(self.log_file_key, list(range(5)), max_items=2)
+        first, second = [json.loads(line) for line in self.read_log().splitlines()]
+        self.assertEqual(first["json"], [0, 1, 2, 3, 4])
+        self.assertNotIn("truncated", first)
+        self.assertEqual(second["json"], [0, 1])
+        self.assertEqual(second["omitted"], 3)
+        self.assertTrue(second["truncated"])
+
+    def test_stream_keeps_order_with_background_writer(self):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": "test_log.log"},
+                "background_writer": {"queue_size": 100},
+            }
+        )
+        log_message(self.log_file_key, "before")
+        log_json_content(self.log_file_key, iter([{"item": 1}]))
+        log_message(self.log_file_key, "after")
+        self.log_konfig.shutdown(timeout=5)
+        log_content = self.read_log()
+        self.assertLess(log_content.index("before"), log_content.index('"item"'))
+        self.assertLess(log_content.index('"item"'), log_content.index("after"))
@@ -0,0 +1,88 @@
+# tests/test_jsonl_format.py
+
+import json
+import os
+import unittest
+from unittest.mock import patch
+from logkontrol.logkontrol import (
+    LogKonfig,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+)
+from logkontrol import formatting
+
+
+class TestJsonLinesFormat(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": "test_log.log", "text_log": "text_log.log"},
+                "log_file_formats": {"test_log": "jsonl", "text_log": "text"},
+            }
+        )
+        self.log_file_key = "test_log"
+        self.log_file_paths = ["test_log.log", "text_log.log"]
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        for path in self.log_file_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def read_records(self):
+        with open("test_log.log", "r") as log_file:
+            return [json.loads(line) for line in log_file]
+
+    def test_each_function_writes_one_object_per_line(self):
+        log_message(self.log_file_key, "hello", {"count": 3}, log_level="INFO")
+        log_variable(self.log_file_key, "ratio", 0.5)
+        log_function_call(self.log_file_key, "handler", arg1="value1", arg2=2)
+        log_json_content(self.log_file_key, [{"item": 1}, {"item": 2}])
+        message, variable, function_call, json_content = self.read_records()
+        self.assertEqual(message["level"], "INFO")
+        self.assertEqual(message["key"], "test_log")
+        self.assertEqual(message["message"], "hello")
+        self.assertEqual(message["variables"], {"count": 3})
+        self.assertIn("timestamp", message)
+        self.assertEqual(variable["variables"], {"ratio": 0.5})
+        self.assertNotIn("message", variable)
+        self.assertEqual(function_call["function"], "handler")
+        self.assertEqual(function_call["args"], {"arg1": "value1", "arg2": 2})
+        self.assertEqual(json_content["json"], [{"item": 1}, {"item": 2}])
+
+    def test_non_serializable_values_use_str(self):
+        log_variable(self.log_file_key, "value", object)
+        log_variable(self.log_file_key, "big", 2**70)
+        first, second = self.read_records()
+        self.assertEqual(first["variables"]["value"], str(object))
+        self.assertEqual(second["variables"]["big"], 2**70)
+
+    def test_truncated_values_are_shortened(self):
+        log_variable(self.log_file_key, "long", "x" * 1000, log_level="TRUNCATED")
+        (record,) = self.read_records()
+        self.assertEqual(record["variables"]["long"], "x" * 500 + "...")
+
+    def test_stdlib_fallback_without_orjson(self):
+        with patch.object(formatting, "orjson", None):
+            log_message(self.log_file_key, "stdlib", {"é": [1, 2]})
+        (record,) = self.read_records()
+        self.assertEqual(record["variables"], {"é": [1, 2]})
+
+    def test_text_keys_are_unchanged(self):
+        log_message("text_log", "plain")
+        with open("text_log.log", "r") as log_file:
+            self.assertIn("Message: plain\n", log_file.read())
+
+    def test_invalid_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.log_konfig.set_logging_config(
+                {
+                    "log_file_paths": {"test_log": "test_log.log"},
+                    "log_file_formats": {"test_log": "xml"},
+                }
+            )
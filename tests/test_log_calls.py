@@ -0,0 +1,146 @@
+# tests/test_log_calls.py
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from logkontrol import log_calls
+from logkontrol.aio import aflush
+from logkontrol.logkontrol import LogKonfig
+
+
+class TestLogCalls(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+        self.set_config()
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def set_config(self, **options):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": self.log_file_path}, **options}
+        )
+
+    def read(self):
+        self.log_konfig.close()
+        if not os.path.exists(self.log_file_path):
+            return ""
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_logs_bound_arguments_and_return_value(self):
+        @log_calls("test_log", log_level="INFO")
+        def add(first, second=10, *rest, scale=1):
+            return (first + second + sum(rest)) * scale
+
+        self.assertEqual(add(1, 2, 3, scale=2), 12)
+        self.assertEqual(add.__name__, "add")
+        log_content = self.read()
+        self.assertIn("[INFO]", log_content)
+        self.assertIn(f"Function Call: {add.__qualname__}()", log_content)
+        for line in ["  first: 1", "  second: 2", "  rest: (3,)", "  scale: 2", "  return: 12"]:
+            self.assertIn(line, log_content)
+        self.assertRegex(log_content, r"  wall time: \d+\.\d{3} ms\n  cpu time: \d+\.\d{3} ms")
+
+    def test_defaults_are_logged(self):
+        @log_calls("test_log")
+        def greet(name, greeting="hello"):
+            return f"{greeting} {name}"
+
+        greet("world")
+        self.assertIn("  greeting: hello", self.read())
+
+    def test_logs_and_reraises_exceptions(self):
+        @log_calls
+        def fail(value):
+            raise ValueError(f"bad value {value}")
+
+        with self.assertRaises(ValueError):
+            fail(3)
+        log_content = self.read()
+        self.assertIn("  value: 3", log_content)
+        self.assertIn("  raise: bad value 3", log_content)
+        self.assertNotIn("  return:", log_content)
+
+    def test_signature_is_looked_up_once(self):
+        @log_calls("test_log")
+        def double(value):
+            return value * 2
+
+        with patch("inspect.signature", wraps=__import__("inspect").signature) as signature:
+            for value in range(3):
+                double(value)
+        self.assertEqual(signature.call_count, 1)
+
+    def test_filtered_level_skips_binding(self):
+        self.set_config(log_level="INFO")
+
+        @log_calls("test_log")
+        def double(value):
+            return value * 2
+
+        with patch("inspect.signature") as signature:
+            self.assertEqual(double(4), 8)
+        signature.assert_not_called()
+        self.assertNotIn("Function Call", self.read())
+
+    def test_follows_config_changes(self):
+        @log_calls("test_log")
+        def double(value):
+            return value * 2
+
+        self.set_config(log_level="INFO")
+        double(1)
+        self.set_config(log_level="DEBUG")
+        double(2)
+        log_content = self.read()
+        self.assertNotIn("  value: 1", log_content)
+        self.assertIn("  value: 2", log_content)
+
+    def test_without_logging_config(self):
+        self.log_konfig.set_logging_config(None)  # type: ignore
+
+        @log_calls("test_log")
+        def double(value):
+            return value * 2
+
+        with patch("builtins.print") as mock_print:
+            self.assertEqual(double(2), 4)
+            self.assertEqual(double(3), 6)
+        mock_print.assert_called_once_with(
+            "Logging configuration is not initialized. Please call init_logging() first."
+        )
+
+    def test_coroutine_functions(self):
+        @log_calls("test_log")
+        async def fetch(url, timeout=5):
+            await asyncio.sleep(0)
+            if url is None:
+                raise KeyError("url")
+            return f"body of {url}"
+
+        async def main():
+            self.assertEqual(await fetch("http://example.com"), "body of http://example.com")
+            with self.assertRaises(KeyError):
+                await fetch(None)
+            await aflush()
+
+        self.assertTrue(asyncio.iscoroutinefunction(fetch))
+        asyncio.run(main())
+        log_content = self.read()
+        self.assertIn("  url: http://example.com", log_content)
+        self.assertIn("  timeout: 5", log_content)
+        self.assertIn("  return: body of http://example.com", log_content)
+        self.assertIn("  raise: 'url'", log_content)
+
+
+if __name__ == "__main__":
+    unittest.main()
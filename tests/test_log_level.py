@@ -0,0 +1,104 @@
+# tests/test_log_level.py
+
+import os
+import unittest
+from unittest.mock import MagicMock
+from logkontrol.logkontrol import (
+    LogKonfig,
+    lazy,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+)
+
+
+class TestLogLevel(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": "test_log.log", "verbose": "verbose.log"},
+                "log_level": "INFO",
+                "log_levels": {"verbose": "DEBUG"},
+            }
+        )
+        self.log_file_key = "test_log"
+        self.log_file_paths = ["test_log.log", "verbose.log"]
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        for path in self.log_file_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def read_log(self, path="test_log.log"):
+        if not os.path.exists(path):
+            return ""
+        with open(path, "r") as log_file:
+            return log_file.read()
+
+    def test_records_below_global_threshold_are_dropped(self):
+        log_message(self.log_file_key, "debug message", log_level="DEBUG")
+        log_variable(self.log_file_key, "debug_variable", 1)
+        log_function_call(self.log_file_key, "debug_function", arg=1)
+        log_json_content(self.log_file_key, {"debug": True})
+        log_message(self.log_file_key, "truncated", log_level="TRUNCATED")
+        self.assertEqual(self.read_log(), "")
+
+    def test_records_at_or_above_threshold_are_written(self):
+        log_message(self.log_file_key, "info message", log_level="INFO")
+        log_message(self.log_file_key, "error message", log_level="ERROR")
+        log_content = self.read_log()
+        self.assertIn("Message: info message", log_content)
+        self.assertIn("Message: error message", log_content)
+
+    def test_per_key_threshold_overrides_global(self):
+        log_message("verbose", "debug message", log_level="DEBUG")
+        self.assertIn("Message: debug message", self.read_log("verbose.log"))
+
+    def test_unknown_levels_are_not_filtered(self):
+        log_message(self.log_file_key, "custom", log_level="AUDIT")
+        self.assertIn("[AUDIT]", self.read_log())
+
+    def test_suppressed_lazy_values_are_never_computed(self):
+        expensive = MagicMock(return_value="expensive")
+        log_message(self.log_file_key, expensive, {"value": lazy(expensive)})
+        log_variable(self.log_file_key, "value", lazy(expensive))
+        log_function_call(self.log_file_key, "function", arg=lazy(expensive))
+        expensive.assert_not_called()
+
+    def test_written_lazy_values_are_computed(self):
+        log_message(
+            self.log_file_key,
+            lambda: "computed message",
+            {"value": lazy(lambda: 42)},
+            log_level="INFO",
+        )
+        log_variable(self.log_file_key, "lazy_variable", lazy(lambda: "x" * 3), "INFO")
+        log_content = self.read_log()
+        self.assertIn("Message: computed message", log_content)
+        self.assertIn("value: 42", log_content)
+        self.assertIn("lazy_variable: xxx", log_content)
+
+    def test_invalid_level_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.log_konfig.set_logging_config(
+                {"log_file_paths": {"test_log": "test_log.log"}, "log_level": "LOUD"}
+            )
+        with self.assertRaises(ValueError):
+            self.log_konfig.set_logging_config(
+                {
+                    "log_file_paths": {"test_log": "test_log.log"},
+                    "log_levels": {"missing": "DEBUG"},
+                }
+            )
+
+    def test_no_threshold_writes_everything(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        log_message(self.log_file_key, "debug message")
+        self.assertIn("Message: debug message", self.read_log())
@@ -0,0 +1,105 @@
+# tests/test_logger.py
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from logkontrol import Logger, get_logger
+from logkontrol.logkontrol import (
+    LogKonfig,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+)
+
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": self.log_file_path}}
+        )
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def read(self, path=None):
+        self.log_konfig.close()
+        with open(path or self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_handles_are_shared_per_key(self):
+        logger = get_logger("test_log")
+        self.assertIsInstance(logger, Logger)
+        self.assertIs(self.log_konfig.get_logger("test_log"), logger)
+        self.assertIsNot(get_logger(), logger)
+
+    def test_records_match_the_log_functions(self):
+        logger = get_logger("test_log")
+        logger.message("hello", {"count": 1}, log_level="INFO")
+        logger.variable("value", [1, 2])
+        logger.call("handler", log_level="WARNING", arg1=1, arg2="two")
+        logger.json({"key": "value"})
+        logger.json(iter([{"a": 1}, {"b": 2}]), max_items=1)
+        bound = self.read()
+        os.remove(self.log_file_path)
+        log_message("test_log", "hello", {"count": 1}, log_level="INFO")
+        log_variable("test_log", "value", [1, 2])
+        log_function_call("test_log", "handler", log_level="WARNING", arg1=1, arg2="two")
+        log_json_content("test_log", {"key": "value"})
+        log_json_content("test_log", iter([{"a": 1}, {"b": 2}]), max_items=1)
+        self.assertEqual(bound, self.read())
+
+    def test_default_key(self):
+        get_logger().message("only key")
+        self.assertIn("Message: only key", self.read())
+
+    def test_handle_follows_config_changes(self):
+        logger = get_logger("test_log")
+        logger.message("first")
+        self.assertTrue(logger.is_enabled_for("DEBUG"))
+        other_path = os.path.join(self.log_directory, "other.log")
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": other_path}, "log_level": "INFO"}
+        )
+        self.assertFalse(logger.is_enabled_for("DEBUG"))
+        logger.message("filtered")
+        logger.message("second", log_level="ERROR")
+        self.assertIn("Message: first", self.read())
+        other = self.read(other_path)
+        self.assertNotIn("filtered", other)
+        self.assertIn("Message: second", other)
+
+    def test_console_output(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": self.log_file_path}, "console_output": True}
+        )
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            get_logger("test_log").message("to the console")
+            self.log_konfig.flush()
+        self.assertIn("Message: to the console", stdout.getvalue())
+        self.assertFalse(os.path.exists(self.log_file_path))
+
+    def test_without_logging_config(self):
+        self.log_konfig.set_logging_config(None)  # type: ignore
+        logger = get_logger("test_log")
+        with patch("builtins.print") as mock_print:
+            logger.message("dropped")
+            logger.message("dropped again")
+        mock_print.assert_called_once_with(
+            "Logging configuration is not initialized. Please call init_logging() first."
+        )
+        self.assertFalse(logger.is_enabled_for("CRITICAL"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+# tests/test_metrics.py
+
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from logkontrol.aio import aflush, alog_message
+from logkontrol.logkontrol import (
+    LogKonfig,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+)
+from logkontrol.metrics import PipelineMetrics, latency_bucket_labels
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+        self.other_path = os.path.join(self.log_directory, "other.log")
+        self.set_config()
+        self.log_konfig.reset_stats()
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def set_config(self, **options):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": self.log_file_path, "other": self.other_path},
+                "log_level": "INFO",
+                **options,
+            }
+        )
+
+    def test_counts_records_and_bytes_per_key_and_level(self):
+        log_message("test_log", "hello", log_level="INFO")
+        log_variable("test_log", "answer", 42, log_level="INFO")
+        log_function_call("test_log", "handler", log_level="ERROR", arg=1)
+        log_json_content("other", {"key": "value"}, log_level="INFO")
+        log_json_content("other", iter([{"a": 1}, {"b": 2}]), log_level="INFO")
+        log_message("test_log", "filtered")
+        stats = self.log_konfig.stats()
+        self.assertEqual(stats["records"]["test_log"]["INFO"]["records"], 2)
+        self.assertEqual(stats["records"]["test_log"]["ERROR"]["records"], 1)
+        self.assertEqual(stats["records"]["other"]["INFO"]["records"], 2)
+        self.assertNotIn("DEBUG", stats["records"]["test_log"])
+        self.log_konfig.close()
+        with open(self.other_path, "r") as log_file:
+            self.assertGreaterEqual(
+                len(log_file.read()), stats["records"]["other"]["INFO"]["bytes"]
+            )
+        self.assertEqual(sum(stats["write_latency"].values()), 5)
+        self.assertGreater(stats["format_seconds"], 0)
+        self.assertGreater(stats["write_seconds"], 0)
+        self.assertEqual(stats["errors"], {})
+        self.assertEqual(stats["dropped"], {})
+
+    def test_console_output_is_counted(self):
+        self.set_config(console_output=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            log_message("test_log", "hello", log_level="INFO")
+            self.log_konfig.flush()
+        self.assertEqual(
+            self.log_konfig.stats()["records"]["test_log"]["INFO"]["records"], 1
+        )
+
+    def test_threads_are_combined(self):
+        def log_records():
+            for _ in range(50):
+                log_message("test_log", "from a thread", log_level="INFO")
+
+        threads = [threading.Thread(target=log_records) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Finished threads are folded into the totals and stay counted.
+        for _ in range(2):
+            stats = self.log_konfig.stats()
+            self.assertEqual(stats["records"]["test_log"]["INFO"]["records"], 200)
+
+    def test_async_records_are_counted(self):
+        async def main():
+            await alog_message("test_log", "async", log_level="INFO")
+            await aflush()
+
+        asyncio.run(main())
+        self.assertEqual(
+            self.log_konfig.stats()["records"]["test_log"]["INFO"]["records"], 1
+        )
+
+    def test_write_errors_are_counted(self):
+        not_a_directory = os.path.join(self.log_file_path, "nested.log")
+        with open(self.log_file_path, "w"):
+            pass
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": not_a_directory}}
+        )
+        with self.assertRaises(OSError):
+            log_message("test_log", "lost")
+        self.assertEqual(self.log_konfig.stats()["errors"], {not_a_directory: 1})
+
+    def test_reset_stats(self):
+        log_message("test_log", "hello", log_level="INFO")
+        self.log_konfig.reset_stats()
+        self.assertEqual(self.log_konfig.stats()["records"], {})
+
+    def test_latency_histogram(self):
+        metrics = PipelineMetrics()
+        for write_ns in (500, 1_500, 3_000_000, 10**13):
+            metrics.record("test_log", "INFO", 10, 0, write_ns)
+        labels = latency_bucket_labels()
+        self.assertEqual(
+            metrics.snapshot()["write_latency"],
+            {labels[0]: 1, labels[1]: 1, labels[12]: 1, labels[-1]: 1},
+        )
+
+    def test_metrics_report(self):
+        self.set_config(
+            metrics_report={"log_file_key": "other", "interval_seconds": 0.01}
+        )
+        log_message("test_log", "hello", log_level="INFO")
+        deadline = time.monotonic() + 5
+        while "other" not in self.log_konfig.stats()["records"]:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.set_config()
+        with open(self.other_path, "r") as log_file:
+            self.assertIn('"records": {', log_file.read())
+
+    def test_failed_reports_are_counted_and_reporting_goes_on(self):
+        calls = []
+
+        def fail_once(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise RuntimeError("broken report")
+
+        with patch("logkontrol.logkontrol.log_json_content", fail_once), patch(
+            "builtins.print"
+        ) as mock_print:
+            self.set_config(
+                metrics_report={"log_file_key": "other", "interval_seconds": 0.01}
+            )
+            deadline = time.monotonic() + 5
+            while len(calls) < 2:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+            self.set_config()
+        self.assertIn("broken report", mock_print.call_args_list[0][0][0])
+        self.assertEqual(self.log_konfig.stats()["errors"], {self.other_path: 1})
+
+    def test_invalid_metrics_report(self):
+        for options in (
+            {"log_file_key": "missing"},
+            {"log_file_key": "other", "interval_seconds": 0},
+            {"log_file_key": "other", "every": 5},
+            "other",
+        ):
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    self.set_config(metrics_report=options)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# tests/test_query.py
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from logkontrol.query import LogIndex, levels_at_or_above, parse_time, query_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def record(minute, second, log_level, message):
+    return f"[2024-05-01 14:{minute:02d}:{second:02d}] [{log_level}]\nMessage: {message}\n\n"
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+        with open(self.log_file_path, "w") as log_file:
+            log_file.write("Log File Initialized\n\n")
+            for minute in range(10):
+                for second in range(0, 60, 10):
+                    log_level = "ERROR" if second == 30 else "DEBUG"
+                    log_file.write(record(minute, second, log_level, f"{minute}:{second}"))
+
+    def tearDown(self):
+        shutil.rmtree(self.log_directory)
+
+    def query(self, **filters):
+        return [
+            re.search(rb"Message: (.*)", found).group(1).decode()
+            for found in query_file(self.log_file_path, **filters)
+        ]
+
+    def append(self, *records):
+        with open(self.log_file_path, "a") as log_file:
+            log_file.write("".join(records))
+
+    def test_time_and_level_filters(self):
+        since = datetime(2024, 5, 1, 14, 2).timestamp()
+        until = datetime(2024, 5, 1, 14, 5).timestamp()
+        self.assertEqual(
+            self.query(since=since, until=until, log_levels=levels_at_or_above("ERROR")),
+            ["2:30", "3:30", "4:30"],
+        )
+        self.assertEqual(len(self.query(since=since, until=until)), 18)
+
+    def test_index_matches_full_scan(self):
+        pattern = re.compile(rb"Message: [357]:")
+        indexed = self.query(log_levels={"DEBUG"}, pattern=pattern)
+        self.assertEqual(
+            indexed, self.query(log_levels={"DEBUG"}, pattern=pattern, use_index=False)
+        )
+        self.assertEqual(len(indexed), 15)
+        self.assertTrue(os.path.exists(self.log_file_path + ".idx"))
+
+    def test_index_covers_all_but_the_last_record(self):
+        list(query_file(self.log_file_path))
+        index = LogIndex.load(self.log_file_path)
+        self.assertEqual(len(index.segments), 10)
+        self.assertEqual(index.segments[3]["levels"]["ERROR"]["count"], 1)
+        with open(self.log_file_path, "rb") as log_file:
+            content = log_file.read()
+        self.assertEqual(index.indexed_to, content.rindex(b"[2024-05-01 14:09:50]"))
+
+    def test_index_updates_incrementally(self):
+        self.assertEqual(len(self.query()), 60)
+        indexed_to = LogIndex.load(self.log_file_path).indexed_to
+        self.append(record(10, 0, "ERROR", "late"), record(10, 10, "DEBUG", "last"))
+        self.assertEqual(self.query(log_levels={"ERROR"})[-1], "late")
+        self.assertEqual(self.query()[-2:], ["late", "last"])
+        index = LogIndex.load(self.log_file_path)
+        self.assertGreater(index.indexed_to, indexed_to)
+        late_offset = indexed_to + len(record(9, 50, "DEBUG", "9:50"))
+        self.assertEqual(
+            index.segments[-1]["levels"], {"ERROR": {"count": 1, "offsets": [late_offset]}}
+        )
+
+    def test_index_is_rebuilt_for_a_replaced_file(self):
+        self.query()
+        os.remove(self.log_file_path)
+        with open(self.log_file_path, "w") as log_file:
+            log_file.write(record(0, 0, "ERROR", "new") + record(0, 1, "INFO", "file"))
+        self.assertEqual(self.query(), ["new", "file"])
+        self.assertEqual(self.query(log_levels={"ERROR"}), ["new"])
+
+    def test_parse_time(self):
+        expected = datetime(2024, 5, 1, 14, 2).timestamp()
+        self.assertEqual(parse_time("2024-05-01 14:02:00"), expected)
+        self.assertEqual(parse_time("2024-05-01T14:02"), expected)
+        with self.assertRaises(ValueError):
+            parse_time("yesterday")
+
+    def test_levels_at_or_above(self):
+        self.assertEqual(levels_at_or_above("error"), {"ERROR", "CRITICAL"})
+        self.assertEqual(levels_at_or_above("AUDIT"), {"AUDIT"})
+
+    def test_command_line(self):
+        result = subprocess.run(
+            [
+                sys.executable, "-m", "logkontrol", "query", self.log_file_path,
+                "--since", "2024-05-01 14:08", "--level", "ERROR",
+            ],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+        )
+        self.assertEqual(
+            result.stdout.decode(),
+            record(8, 30, "ERROR", "8:30") + record(9, 30, "ERROR", "9:30"),
+        )
@@ -0,0 +1,149 @@
+# tests/test_rotation.py
+
+import gzip
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from logkontrol.logkontrol import LogKonfig, log_message
+from logkontrol.rotation import LOG_FILE_HEADER, RotationPolicy, compressor, list_generations
+from logkontrol.sinks import SinkPool
+
+
+def _write_records(log_file_path, worker, count):
+    log_konfig = LogKonfig()
+    log_konfig.set_logging_config(
+        {
+            "log_file_paths": {"test_log": log_file_path},
+            "rotation": {
+                "test_log": {"max_size_mb": 0.002, "backup_count": 1000, "compress": False}
+            },
+        }
+    )
+    for index in range(count):
+        log_message("test_log", f"worker {worker} record {index}")
+    log_konfig.close()
+
+
+class TestRotation(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_key = "test_log"
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        compressor.wait_idle()
+        shutil.rmtree(self.log_directory)
+
+    def configure(self, rotation):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": {"test_log": self.log_file_path},
+                "rotation": {"test_log": rotation},
+            }
+        )
+
+    def read(self, path):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt") as log_file:
+            return log_file.read()
+
+    def test_size_rotation_keeps_backup_count_generations(self):
+        self.configure({"max_size_mb": 0.001, "backup_count": 2})
+        for index in range(100):
+            log_message(self.log_file_key, f"record {index:03d}")
+        self.log_konfig.close()
+        compressor.wait_idle()
+        generations = list_generations(self.log_file_path)
+        self.assertEqual(len(generations), 2)
+        self.assertTrue(all(path.endswith(".gz") for path in generations))
+        for path in generations + [self.log_file_path]:
+            self.assertLessEqual(os.path.getsize(path), 1024 + 100)
+        current = self.read(self.log_file_path)
+        self.assertTrue(current.startswith(LOG_FILE_HEADER))
+        self.assertIn("record 099", current)
+        self.assertIn("record", self.read(generations[-1]))
+
+    def test_uncompressed_generations(self):
+        self.configure({"max_size_mb": 0.001, "backup_count": 3, "compress": False})
+        for index in range(50):
+            log_message(self.log_file_key, f"record {index:03d}")
+        self.log_konfig.close()
+        generations = list_generations(self.log_file_path)
+        self.assertTrue(generations)
+        self.assertFalse(any(path.endswith(".gz") for path in generations))
+        combined = "".join(self.read(path) for path in generations + [self.log_file_path])
+        self.assertIn("record 049", combined)
+
+    def test_interval_rotation(self):
+        self.configure({"interval_seconds": 3600, "compress": False})
+        log_message(self.log_file_key, "old period")
+        sink = self.log_konfig.get_sink_pool().get(self.log_file_path)
+        sink._period -= 1
+        log_message(self.log_file_key, "new period")
+        self.log_konfig.close()
+        (generation,) = list_generations(self.log_file_path)
+        self.assertIn("old period", self.read(generation))
+        current = self.read(self.log_file_path)
+        self.assertTrue(current.startswith(LOG_FILE_HEADER))
+        self.assertIn("new period", current)
+        self.assertNotIn("old period", current)
+
+    def test_invalid_rotation_options(self):
+        with self.assertRaises(ValueError):
+            RotationPolicy.from_config({})
+        with self.assertRaises(ValueError):
+            RotationPolicy.from_config({"max_size_mb": 0})
+        with self.assertRaises(ValueError):
+            self.log_konfig.set_logging_config(
+                {
+                    "log_file_paths": {"test_log": self.log_file_path},
+                    "rotation": {"missing": {"max_size_mb": 1}},
+                }
+            )
+
+    def test_writers_sharing_a_file_never_lose_records(self):
+        # Each pool stands for a process with its own handle on the file.
+        pools = [SinkPool(), SinkPool()]
+        for pool in pools:
+            pool.set_rotation_policies(
+                {self.log_file_path: RotationPolicy(max_bytes=1024, backup_count=100)}
+            )
+        try:
+            for index in range(60):
+                pools[index % 2].write(self.log_file_path, f"writer {index % 2} record {index}\n")
+        finally:
+            for pool in pools:
+                pool.close_all()
+        compressor.wait_idle()
+        generations = list_generations(self.log_file_path)
+        self.assertTrue(any(path.endswith(".gz") for path in generations))
+        combined = "".join(self.read(path) for path in generations + [self.log_file_path])
+        records = re.findall(r"^writer \d record (\d+)$", combined, re.M)
+        self.assertEqual(sorted(map(int, records)), list(range(60)))
+
+    def test_processes_sharing_a_file(self):
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_write_records, args=(self.log_file_path, worker, 200))
+            for worker in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+            self.assertEqual(worker.exitcode, 0)
+        paths = list_generations(self.log_file_path) + [self.log_file_path]
+        self.assertGreater(len(paths), 2)
+        records = re.findall(
+            r"^\[[^\]]+\] \[DEBUG\]\nMessage: worker (\d) record (\d+)\n\n",
+            "".join(self.read(path) for path in paths),
+            re.M,
+        )
+        self.assertEqual(len(set(records)), 800)
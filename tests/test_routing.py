@@ -0,0 +1,234 @@
+# tests/test_routing.py
+
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from logkontrol import LogKontrolHandler, get_logger, lazy, log_calls
+from logkontrol.aio import aflush, alog_message
+from logkontrol.logkontrol import (
+    LogKonfig,
+    log_function_call,
+    log_json_content,
+    log_message,
+    log_variable,
+)
+from logkontrol.routing import RouteTable
+
+
+class TestRouting(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.paths = {
+            key: os.path.join(self.log_directory, f"{key}.log")
+            for key in ("general", "errors", "audit")
+        }
+        self.configure()
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def configure(self, **options):
+        self.log_konfig.set_logging_config(
+            {
+                "log_file_paths": options.pop("log_file_paths", self.paths),
+                "timestamp_format": "%H:%M:%S.%f",
+                **options,
+            }
+        )
+        self.log_konfig.reset_stats()
+
+    def read(self, key):
+        self.log_konfig.flush()
+        if not os.path.exists(self.paths[key]):
+            return ""
+        with open(self.paths[key], "r") as log_file:
+            return log_file.read()
+
+    def test_key_list_writes_the_same_entry_to_every_key(self):
+        calls = []
+        log_message(
+            ["general", "errors"],
+            "shared",
+            {"value": lazy(lambda: calls.append(1) or 42)},
+            log_level="INFO",
+        )
+        general = self.read("general")
+        self.assertIn("Message: shared\nvalue: 42", general)
+        self.assertEqual(self.read("errors"), general)
+        self.assertEqual(self.read("audit"), "")
+        self.assertEqual(calls, [1])
+
+    def test_every_record_type_accepts_key_lists(self):
+        log_function_call(["general", "errors"], "handler", arg=1)
+        log_variable(["general", "errors"], "count", 3)
+        log_json_content(["general", "errors"], iter([{"id": 1}, {"id": 2}]))
+        for key in ("general", "errors"):
+            log_content = self.read(key)
+            self.assertIn("Function Call: handler()\n  arg: 1", log_content)
+            self.assertIn("count: 3", log_content)
+            self.assertIn('"id": 1', log_content)
+            self.assertIn('"id": 2', log_content)
+        self.assertEqual(self.read("general"), self.read("errors"))
+
+    def test_single_key_list_streams_json(self):
+        log_json_content(["general"], iter([{"id": 1}]))
+        self.assertIn('"id": 1', self.read("general"))
+
+    def test_routed_iterators_are_read_up_to_max_items(self):
+        self.configure(routes=[{"to": "errors"}])
+        items = itertools.count()
+        log_json_content("general", items, max_items=3, log_level="INFO")
+        self.assertEqual(next(items), 4)
+        for key in ("general", "errors"):
+            log_content = self.read(key)
+            self.assertIn("0\n1\n2\n... more items omitted\n", log_content)
+            self.assertNotIn("\n3\n", log_content)
+
+    def test_keys_sharing_a_path_are_written_once(self):
+        shared = self.paths["general"]
+        self.configure(log_file_paths={"general": shared, "errors": shared})
+        log_message(["general", "errors", "general"], "once")
+        self.assertEqual(self.read("general").count("Message: once"), 1)
+        stats = self.log_konfig.stats()["records"]
+        self.assertEqual(list(stats), ["general"])
+
+    def test_each_key_applies_its_own_level(self):
+        self.configure(log_levels={"errors": "ERROR"})
+        log_message(["general", "errors"], "details", log_level="INFO")
+        log_message(["general", "errors"], "failure", log_level="ERROR")
+        self.assertIn("details", self.read("general"))
+        self.assertIn("failure", self.read("general"))
+        self.assertNotIn("details", self.read("errors"))
+        self.assertIn("failure", self.read("errors"))
+
+    def test_routes_copy_records_by_level(self):
+        self.configure(routes=[{"level": "ERROR", "to": "errors"}])
+        log_message("general", "fine", log_level="INFO")
+        log_message("general", "broken", log_level="ERROR")
+        log_message("audit", "denied", log_level="CRITICAL")
+        errors = self.read("errors")
+        self.assertNotIn("fine", errors)
+        self.assertIn("broken", errors)
+        self.assertIn("denied", errors)
+        self.assertIn("broken", self.read("general"))
+        stats = self.log_konfig.stats()["records"]
+        self.assertEqual(stats["errors"]["ERROR"]["records"], 1)
+        self.assertEqual(stats["general"]["ERROR"]["records"], 1)
+
+    def test_routes_limited_to_source_keys(self):
+        self.configure(routes=[{"from": ["audit"], "to": ["errors", "general"]}])
+        log_message("general", "general only")
+        log_message("audit", "copied")
+        self.assertNotIn("general only", self.read("errors"))
+        self.assertIn("copied", self.read("errors"))
+        self.assertIn("copied", self.read("general"))
+
+    def test_routes_reach_every_entry_point(self):
+        self.configure(routes=[{"level": "ERROR", "to": "errors"}])
+        logger = get_logger("general")
+        self.assertTrue(logger.is_enabled_for("ERROR"))
+        logger.message("from a handle", log_level="ERROR")
+
+        @log_calls("general", log_level="ERROR")
+        def failing_step():
+            return "done"
+
+        failing_step()
+
+        stdlib_logger = logging.getLogger(f"logkontrol.tests.{self.id()}")
+        stdlib_logger.propagate = False
+        handler = LogKontrolHandler("general")
+        stdlib_logger.addHandler(handler)
+        try:
+            stdlib_logger.error("from the standard library")
+        finally:
+            stdlib_logger.removeHandler(handler)
+            handler.close()
+
+        async def log_async():
+            await alog_message("general", "from a coroutine", log_level="ERROR")
+            await aflush()
+
+        asyncio.run(log_async())
+        errors = self.read("errors")
+        for message in (
+            "from a handle",
+            "failing_step()\n  return: done",
+            "from the standard library",
+            "from a coroutine",
+        ):
+            self.assertIn(message, errors)
+        self.assertEqual(self.read("general"), errors)
+
+    def test_routed_records_enable_filtered_keys(self):
+        self.configure(
+            log_levels={"general": "CRITICAL"},
+            routes=[{"from": "general", "level": "ERROR", "to": "errors"}],
+        )
+        self.assertTrue(get_logger("general").is_enabled_for("ERROR"))
+        self.assertFalse(get_logger("general").is_enabled_for("WARNING"))
+        log_message("general", "routed only", log_level="ERROR")
+        self.assertEqual(self.read("general"), "")
+        self.assertIn("routed only", self.read("errors"))
+
+    def test_formats_are_rendered_once_each(self):
+        self.configure(log_file_formats={"errors": "jsonl"})
+        log_message(["general", "audit", "errors"], "mixed", log_level="WARNING")
+        self.assertEqual(self.read("general"), self.read("audit"))
+        record = json.loads(self.read("errors"))
+        self.assertEqual(record["message"], "mixed")
+        self.assertEqual(record["key"], "errors")
+
+    def test_console_output_writes_once(self):
+        self.configure(console_output=True)
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            log_message(["general", "errors"], "to the console")
+            self.log_konfig.flush()
+        self.assertEqual(stdout.getvalue().count("Message: to the console"), 1)
+
+    def test_invalid_routes(self):
+        for routes in (
+            {"to": "errors"},
+            [{"level": "ERROR"}],
+            [{"to": "missing"}],
+            [{"to": "errors", "from": []}],
+            [{"to": "errors", "level": "LOUD"}],
+            [{"to": "errors", "when": "always"}],
+        ):
+            with self.subTest(routes=routes):
+                with self.assertRaises(ValueError):
+                    self.configure(routes=routes)
+
+
+class TestRouteTable(unittest.TestCase):
+    def test_destinations_keep_order_without_duplicates(self):
+        table = RouteTable.from_config(
+            {
+                "log_file_paths": {"a": "a.log", "b": "b.log", "c": "c.log"},
+                "routes": [
+                    {"level": "WARNING", "to": ["c", "a"]},
+                    {"from": "b", "to": "a"},
+                ],
+            },
+            {"DEBUG": 10, "WARNING": 30},
+        )
+        self.assertEqual(table.destinations("a", "DEBUG"), ("a",))
+        self.assertEqual(table.destinations("a", "WARNING"), ("a", "c"))
+        self.assertEqual(table.destinations(["b", "b"], "DEBUG"), ("b", "a"))
+        self.assertEqual(table.destinations("b", "custom"), ("b", "a"))
+        self.assertIsNone(RouteTable.from_config({"routes": []}, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+# tests/test_sampling.py
+
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from logkontrol.aio import aclose, alog_message
+from logkontrol.logkontrol import LogKonfig, lazy, log_message
+from logkontrol.sampling import RecordGate, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2, burst=3)
+        now = bucket.updated
+        self.assertEqual([bucket.take(now) for _ in range(4)], [True, True, True, False])
+        self.assertTrue(bucket.take(now + 0.5))
+        self.assertFalse(bucket.take(now + 0.5))
+        self.assertEqual(sum(bucket.take(now + 100) for _ in range(5)), 3)
+
+
+class TestSampling(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+
+    def tearDown(self):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def configure(self, **options):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": self.log_file_path}, **options}
+        )
+
+    def read_records(self):
+        self.log_konfig.close()
+        with open(self.log_file_path, "r") as log_file:
+            return re.findall(r"^\[[^\]]+\] (.*\n.*)", log_file.read(), flags=re.M)
+
+    def test_rate_limit_suppresses_records_beyond_burst(self):
+        self.configure(rate_limits={"test_log": {"records_per_second": 0.001, "burst": 3}})
+        for index in range(10):
+            log_message("test_log", f"record {index}")
+        records = self.read_records()
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[2], "[DEBUG]\nMessage: record 2")
+
+    def test_suppressed_records_are_not_formatted(self):
+        self.configure(rate_limits={"test_log": {"records_per_second": 0.001, "burst": 1}})
+        calls = []
+        for _ in range(5):
+            log_message("test_log", None, {"value": lazy(lambda: calls.append(1))})
+        self.assertEqual(len(calls), 1)
+
+    def test_summary_reports_suppressed_records(self):
+        self.configure(
+            rate_limits={
+                "test_log": {"records_per_second": 0.001, "burst": 1, "per_call_site": True}
+            },
+            suppression_summary_seconds=0,
+        )
+        for index in range(4):
+            log_message("test_log", f"record {index}")
+        log_message("test_log", "after", log_level="ERROR")
+        records = self.read_records()
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[1], "[WARNING]\nMessage: Suppressed 3 records")
+        self.assertEqual(records[2], "[ERROR]\nMessage: after")
+
+    def test_summary_is_written_while_every_record_is_suppressed(self):
+        self.configure(
+            sampling={"test_log": {"DEBUG": 0.0}}, suppression_summary_seconds=0.05
+        )
+        for _ in range(3):
+            log_message("test_log", "sampled debug")
+        deadline = time.monotonic() + 5
+        content = ""
+        while "Suppressed" not in content and time.monotonic() < deadline:
+            time.sleep(0.02)
+            with open(self.log_file_path, "r") as log_file:
+                content = log_file.read()
+        self.assertIn("Message: Suppressed 2 records", content)
+        self.assertEqual(content.count("sampled debug"), 1)
+
+    def test_summary_is_written_at_shutdown(self):
+        self.configure(rate_limits={"test_log": {"records_per_second": 0.001, "burst": 1}})
+        for index in range(3):
+            log_message("test_log", f"record {index}")
+        self.log_konfig.shutdown()
+        with open(self.log_file_path, "r") as log_file:
+            content = log_file.read()
+        self.assertIn("Suppressed 2 records", content)
+        self.assertIn("rate_limited: 2", content)
+
+    def test_rate_limit_per_call_site(self):
+        self.configure(
+            rate_limits={
+                "test_log": {"records_per_second": 0.001, "burst": 2, "per_call_site": True}
+            }
+        )
+        for _ in range(5):
+            log_message("test_log", "first site")
+        for _ in range(5):
+            log_message("test_log", "second site")
+        records = self.read_records()
+        self.assertEqual(sum(record.endswith("first site") for record in records), 2)
+        self.assertEqual(sum(record.endswith("second site") for record in records), 2)
+
+    def test_sampling_by_level_keeps_first_record_per_call_site(self):
+        self.configure(sampling={"test_log": {"DEBUG": 0.0, "info": 0.5}})
+        for _ in range(20):
+            log_message("test_log", "sampled debug")
+        for _ in range(20):
+            log_message("test_log", "errors are kept", log_level="ERROR")
+        with patch("random.random", side_effect=[0.2, 0.7] * 10):
+            for _ in range(21):
+                log_message("test_log", "sampled info", log_level="INFO")
+        self.log_konfig.shutdown()
+        with open(self.log_file_path, "r") as log_file:
+            content = log_file.read()
+        self.assertEqual(content.count("sampled debug"), 1)
+        self.assertEqual(content.count("errors are kept"), 20)
+        self.assertEqual(content.count("sampled info"), 11)
+        self.assertIn("Suppressed 29 records", content)
+        self.assertIn(f"sampled_out {os.path.abspath(__file__)}:", content)
+
+    def test_async_records_are_gated(self):
+        self.configure(rate_limits={"test_log": {"records_per_second": 0.001, "burst": 2}})
+
+        async def main():
+            for index in range(5):
+                await alog_message("test_log", f"record {index}")
+            await aclose()
+
+        asyncio.run(main())
+        self.log_konfig.shutdown()
+        records = self.read_records()
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[2], "[WARNING]\nMessage: Suppressed 3 records")
+
+    def test_invalid_config(self):
+        invalid_options = [
+            {"rate_limits": {"other_log": {"records_per_second": 1}}},
+            {"sampling": {"other_log": {"DEBUG": 0.5}}},
+            {"rate_limits": {"test_log": {"burst": 5}}},
+            {"rate_limits": {"test_log": {"records_per_second": 0}}},
+            {"rate_limits": {"test_log": {"records_per_second": 1, "bursts": 5}}},
+            {"sampling": {"test_log": {"DEBUG": 1.5}}},
+            {"sampling": {"test_log": 0.5}},
+        ]
+        for options in invalid_options:
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    self.configure(**options)
+
+    def test_gate_without_limits_admits_everything(self):
+        gate = RecordGate.from_config(None, {"DEBUG": 1.0})
+        self.assertTrue(all(gate.admit("DEBUG")[0] for _ in range(100)))
+        self.assertIsNone(gate.drain())
+
+    def test_sampled_levels_match_in_any_case(self):
+        gate = RecordGate.from_config(None, {"debug": 0.0})
+        # Only the first record of the call site is kept.
+        admitted = [gate.admit(log_level)[0] for log_level in ("debug", "debug", "Debug")]
+        self.assertEqual(admitted, [True, False, False])
+        self.assertEqual(sum(gate.drain().values()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
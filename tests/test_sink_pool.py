@@ -0,0 +1,89 @@
+# tests/test_sink_pool.py
+
+import os
+import unittest
+from unittest.mock import patch
+from logkontrol.logkontrol import LogKonfig, log_message, log_json_content
+from logkontrol.sinks import SinkPool
+
+
+class TestSinkPool(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        self.log_file_key = "test_log"
+        self.log_file_path = "test_log.log"
+        self.extra_paths = ["test_log_a.log", "test_log_b.log", "test_log_c.log"]
+
+    def tearDown(self):
+        self.log_konfig.close()
+        for path in [self.log_file_path] + self.extra_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_handle_is_reused_between_records(self):
+        with patch("builtins.open", wraps=open) as mock_open:
+            log_message(self.log_file_key, "first")
+            log_message(self.log_file_key, "second")
+            log_json_content(self.log_file_key, {"key": "value"})
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual(self.log_konfig.get_sink_pool().open_count(), 1)
+
+    def test_records_are_visible_after_each_call(self):
+        log_message(self.log_file_key, "visible")
+        with open(self.log_file_path, "r") as log_file:
+            self.assertIn("Message: visible", log_file.read())
+
+    def test_lru_cap_closes_least_recently_used(self):
+        pool = SinkPool(max_open_files=2)
+        pool.write(self.extra_paths[0], "a\n")
+        pool.write(self.extra_paths[1], "b\n")
+        pool.write(self.extra_paths[0], "a\n")
+        pool.write(self.extra_paths[2], "c\n")
+        self.assertEqual(pool.open_count(), 2)
+        self.assertEqual(
+            [os.path.basename(path) for path in pool._sinks],
+            [self.extra_paths[0], self.extra_paths[2]],
+        )
+        pool.write(self.extra_paths[1], "b\n")
+        pool.close_all()
+        with open(self.extra_paths[1], "r") as log_file:
+            self.assertEqual(log_file.read(), "b\nb\n")
+
+    def test_sinks_released_by_the_pool_are_never_reopened(self):
+        pool = SinkPool()
+        stale = pool.get(self.extra_paths[0])
+        pool.close_all()
+        self.assertFalse(stale.write("lost\n"))
+        self.assertIsNone(stale._file)
+        # A writer that fetched the sink just before close_all() writes through the
+        # pool's new sink instead.
+        get = pool.get
+        fetched = [stale]
+
+        def get_stale_first(path):
+            return fetched.pop() if fetched else get(path)
+
+        with patch.object(pool, "get", get_stale_first):
+            pool.write(self.extra_paths[0], "kept\n")
+        self.assertIsNone(stale._file)
+        self.assertEqual(pool.open_count(), 1)
+        pool.close_all()
+        with open(self.extra_paths[0], "r") as log_file:
+            self.assertEqual(log_file.read(), "kept\n")
+
+    def test_set_logging_config_reopens_handles(self):
+        log_message(self.log_file_key, "before")
+        self.assertEqual(self.log_konfig.get_sink_pool().open_count(), 1)
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}, "max_open_files": 8}
+        )
+        self.assertEqual(self.log_konfig.get_sink_pool().open_count(), 0)
+        self.assertEqual(self.log_konfig.get_sink_pool().max_open_files, 8)
+        log_message(self.log_file_key, "after")
+        with open(self.log_file_path, "r") as log_file:
+            log_content = log_file.read()
+        self.assertIn("Message: before", log_content)
+        self.assertIn("Message: after", log_content)
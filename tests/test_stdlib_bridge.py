@@ -0,0 +1,142 @@
+# tests/test_stdlib_bridge.py
+
+import contextlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from logkontrol import LogKontrolHandler
+from logkontrol.bridge import level_name
+from logkontrol.logkontrol import LogKonfig, log_message
+
+
+class TestStdlibBridge(unittest.TestCase):
+    def setUp(self):
+        self.log_konfig = LogKonfig()
+        self.log_directory = tempfile.mkdtemp()
+        self.log_file_path = os.path.join(self.log_directory, "test.log")
+        self.set_config(log_level="INFO")
+        self.logger = logging.getLogger(f"logkontrol.tests.{self.id()}")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.handler = LogKontrolHandler("test_log")
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": "test_log.log"}}
+        )
+        shutil.rmtree(self.log_directory)
+
+    def set_config(self, **options):
+        self.log_konfig.set_logging_config(
+            {"log_file_paths": {"test_log": self.log_file_path}, **options}
+        )
+
+    def read(self):
+        self.log_konfig.close()
+        if not os.path.exists(self.log_file_path):
+            return ""
+        with open(self.log_file_path, "r") as log_file:
+            return log_file.read()
+
+    def test_records_are_formatted_like_log_message(self):
+        self.logger.info("hello %s", "world")
+        self.handler.flush()
+        bridged = self.read()
+        os.remove(self.log_file_path)
+        log_message("test_log", "hello world", {"logger": self.logger.name}, "INFO")
+        self.assertEqual(bridged, self.read())
+
+    def test_message_is_built_after_level_filtering(self):
+        argument = unittest.mock.MagicMock()
+        self.logger.debug("filtered %s", argument)
+        self.handler.flush()
+        argument.__str__.assert_not_called()
+        self.assertEqual(self.read(), "")
+
+    def test_entries_are_written_in_batches(self):
+        with patch.object(LogKonfig, "write_entry", autospec=True) as write_entry:
+            for index in range(5):
+                self.logger.info("record %d", index)
+            write_entry.assert_not_called()
+            self.handler.flush()
+        write_entry.assert_called_once()
+        chunk = write_entry.call_args[0][2]
+        self.assertEqual(chunk.count("Message: record"), 5)
+
+    def test_capacity_and_flush_level_trigger_writes(self):
+        self.handler.capacity = 3
+        with patch.object(LogKonfig, "write_entry", autospec=True) as write_entry:
+            for index in range(3):
+                self.logger.info("record %d", index)
+            self.assertEqual(write_entry.call_count, 1)
+            self.logger.warning("pending")
+            self.assertEqual(write_entry.call_count, 1)
+            self.logger.error("failed")
+            self.assertEqual(write_entry.call_count, 2)
+        self.assertEqual(write_entry.call_args[0][3], "ERROR")
+
+    def test_flush_interval_triggers_writes(self):
+        self.handler.flush_interval = 0
+        self.logger.info("written at once")
+        self.assertIn("Message: written at once", self.read())
+
+    def test_pending_entries_are_written_after_flush_interval(self):
+        self.handler.flush_interval = 0.1
+        self.logger.info("last record")
+        deadline = time.monotonic() + 5
+        while "Message: last record" not in self.read() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertIn("Message: last record", self.read())
+
+    def test_exceptions_are_logged(self):
+        try:
+            raise KeyError("missing")
+        except KeyError:
+            self.logger.exception("lookup failed")
+        log_content = self.read()
+        self.assertIn("[ERROR]", log_content)
+        self.assertIn("exception: Traceback", log_content)
+        self.assertIn("KeyError: 'missing'", log_content)
+
+    def test_handler_formatter_is_used(self):
+        self.handler.setFormatter(logging.Formatter("%(name)s - %(message)s"))
+        self.logger.warning("formatted")
+        self.handler.flush()
+        self.assertIn(f"Message: {self.logger.name} - formatted", self.read())
+
+    def test_config_changes_are_followed(self):
+        self.logger.info("first")
+        other_path = os.path.join(self.log_directory, "other.log")
+        self.log_konfig.set_logging_config({"log_file_paths": {"test_log": other_path}})
+        self.logger.debug("second")
+        self.handler.flush()
+        self.assertIn("Message: first", self.read())
+        self.log_konfig.close()
+        with open(other_path, "r") as log_file:
+            self.assertIn("Message: second", log_file.read())
+
+    def test_console_output(self):
+        self.set_config(console_output=True)
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            self.logger.info("to the console")
+            self.handler.flush()
+            self.log_konfig.flush()
+        self.assertIn("Message: to the console", stdout.getvalue())
+
+    def test_level_names(self):
+        self.assertEqual(level_name(logging.WARNING), "WARNING")
+        self.assertEqual(level_name(logging.INFO + 5), "INFO")
+        self.assertEqual(level_name(5), "DEBUG")
+        self.assertEqual(level_name(logging.CRITICAL + 10), "CRITICAL")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 # tests/test_truncate_string.py
 
 import unittest
+from collections import Counter, OrderedDict, defaultdict, deque, namedtuple
 from logkontrol.logkontrol import truncate_string
 
 
@@ -22,3 +23,108 @@ class TestTruncateString(unittest.TestCase):
         max_length = 10
         truncated_string = truncate_string(value, max_length)
         self.assertEqual(truncated_string, "12345")
+
+    def test_containers_within_budget_match_str(self):
+        value = {"a": [1, "x", (2,), (), set(), {3}, b"\x00z", None, True, 1.5], 3: "q"}
+        self.assertEqual(truncate_string(value, 10_000), str(value))
+
+    def test_large_list_is_not_rendered_in_full(self):
+        class Item:
+            rendered = 0
+
+            def __repr__(self):
+                Item.rendered += 1
+                return "item"
+
+        truncated_string = truncate_string([Item() for _ in range(100_000)], 50)
+        self.assertEqual(len(truncated_string), 53)
+        self.assertTrue(truncated_string.endswith("..."))
+        self.assertLess(Item.rendered, 20)
+
+    def test_container_length_limit(self):
+        truncated_string = truncate_string(list(range(10)), max_items=3)
+        self.assertEqual(truncated_string, "[0, 1, 2, ...<7 more items>]")
+
+    def test_nesting_depth_limit(self):
+        self.assertEqual(truncate_string([[[[1]]]], max_depth=2), "[[[...]]]")
+
+    def test_nested_string_length_limit(self):
+        truncated_string = truncate_string(["x" * 50], max_string_length=5)
+        self.assertEqual(truncated_string, "['xxxxx'...<50 chars>]")
+
+    def test_bytes_summary(self):
+        truncated_string = truncate_string(b"y" * 1000, max_string_length=4)
+        self.assertEqual(truncated_string, "b'yyyy'...<1000 bytes>")
+
+    def test_mapping_summary(self):
+        value = {index: index for index in range(5)}
+        truncated_string = truncate_string(value, max_items=2)
+        self.assertEqual(truncated_string, "{0: 0, 1: 1, ...<3 more items>}")
+
+    def test_container_subclasses_are_rendered_within_budget(self):
+        truncated_string = truncate_string(OrderedDict(a="x" * 10_000_000), 50)
+        self.assertEqual(truncated_string, "OrderedDict({'a': '" + "x" * 31 + "...")
+        truncated_string = truncate_string(
+            defaultdict(list, {"a": "x" * 1000}), max_string_length=3
+        )
+        self.assertEqual(
+            truncated_string, "defaultdict(<class 'list'>, {'a': 'xxx'...<1000 chars>})"
+        )
+        self.assertEqual(
+            truncate_string(Counter(range(10)), max_items=2),
+            "Counter({0: 1, 1: 1, ...<8 more items>})",
+        )
+        self.assertEqual(
+            truncate_string(deque(range(10), maxlen=20), max_items=2),
+            "deque([0, 1, ...<8 more items>], maxlen=20)",
+        )
+
+    def test_named_tuples_render_their_fields(self):
+        Point = namedtuple("Point", ["x", "y"])
+        value = Point(1, [Point(2, "y")])
+        self.assertEqual(truncate_string(value), repr(value))
+        self.assertEqual(
+            truncate_string(Point(list(range(10)), 2), max_items=2),
+            "Point(x=[0, 1, ...<8 more items>], y=2)",
+        )
+
+    def test_subclasses_render_like_their_repr(self):
+        class Items(list):
+            pass
+
+        class Pair(tuple):
+            pass
+
+        class Settings(dict):
+            pass
+
+        class Tags(frozenset):
+            pass
+
+        class Labelled(list):
+            def __repr__(self):
+                return f"Labelled{list(self)}"
+
+        for value in (Items([1, 2]), Pair((1,)), Settings(a=1), Labelled([1])):
+            with self.subTest(value=value):
+                self.assertEqual(truncate_string(value), repr(value))
+        self.assertEqual(
+            truncate_string(Items(range(5)), max_items=2), "[0, 1, ...<3 more items>]"
+        )
+        self.assertEqual(truncate_string(Tags({1})), "Tags({1})")
+        self.assertEqual(truncate_string(Tags()), "Tags()")
+
+    def test_recursive_container(self):
+        value = []
+        value.append(value)
+        self.assertEqual(truncate_string(value), "[[...]]")
+
+    def test_large_sized_object_is_summarized(self):
+        class Frame:
+            def __len__(self):
+                return 1_000_000
+
+            def __str__(self):
+                raise AssertionError("str() should not be called")
+
+        self.assertEqual(truncate_string(Frame()), "<Frame object with 1000000 items>")